@@ -0,0 +1,71 @@
+"""
+Micro-benchmark: date handling in the Transform stage.
+
+Compares the original approach (per-row `strftime('%Y%m%d')`, run twice, and a
+date dimension built from every sale before de-duplication) with the
+vectorized one in `src.transform` (arithmetic YYYYMMDD key computed per
+distinct day, dimension derived from the unique dates only).
+
+Usage:
+    python -m benchmarks.bench_date_dimension --rows 10000000
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+
+from src.transform import build_date_dimension, date_key
+
+def legacy_date_handling(sale_dates):
+    """Reproduces the original string-formatting implementation."""
+    dim_date = pd.DataFrame()
+    dim_date['id_date'] = sale_dates.dt.strftime('%Y%m%d').astype(int)
+    dim_date['day'] = sale_dates.dt.day
+    dim_date['month'] = sale_dates.dt.month
+    dim_date['year'] = sale_dates.dt.year
+    dim_date['quarter'] = sale_dates.dt.quarter
+    dim_date = dim_date.drop_duplicates(subset=['id_date']).reset_index(drop=True)
+    date_iddate = sale_dates.dt.strftime('%Y%m%d').astype(int)
+    return dim_date, date_iddate
+
+def vectorized_date_handling(sale_dates):
+    """Runs the current implementation (dimension + fact foreign key)."""
+    dim_date = build_date_dimension(sale_dates)
+    codes, unique_dates = pd.factorize(sale_dates)
+    date_iddate = date_key(pd.DatetimeIndex(unique_dates))[codes]
+    return dim_date, date_iddate
+
+def _best_of(func, sale_dates, repeat):
+    """Returns the best wall time over `repeat` runs and the last result."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(sale_dates)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark date key / date dimension generation.")
+    parser.add_argument('--rows', type=int, default=10_000_000, help="Number of sale rows (default: 10M).")
+    parser.add_argument('--days', type=int, default=730, help="Distinct days spanned by the sales (default: 730).")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per implementation, best is kept (default: 3).")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    offsets = rng.integers(0, args.days, size=args.rows)
+    sale_dates = pd.Series(pd.Timestamp('2025-01-01') + pd.to_timedelta(offsets, unit='D'))
+
+    legacy_time, (legacy_dim, legacy_fk) = _best_of(legacy_date_handling, sale_dates, args.repeat)
+    vector_time, (vector_dim, vector_fk) = _best_of(vectorized_date_handling, sale_dates, args.repeat)
+
+    # Both implementations must agree on the keys
+    assert np.array_equal(legacy_fk.to_numpy(), vector_fk)
+    assert legacy_dim['id_date'].tolist() == vector_dim['id_date'].tolist()
+
+    print(f"Rows: {args.rows:,} | distinct days: {len(vector_dim):,}")
+    print(f"  strftime (legacy): {legacy_time:8.3f}s")
+    print(f"  vectorized       : {vector_time:8.3f}s")
+    print(f"  speedup          : {legacy_time / vector_time:8.1f}x")
+
+if __name__ == "__main__":
+    main()
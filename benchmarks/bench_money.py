@@ -0,0 +1,68 @@
+"""
+Money arithmetic: float64 vs int64 cents for the fact table metrics.
+
+Transforms the same sales in both money modes (`src.money`) and prints:
+- the time to derive the metrics and prepare them for the loader, where the
+  float path is made exact the usual way (a `Decimal` quantized per row) and
+  the cents path is `scale_for_load`;
+- the drift of the float64 SUM of `total_amount` and `profit` against the
+  exact total, which is what the KPI aggregates and finance compare.
+
+Usage:
+    python -m benchmarks.bench_money --raw-path data/raw
+"""
+import argparse
+import os
+import time
+from decimal import Decimal
+import numpy as np
+
+from src.extract import extract_data
+from src.money import CENTS_PER_UNIT, scale_for_load
+from src.transform import transform_data
+
+CENT = Decimal('0.01')
+METRICS = ('total_amount', 'profit')
+
+def timed_transform(raw_path, money, quarantine_path):
+    """Extracts and transforms in one money mode; returns the fact table and transform seconds."""
+    frames = extract_data(raw_path, money=money)
+    start = time.perf_counter()
+    fact_sale = transform_data(*frames, quarantine_path=quarantine_path)[4]
+    return fact_sale, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare float64 and int64-cents money arithmetic.")
+    parser.add_argument('--raw-path', default=os.path.join('data', 'raw'), help="Raw CSV directory (default: data/raw).")
+    args = parser.parse_args()
+    # Orphans (if any) go to a scratch file so the real quarantine stays untouched
+    quarantine_path = os.path.join(args.raw_path, 'bench_quarantine.csv')
+
+    fact_float, float_transform = timed_transform(args.raw_path, 'float', quarantine_path)
+    fact_cents, cents_transform = timed_transform(args.raw_path, 'cents', quarantine_path)
+    if os.path.exists(quarantine_path):
+        os.remove(quarantine_path)
+
+    start = time.perf_counter()
+    for column in METRICS:
+        [Decimal(value).quantize(CENT) for value in fact_float[column].tolist()]
+    float_prepare = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scale_for_load(fact_cents, 'sale')
+    cents_prepare = time.perf_counter() - start
+
+    rows = len(fact_cents)
+    print(f"\nMoney metrics for {rows:,} sales")
+    print(f"{'mode':<8}{'transform s':>14}{'to loader s':>14}{'total s':>10}")
+    print(f"{'float':<8}{float_transform:>14.3f}{float_prepare:>14.3f}{float_transform + float_prepare:>10.3f}")
+    print(f"{'cents':<8}{cents_transform:>14.3f}{cents_prepare:>14.3f}{cents_transform + cents_prepare:>10.3f}")
+
+    print(f"\n{'column':<14}{'float64 SUM':>22}{'exact SUM':>22}{'drift':>14}")
+    for column in METRICS:
+        exact = Decimal(int(fact_cents[column].sum())) / CENTS_PER_UNIT
+        approximate = Decimal(repr(float(np.sum(fact_float[column].to_numpy()))))
+        print(f"{column:<14}{approximate:>22}{exact:>22}{approximate - exact:>14}")
+
+if __name__ == "__main__":
+    main()
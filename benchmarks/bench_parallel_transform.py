@@ -0,0 +1,70 @@
+"""
+Scaling benchmark: serial vs multi-process Transform stage.
+
+Transforms the same sales data with `transform_data` (1 worker) and with
+`transform_data_parallel` on 2, 4, 8... workers, checks that every output
+is identical to the serial one and prints the best wall time and speedup per
+worker count. The dataset comes from `benchmarks.bench_pipeline` (generated
+once per scale in `data/bench/`), unless `--raw-path` points to raw CSVs.
+
+Usage:
+    python -m benchmarks.bench_parallel_transform --scale 10m --workers 1,2,4,8
+"""
+import argparse
+import os
+import time
+import pandas as pd
+
+from benchmarks.bench_pipeline import DEFAULT_SEED, prepare_dataset
+from src.extract import extract_data
+from src.transform import transform_data, transform_data_parallel
+
+def run_transform(frames, workers, quarantine_path):
+    """Transforms fresh copies of the raw frames (standardization works in place)."""
+    copies = [df.copy() for df in frames]
+    if workers == 1:
+        return transform_data(*copies, quarantine_path=quarantine_path)
+    return transform_data_parallel(*copies, workers=workers, quarantine_path=quarantine_path)
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure Transform scaling over worker processes.")
+    parser.add_argument('--scale', default='1m', help="Dataset scale, e.g. 1m or 10m (default: 1m).")
+    parser.add_argument('--raw-path', default=None, help="Raw CSV directory to use instead of a generated scale.")
+    parser.add_argument('--workers', default='1,2,4,8', help="Comma-separated worker counts (default: 1,2,4,8).")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per worker count (default: 3).")
+    args = parser.parse_args()
+
+    raw_path = args.raw_path or prepare_dataset(args.scale, DEFAULT_SEED)
+    frames = extract_data(raw_path)
+    worker_counts = [int(w) for w in args.workers.split(',')]
+    # Orphans (if any) go to a scratch file so the real quarantine stays untouched
+    quarantine_path = os.path.join(raw_path, 'bench_quarantine.csv')
+
+    reference = None
+    timings = {}
+    for workers in worker_counts:
+        best = float('inf')
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            result = run_transform(frames, workers, quarantine_path)
+            best = min(best, time.perf_counter() - start)
+        timings[workers] = best
+
+        if reference is None:
+            reference = result
+        else:
+            for expected, actual in zip(reference, result):
+                pd.testing.assert_frame_equal(expected, actual)
+
+    if os.path.exists(quarantine_path):
+        os.remove(quarantine_path)
+
+    rows = len(frames[3])
+    base = timings[worker_counts[0]]
+    print(f"\nTransform of {rows:,} sales (outputs identical across worker counts)")
+    print(f"{'workers':>8}{'best s':>10}{'rows/s':>14}{'speedup':>10}")
+    for workers, seconds in timings.items():
+        print(f"{workers:>8}{seconds:>10.3f}{rows / seconds:>14,.0f}{base / seconds:>9.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+"""
+Benchmark suite: extract, transform, load and KPI queries at several data scales.
+
+For every scale a reproducible dataset is generated once with
+`data/raw/data_gen.py` (seeded, cached in `data/bench/<scale>/`). Each
+repetition then runs extract -> transform -> load into a scratch warehouse
+and times the four KPI queries of `sql/queries.sql`. Stages are measured with
+`src.instrumentation.RunReport`. tracemalloc slows allocation-heavy code down
+considerably, so peak memory comes from one extra traced run and the timings
+only from the untraced repetitions.
+
+Load and query timings run against MySQL (scratch database
+`<DB_NAME>_bench`, from `.env`) or, with `--backend sqlite`, against a SQLite
+file. SQLite is only a stand-in to track relative changes where no MySQL server
+is available: it has no Foreign Keys or indexes from the DDL, and its numbers
+are not comparable with MySQL ones. Its default fact load strategy is
+'to_sql' (executemany), which is the fast path for an in-process database.
+
+Results (throughput, p50/p95 latency, peak memory) are written as JSON to
+`benchmarks/results/`. When a baseline exists (`benchmarks/baseline.json` by
+default), every metric is compared against it and regressions beyond
+`--tolerance` are flagged with a non-zero exit status.
+
+Usage:
+    python -m benchmarks.bench_pipeline --scales 1k,100k,1m --repeat 3
+    python -m benchmarks.bench_pipeline --backend sqlite --save-baseline
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+from data.raw.data_gen import generate_dataset, NUM_CUSTOMERS, BASE_PRODUCTS
+from src.bulk_load import LOAD_STRATEGIES, DEFAULT_BATCH_SIZE, bulk_load
+from src.ddl import apply_schema, read_sql_statements
+from src.extract import extract_data
+from src.instrumentation import RunReport
+from src.transform import transform_data
+
+# Named scales -> sales rows
+SCALES = {
+    '1k': 1_000,
+    '10k': 10_000,
+    '100k': 100_000,
+    '1m': 1_000_000,
+    '10m': 10_000_000,
+    '100m': 100_000_000,
+}
+BACKENDS = ('mysql', 'sqlite')
+DEFAULT_SEED = 42
+DATASET_PATH = os.path.join('data', 'bench')
+RESULTS_PATH = os.path.join('benchmarks', 'results')
+DEFAULT_BASELINE = os.path.join('benchmarks', 'baseline.json')
+
+# SQLite caps the number of bound parameters per statement
+SQLITE_MAX_VARIABLES = 32766
+
+# Metrics compared against the baseline: name -> True when higher is better
+COMPARED_METRICS = {
+    'p50_seconds': False,
+    'rows_per_sec': True,
+    'peak_mb': False,
+}
+
+def scale_rows(scale):
+    """Returns the number of sales rows for a named scale ('1m') or a plain integer."""
+    if scale.lower() in SCALES:
+        return SCALES[scale.lower()]
+    return int(scale)
+
+def prepare_dataset(scale, seed=DEFAULT_SEED):
+    """
+    Generates the dataset of a scale, unless it already exists.
+
+    Customers and products grow with the number of sales so the dimensions
+    keep a realistic ratio to the fact table.
+
+    Returns:
+        str: Directory holding the raw CSV files.
+    """
+    rows = scale_rows(scale)
+    path = os.path.join(DATASET_PATH, f'{scale}_seed{seed}')
+    if os.path.exists(os.path.join(path, 'sales.csv')):
+        return path
+
+    print(f"🛠 Generating '{scale}' dataset ({rows:,} sales) in {path}...")
+    shards = max(1, rows // 10_000_000)
+    generate_dataset(
+        output_path=path, num_sales=rows,
+        num_customers=max(NUM_CUSTOMERS, min(rows // 100, 1_000_000)),
+        num_products=max(len(BASE_PRODUCTS), min(rows // 10_000, 1_200)),
+        seed=seed, shards=shards, workers=min(shards, os.cpu_count() or 1)
+    )
+    return path
+
+def open_warehouse(backend, workdir):
+    """
+    Creates an empty scratch warehouse.
+
+    Returns:
+        sqlalchemy.engine.Engine: Engine of the scratch warehouse.
+    """
+    if backend == 'sqlite':
+        path = os.path.join(workdir, 'warehouse.sqlite')
+        if os.path.exists(path):
+            os.remove(path)
+        return create_engine(f"sqlite:///{path}")
+
+    # Imported lazily so the SQLite backend needs no .env
+    from src.db import get_db_settings, get_engine
+    database = f"{get_db_settings()['database']}_bench"
+    apply_schema(get_engine(with_database=False), database, full_rebuild=True)
+    return get_engine(database=database, local_infile=True)
+
+def load_warehouse(frames, engine, backend, strategy, batch_size):
+    """Loads the transformed frames, dimensions first, and returns the fact rows/s."""
+    dim_channel, dim_customer, dim_product, dim_date, fact_sale = frames
+    if backend == 'sqlite':
+        # Multi-row INSERTs must stay under SQLite's bound-parameter limit
+        batch_size = min(batch_size, SQLITE_MAX_VARIABLES // len(fact_sale.columns))
+
+    for df, table_name in ((dim_channel, 'channel'), (dim_customer, 'customer'),
+                           (dim_product, 'product'), (dim_date, 'date')):
+        bulk_load(df, table_name, engine, strategy='to_sql')
+    return bulk_load(fact_sale, 'sale', engine, strategy=strategy, batch_size=batch_size)['rows_per_sec']
+
+def run_scale(scale, backend, repeat, strategy, batch_size, seed, trace_memory):
+    """
+    Benchmarks every stage of one scale.
+
+    Returns:
+        dict: Stage name -> summary metrics (see `summarize`).
+    """
+    raw_path = prepare_dataset(scale, seed)
+    samples = {}
+    peaks = {}
+
+    with tempfile.TemporaryDirectory() as workdir:
+        if trace_memory:
+            print(f"\n=== Scale '{scale}', memory run ===")
+            for name, records in run_once(raw_path, backend, workdir, strategy, batch_size, True).items():
+                peaks[name] = records[0].get('tracemalloc_peak_mb')
+        for run in range(repeat):
+            print(f"\n=== Scale '{scale}', run {run + 1}/{repeat} ===")
+            for name, records in run_once(raw_path, backend, workdir, strategy, batch_size, False).items():
+                samples.setdefault(name, []).extend(records)
+
+    return {name: summarize(records, peaks.get(name)) for name, records in samples.items()}
+
+def run_once(raw_path, backend, workdir, strategy, batch_size, trace_memory):
+    """
+    Runs extract -> transform -> load -> KPI queries once.
+
+    Returns:
+        dict: Stage name -> list with the stage record.
+    """
+    queries = read_sql_statements('sql/queries.sql')
+    report = RunReport(trace_memory=trace_memory)
+    engine = open_warehouse(backend, workdir)
+
+    with report.stage('extract') as metrics:
+        df_chan, df_cust, df_prod, df_sales = extract_data(raw_path)
+        metrics['rows_out'] = len(df_sales)
+    with report.stage('transform', rows_in=len(df_sales)) as metrics:
+        frames = transform_data(df_chan, df_cust, df_prod, df_sales)
+        metrics['rows_out'] = len(frames[4])
+    with report.stage('load', rows_in=len(frames[4])) as metrics:
+        metrics['fact_rows_per_sec'] = load_warehouse(frames, engine, backend, strategy, batch_size)
+        metrics['rows_out'] = len(frames[4])
+    for number, query in enumerate(queries, start=1):
+        with report.stage(f'query_{number}'):
+            pd.read_sql(text(query), con=engine)
+    engine.dispose()
+
+    records = {record['stage']: [record] for record in report.stages}
+    records['end_to_end'] = [{
+        'stage': 'end_to_end',
+        'rows_in': len(df_sales),
+        'wall_seconds': sum(records[name][0]['wall_seconds'] for name in ('extract', 'transform', 'load')),
+        'tracemalloc_peak_mb': max((r.get('tracemalloc_peak_mb') or 0) for r in report.stages),
+    }]
+    return records
+
+def summarize(records, peak_mb=None):
+    """
+    Reduces the repetitions of one stage to latency percentiles and throughput.
+
+    Args:
+        records (list): Untraced stage records, one per repetition.
+        peak_mb (float, optional): tracemalloc peak from the memory run.
+
+    Returns:
+        dict: rows, p50/p95/min seconds, CPU seconds, rows/s (at p50) and peak MiB.
+    """
+    walls = np.array([record['wall_seconds'] for record in records])
+    rows = records[0].get('rows_in') or records[0].get('rows_out')
+    p50 = float(np.percentile(walls, 50))
+    summary = {
+        'runs': len(records),
+        'rows': rows,
+        'p50_seconds': round(p50, 4),
+        'p95_seconds': round(float(np.percentile(walls, 95)), 4),
+        'min_seconds': round(float(walls.min()), 4),
+        'rows_per_sec': round(rows / p50) if rows and p50 > 0 else None,
+        'peak_mb': peak_mb or None,
+    }
+    cpu = [record['cpu_seconds'] for record in records if 'cpu_seconds' in record]
+    if cpu:
+        summary['cpu_p50_seconds'] = round(float(np.percentile(cpu, 50)), 4)
+    return summary
+
+def compare_with_baseline(results, baseline, tolerance):
+    """
+    Flags metrics that got worse than the baseline by more than `tolerance`.
+
+    Only scales and stages present in both runs are compared.
+
+    Returns:
+        list: One dict per regression (scale, stage, metric, baseline, current, change).
+    """
+    regressions = []
+    print(f"\n📏 Comparison with baseline (tolerance {tolerance:.0%}):")
+    for scale, stages in results.items():
+        for stage_name, metrics in stages.items():
+            reference = baseline.get(scale, {}).get(stage_name)
+            if reference is None:
+                continue
+            for metric, higher_is_better in COMPARED_METRICS.items():
+                current, previous = metrics.get(metric), reference.get(metric)
+                if not current or not previous:
+                    continue
+                change = current / previous - 1
+                worse = -change if higher_is_better else change
+                status = "❌" if worse > tolerance else "✅"
+                print(f" {status} {scale:<6} {stage_name:<12} {metric:<14} {previous:>14,.4f} -> {current:>14,.4f} ({change:+.1%})")
+                if worse > tolerance:
+                    regressions.append({
+                        'scale': scale, 'stage': stage_name, 'metric': metric,
+                        'baseline': previous, 'current': current, 'change': round(change, 4),
+                    })
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the ETL stages and KPI queries at several scales.")
+    parser.add_argument('--scales', default='1k,100k', help=f"Comma-separated scales, named ({', '.join(SCALES)}) or row counts (default: 1k,100k).")
+    parser.add_argument('--backend', choices=BACKENDS, default='mysql', help="Warehouse for load/query timings (default: mysql).")
+    parser.add_argument('--repeat', type=int, default=3, help="Repetitions per scale (default: 3).")
+    parser.add_argument('--load-strategy', choices=LOAD_STRATEGIES, default=None,
+                        help="Fact load strategy (default: multi_insert on MySQL, to_sql on SQLite).")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help=f"Rows per INSERT batch (default: {DEFAULT_BATCH_SIZE}).")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help=f"Dataset seed (default: {DEFAULT_SEED}).")
+    parser.add_argument('--no-trace-memory', action='store_true', help="Skip the traced memory run (no peak memory).")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help=f"Baseline results file (default: {DEFAULT_BASELINE}).")
+    parser.add_argument('--save-baseline', action='store_true', help="Store this run as the new baseline.")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Allowed relative slowdown before flagging (default: 0.2).")
+    args = parser.parse_args()
+
+    if args.load_strategy is None:
+        args.load_strategy = 'to_sql' if args.backend == 'sqlite' else 'multi_insert'
+    if args.backend == 'sqlite' and args.load_strategy == 'load_data_infile':
+        parser.error("'load_data_infile' needs MySQL.")
+
+    scales = [scale.strip() for scale in args.scales.split(',') if scale.strip()]
+    results = {
+        scale: run_scale(scale, args.backend, args.repeat, args.load_strategy, args.batch_size,
+                         args.seed, not args.no_trace_memory)
+        for scale in scales
+    }
+
+    payload = {
+        'run_at': datetime.now().isoformat(timespec='seconds'),
+        'backend': args.backend,
+        'load_strategy': args.load_strategy,
+        'batch_size': args.batch_size,
+        'repeat': args.repeat,
+        'seed': args.seed,
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'results': results,
+    }
+    os.makedirs(RESULTS_PATH, exist_ok=True)
+    results_file = os.path.join(RESULTS_PATH, f"bench_{datetime.now().strftime('%Y%m%dT%H%M%S')}.json")
+    with open(results_file, 'w') as f:
+        json.dump(payload, f, indent=2)
+
+    print(f"\n{'scale':<8}{'stage':<12}{'rows':>14}{'p50 s':>10}{'p95 s':>10}{'rows/s':>14}{'peak MiB':>10}")
+    for scale, stages in results.items():
+        for stage_name, m in stages.items():
+            print(f"{scale:<8}{stage_name:<12}{m['rows'] or 0:>14,}{m['p50_seconds']:>10.3f}{m['p95_seconds']:>10.3f}"
+                  f"{m['rows_per_sec'] or 0:>14,}{m['peak_mb'] or 0:>10.1f}")
+    print(f"\n📈 Results written to: {results_file}")
+
+    regressions = []
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        if baseline.get('backend') != args.backend:
+            print(f"⚠ Baseline was measured on '{baseline.get('backend')}', not '{args.backend}'. Skipping comparison.")
+        else:
+            regressions = compare_with_baseline(results, baseline['results'], args.tolerance)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(payload, f, indent=2)
+        print(f"📌 Baseline saved to: {args.baseline}")
+
+    if regressions:
+        print(f"❌ {len(regressions)} regression(s) beyond {args.tolerance:.0%}.")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Micro-benchmark: SCD Type 2 change detection and version resolution.
+
+Builds a synthetic customer dimension with several versions per member and
+times:
+- `apply_scd2` (vectorized row-hash compare) on a source snapshot where a
+  share of the members changed;
+- `resolve_versions` (sorted as-of join) against the naive interval join,
+  which merges every sale with every version of its member and keeps the one
+  whose `valid_from`/`valid_to` range holds the sale date. Both must pick the
+  same versions.
+
+Usage:
+    python -m benchmarks.bench_scd --sales 5000000 --members 20000 --versions 3
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+
+from src.scd import SCD_VALID_FROM_MIN, apply_scd2, resolve_versions, row_hash
+
+ATTRIBUTES = ['name', 'city', 'country', 'age']
+
+def build_versions(members, versions_per_member, start, days, rng):
+    """Creates `versions_per_member` consecutive versions of every customer."""
+    customer_id = np.repeat(np.arange(1, members + 1), versions_per_member)
+    number = np.tile(np.arange(versions_per_member), members)
+    # Change days are spread over the sales period, one per version after the first
+    change_days = np.sort(rng.integers(1, days, size=(members, versions_per_member - 1)), axis=1)
+    starts = np.concatenate([np.zeros((members, 1), dtype='int64'), change_days], axis=1).ravel()
+    valid_from = np.where(number == 0, np.datetime64(SCD_VALID_FROM_MIN, 'ns'),
+                          np.datetime64(start, 'ns') + starts.astype('timedelta64[D]'))
+    versions = pd.DataFrame({
+        'id_customer': np.arange(1, len(customer_id) + 1),
+        'customer_id': customer_id,
+        'name': 'Customer ' + pd.Series(customer_id).astype(str),
+        'city': 'City ' + pd.Series(number).astype(str),
+        'country': 'Colombia',
+        'age': 20 + customer_id % 50,
+        'valid_from': valid_from,
+    })
+    is_last = number == versions_per_member - 1
+    next_from = versions['valid_from'].shift(-1)
+    versions['valid_to'] = next_from.where(~is_last) - pd.Timedelta(days=1)
+    versions['is_current'] = is_last.astype('int8')
+    versions['row_hash'] = row_hash(versions, ATTRIBUTES)
+    return versions
+
+def interval_join(business_keys, sale_dates, versions):
+    """Naive resolution: every sale joined to every version of its member, then filtered."""
+    sales = pd.DataFrame({'customer_id': business_keys, 'date': sale_dates, 'row': np.arange(len(business_keys))})
+    candidates = versions[['customer_id', 'valid_from', 'valid_to']].assign(position=np.arange(len(versions)))
+    joined = sales.merge(candidates, on='customer_id')
+    valid_to = joined['valid_to'].fillna(pd.Timestamp.max)
+    joined = joined[(joined['valid_from'] <= joined['date']) & (joined['date'] <= valid_to)]
+    positions = np.empty(len(sales), dtype='int64')
+    positions[joined['row'].to_numpy()] = joined['position'].to_numpy()
+    return positions
+
+def _timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SCD Type 2 change detection and as-of resolution.")
+    parser.add_argument('--sales', type=int, default=5_000_000, help="Number of sales (default: 5M).")
+    parser.add_argument('--members', type=int, default=20_000, help="Customers in the dimension (default: 20k).")
+    parser.add_argument('--versions', type=int, default=3, help="Versions per customer (default: 3).")
+    parser.add_argument('--changed', type=float, default=0.05, help="Share of members changed in the snapshot (default: 0.05).")
+    parser.add_argument('--days', type=int, default=730, help="Days spanned by the sales (default: 730).")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    start = pd.Timestamp('2024-01-01')
+    versions = build_versions(args.members, args.versions, start, args.days, rng)
+
+    # Source snapshot: the current attributes, a share of them changed
+    snapshot = versions[versions['is_current'] == 1][['customer_id'] + ATTRIBUTES].rename(
+        columns={'customer_id': 'id_customer'}).reset_index(drop=True)
+    changed = rng.random(len(snapshot)) < args.changed
+    snapshot.loc[changed, 'city'] = 'Moved'
+    detect_time, (updated, counts) = _timed(
+        apply_scd2, versions, snapshot, 'customer', start + pd.Timedelta(days=args.days)
+    )
+    assert counts == {'new': 0, 'changed': int(changed.sum())}
+
+    business_keys = rng.integers(1, args.members + 1, size=args.sales)
+    sale_dates = pd.Series(start + pd.to_timedelta(rng.integers(0, args.days, size=args.sales), unit='D'))
+    asof_time, asof_positions = _timed(resolve_versions, business_keys, sale_dates, updated, 'customer')
+    interval_time, interval_positions = _timed(interval_join, business_keys, sale_dates, updated)
+    assert np.array_equal(asof_positions, interval_positions)
+
+    print(f"Versions: {len(updated):,} ({args.members:,} members) | sales: {args.sales:,}")
+    print(f"  change detection ({counts['changed']:,} changed): {detect_time:8.3f}s")
+    print(f"  interval join                   : {interval_time:8.3f}s")
+    print(f"  as-of join                      : {asof_time:8.3f}s")
+    print(f"  speedup                         : {interval_time / asof_time:8.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark: the four KPI queries on the standard vs optimized physical schema.
+
+Both physical variants of `src.ddl.SCHEMA_FILES` ('scd2' changes the
+dimension model, not the physical design, and is left out) are created in
+scratch databases (`<DB_NAME>_bench_standard`, `<DB_NAME>_bench_optimized`), loaded
+with the same transformed data, analyzed, and then every query in
+`sql/queries.sql` is run with EXPLAIN and timed. Requires the MySQL server
+configured in `.env`.
+
+Usage:
+    python -m benchmarks.bench_schema --raw-path data/raw --repeat 5
+"""
+import argparse
+import os
+import time
+import pandas as pd
+from sqlalchemy import text
+
+from src.db import get_db_settings, get_engine
+from src.ddl import apply_schema, read_sql_statements
+from src.extract import extract_data
+from src.transform import transform_data
+from src.load import load_data
+
+EXPLAIN_COLUMNS = ['table', 'type', 'key', 'rows', 'Extra']
+BENCH_SCHEMAS = ('standard', 'optimized')
+
+def prepare_database(schema, database, frames, partition_sale=False):
+    """Creates one schema variant from scratch and loads it."""
+    apply_schema(get_engine(with_database=False), database, schema=schema, full_rebuild=True,
+                 partition_sale=partition_sale)
+    engine = get_engine(database=database)
+    load_data(*frames, engine=engine)
+    with engine.connect() as conn:
+        conn.execute(text("ANALYZE TABLE sale, product, channel, date, customer"))
+    return engine
+
+def time_queries(engine, queries, repeat):
+    """Returns per-query best/median timings and prints the EXPLAIN plans."""
+    results = []
+    for number, query in enumerate(queries, start=1):
+        plan = pd.read_sql(text(f"EXPLAIN {query}"), con=engine)
+        print(f"  Query {number} plan:")
+        print(plan[[c for c in EXPLAIN_COLUMNS if c in plan.columns]].to_string(index=False))
+
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            pd.read_sql(text(query), con=engine)
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        results.append({'query': number, 'best_ms': timings[0] * 1000, 'median_ms': timings[len(timings) // 2] * 1000})
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare KPI query plans and latency across schema variants.")
+    parser.add_argument('--raw-path', default=os.path.join('data', 'raw'), help="Raw CSV directory (default: data/raw).")
+    parser.add_argument('--repeat', type=int, default=5, help="Timed runs per query (default: 5).")
+    parser.add_argument('--partition-sale', action='store_true', help="Also partition sale in the optimized variant.")
+    args = parser.parse_args()
+
+    queries = read_sql_statements('sql/queries.sql')
+    db_name = get_db_settings()['database']
+
+    summary = {}
+    for schema in BENCH_SCHEMAS:
+        # transform_data standardizes its inputs in place, so each variant gets a fresh extract
+        frames = transform_data(*extract_data(args.raw_path))
+        database = f"{db_name}_bench_{schema}"
+        print(f"\n=== Schema '{schema}' ({database}) ===")
+        engine = prepare_database(schema, database, frames, partition_sale=(args.partition_sale and schema == 'optimized'))
+        summary[schema] = time_queries(engine, queries, args.repeat)
+
+    print("\nQuery   " + "".join(f"{schema + ' best/median ms':>32}" for schema in summary))
+    for i in range(len(queries)):
+        row = "".join(f"{summary[s][i]['best_ms']:>20.2f} / {summary[s][i]['median_ms']:<9.2f}" for s in summary)
+        print(f"Q{i + 1:<6} {row}")
+
+if __name__ == "__main__":
+    main()
@@ -1,110 +1,352 @@
+"""
+Generador de datos sintéticos (Raw Layer) para el escenario GROCERY CHAIN.
+
+Sales are sampled with NumPy in vectorized chunks, so the generator scales from
+the lab dataset (300 sales, the default) to load-test sizes. Large runs can be
+split into shards generated by parallel processes. The module is importable:
+
+    from data.raw.data_gen import generate_dataset
+    generate_dataset('data/bench/1m', num_sales=1_000_000, seed=42)
+
+Usage:
+    python data/raw/data_gen.py
+    python data/raw/data_gen.py --sales 50000000 --customers 100000 --shards 8 --workers 8 --seed 42
+"""
+import argparse
+import os
+import shutil
+import numpy as np
 import pandas as pd
-import random
+from concurrent.futures import ProcessPoolExecutor
 from faker import Faker
-from datetime import datetime, timedelta
 
-# Configuración
-fake = Faker()
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Opcional: solo se necesita para la salida Parquet
+    pa = None
+    pq = None
+
+# Configuración por defecto
 NUM_SALES = 300       # Mínimo 200 requerido [cite: 105]
 NUM_CUSTOMERS = 25    # Mínimo 20 requerido [cite: 107]
-START_DATE = datetime(2025, 1, 1) # Inicio de los 4 meses [cite: 106]
+START_DATE = '2025-01-01' # Inicio de los 4 meses [cite: 106]
+NUM_DAYS = 120        # Desplazamiento máximo (en días) desde START_DATE
+CHUNK_SIZE = 1_000_000  # Filas de ventas generadas y escritas por paso
+OUTPUT_FORMATS = ('csv', 'parquet')
+
+# Tamaño del pool de nombres/ciudades de Faker (Faker es lento fila a fila)
+FAKER_POOL_SIZE = 1000
 
-# 1. Generar Canales (Channels)
+# 1. Canales (Channels)
 # Adaptado a Supermercado: 2 Tiendas físicas + 1 App/Web [cite: 108]
-channels_data = [
+CHANNELS = [
     {'channel_id': 1, 'channel': 'Supermercado - Sede Principal'},
     {'channel_id': 2, 'channel': 'Supermercado - Express Norte'},
     {'channel_id': 3, 'channel': 'App Domicilios / Online'}
 ]
-df_channels = pd.DataFrame(channels_data)
-
-# 2. Generar Clientes (Customers)
-# Mínimo 3 países diferentes [cite: 107]
-countries = ['Colombia', 'Perú', 'Ecuador']
-customers_list = []
-
-for i in range(1, NUM_CUSTOMERS + 1):
-    customers_list.append({
-        'customer_id': i,
-        'name': fake.name(),
-        'city': fake.city(),
-        'country': random.choice(countries),
-        'age': random.randint(18, 75)
-    })
-df_customers = pd.DataFrame(customers_list)
 
-# 3. Generar Productos (Products) - ESCENARIO GROCERY CHAIN
-# Requisito: Mínimo 4 marcas y 4 categorías 
-products_data = [
+# 2. Clientes: mínimo 3 países diferentes [cite: 107]
+COUNTRIES = ['Colombia', 'Perú', 'Ecuador']
+
+# 3. Catálogo base de productos - ESCENARIO GROCERY CHAIN
+# Requisito: Mínimo 4 marcas y 4 categorías
+BASE_PRODUCTS = [
     # Categoría: Dairy (Lácteos) - Marca: FreshFarm
     {'name': 'Whole Milk 1L', 'category': 'Dairy', 'brand': 'FreshFarm', 'unit_price': 1.20},
     {'name': 'Greek Yogurt Pack', 'category': 'Dairy', 'brand': 'FreshFarm', 'unit_price': 4.50},
     {'name': 'Cheddar Cheese Block', 'category': 'Dairy', 'brand': 'FreshFarm', 'unit_price': 5.00},
-    
+
     # Categoría: Pantry (Despensa) - Marca: KitchenStaples
     {'name': 'Basmati Rice 1kg', 'category': 'Pantry', 'brand': 'KitchenStaples', 'unit_price': 2.80},
     {'name': 'Spaghetti 500g', 'category': 'Pantry', 'brand': 'KitchenStaples', 'unit_price': 1.10},
     {'name': 'Olive Oil 500ml', 'category': 'Pantry', 'brand': 'KitchenStaples', 'unit_price': 8.50},
-    
+
     # Categoría: Produce (Frutas/Verduras) - Marca: GreenValley
     {'name': 'Bananas Organic (Bunch)', 'category': 'Produce', 'brand': 'GreenValley', 'unit_price': 1.50},
     {'name': 'Avocado Hass (Unit)', 'category': 'Produce', 'brand': 'GreenValley', 'unit_price': 1.80},
     {'name': 'Apples Red (1kg)', 'category': 'Produce', 'brand': 'GreenValley', 'unit_price': 3.00},
-    
+
     # Categoría: Household (Aseo/Hogar) - Marca: CleanMax
     {'name': 'Dish Soap 750ml', 'category': 'Household', 'brand': 'CleanMax', 'unit_price': 3.20},
     {'name': 'Paper Towels (2 Rolls)', 'category': 'Household', 'brand': 'CleanMax', 'unit_price': 2.50},
     {'name': 'Laundry Detergent 1L', 'category': 'Household', 'brand': 'CleanMax', 'unit_price': 6.00}
 ]
 
-# Añadir IDs y Costo unitario (margen menor en supermercados)
-for i, prod in enumerate(products_data, 1):
-    prod['product_id'] = i
+# Tipos de las columnas de ventas (los mismos que declara src/schema.py)
+SALES_DTYPES = {
+    'sale_id': 'int32',
+    'product_id': 'int32',
+    'customer_id': 'int32',
+    'channel_id': 'int32',
+    'quantity': 'int32',
+    'unit_price_sale': 'float64',
+}
+
+def generate_dataset(output_path='data/raw', num_sales=NUM_SALES, num_customers=NUM_CUSTOMERS,
+                     num_products=len(BASE_PRODUCTS), start_date=START_DATE, num_days=NUM_DAYS,
+                     seed=None, file_format='csv', chunk_size=CHUNK_SIZE, shards=1, workers=1):
+    """
+    Generates the four raw sources (channels, customers, products, sales).
+
+    The same arguments and `seed` always produce the same files. Sales are
+    written chunk by chunk, so memory is bounded by `chunk_size` whatever the
+    total size. With `shards > 1` the sales id range is split into shards,
+    generated by up to `workers` processes and concatenated into one file.
+
+    Args:
+        output_path (str): Directory where the files are written.
+        num_sales (int): Number of sales rows.
+        num_customers (int): Number of customers.
+        num_products (int): Number of products. The first 12 are the base
+            catalog; more are generated as priced variants of it.
+        start_date (str): First possible sale date (YYYY-MM-DD).
+        num_days (int): Sale dates fall in `start_date + [0, num_days]`.
+        seed (int, optional): Random seed for reproducible datasets.
+        file_format (str): 'csv' (what the pipeline ingests) or 'parquet'.
+        chunk_size (int): Sales rows generated and written per step.
+        shards (int): Number of independent sales shards.
+        workers (int): Processes generating shards concurrently.
+
+    Returns:
+        dict: Source name -> written file path.
+
+    Raises:
+        ValueError: If the format is unknown or a size is not positive.
+        ImportError: If 'parquet' is requested without pyarrow.
+    """
+    if file_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format '{file_format}'. Expected one of {OUTPUT_FORMATS}.")
+    if file_format == 'parquet' and pa is None:
+        raise ImportError("pyarrow is required for Parquet output (pip install pyarrow).")
+    if min(num_sales, num_customers, num_products, chunk_size, shards) < 1:
+        raise ValueError("Sizes, chunk_size and shards must be positive.")
+
+    os.makedirs(output_path, exist_ok=True)
+    # Una semilla independiente para las dimensiones y para cada shard de ventas
+    seeds = np.random.SeedSequence(seed).spawn(shards + 1)
+    rng = np.random.default_rng(seeds[0])
+
+    df_channels = pd.DataFrame(CHANNELS)
+    df_customers = generate_customers(num_customers, rng, seed)
+    df_products = generate_products(num_products, rng)
+
+    paths = {}
+    for name, df in (('channels', df_channels), ('customers', df_customers), ('products', df_products)):
+        paths[name] = os.path.join(output_path, f'{name}.{file_format}')
+        _write_frame(df, paths[name], file_format)
+
+    # 4. Ventas (Sales), por shards de rangos de sale_id contiguos
+    bounds = np.linspace(0, num_sales, shards + 1).astype(np.int64)
+    prices = df_products['unit_price'].to_numpy()
+    paths['sales'] = os.path.join(output_path, f'sales.{file_format}')
+    tasks = [
+        (_shard_path(paths['sales'], i) if shards > 1 else paths['sales'], int(bounds[i]) + 1,
+         int(bounds[i + 1] - bounds[i]), num_customers, prices, start_date, num_days,
+         seeds[i + 1], file_format, chunk_size)
+        for i in range(shards)
+    ]
+    if workers > 1 and shards > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(_write_sales_shard, *zip(*tasks)))
+    else:
+        for task in tasks:
+            _write_sales_shard(*task)
+
+    if shards > 1:
+        _concat_shards([task[0] for task in tasks], paths['sales'], file_format)
+    return paths
+
+def generate_customers(num_customers, rng, seed=None):
+    """
+    Builds the customers dimension.
+
+    Faker is only called to fill a pool of names and cities (at most
+    `FAKER_POOL_SIZE` each), which is then sampled with NumPy.
+
+    Args:
+        num_customers (int): Number of customers.
+        rng (np.random.Generator): Random generator.
+        seed (int, optional): Seed for Faker.
+
+    Returns:
+        pd.DataFrame: customer_id, name, city, country, age.
+    """
+    fake = Faker()
+    if seed is not None:
+        fake.seed_instance(seed)
+    pool_size = min(num_customers, FAKER_POOL_SIZE)
+    names = np.array([fake.name() for _ in range(pool_size)], dtype=object)
+    cities = np.array([fake.city() for _ in range(pool_size)], dtype=object)
+
+    return pd.DataFrame({
+        'customer_id': np.arange(1, num_customers + 1),
+        'name': names[rng.integers(0, pool_size, num_customers)] if num_customers > pool_size else names,
+        'city': cities[rng.integers(0, pool_size, num_customers)],
+        'country': np.array(COUNTRIES, dtype=object)[rng.integers(0, len(COUNTRIES), num_customers)],
+        'age': rng.integers(18, 76, num_customers)
+    })
+
+def generate_products(num_products, rng):
+    """
+    Builds the products dimension from the base catalog.
+
+    Products beyond the base catalog are numbered variants of it (same
+    category and brand) with the price moved by up to ±20%.
+
+    Args:
+        num_products (int): Number of products.
+        rng (np.random.Generator): Random generator.
+
+    Returns:
+        pd.DataFrame: name, category, brand, unit_price, product_id, unit_cost.
+    """
+    base = pd.DataFrame(BASE_PRODUCTS)
+    position = np.arange(num_products) % len(base)
+    variant = np.arange(num_products) // len(base)
+
+    df_products = base.iloc[position].reset_index(drop=True)
+    df_products['name'] = np.where(
+        variant > 0, df_products['name'] + ' #' + (variant + 1).astype(str), df_products['name']
+    )
+    jitter = np.where(variant > 0, rng.uniform(0.8, 1.2, num_products), 1.0)
+    df_products['unit_price'] = (df_products['unit_price'] * jitter).round(2)
+
+    # Añadir IDs y Costo unitario (margen menor en supermercados)
+    df_products['product_id'] = np.arange(1, num_products + 1)
     # En supermercados el margen suele ser pequeño, el costo es aprox 80-85% del precio
-    prod['unit_cost'] = round(prod['unit_price'] * random.uniform(0.80, 0.85), 2)
+    df_products['unit_cost'] = (df_products['unit_price'] * rng.uniform(0.80, 0.85, num_products)).round(2)
+    return df_products
+
+def generate_sales_chunk(first_id, size, num_customers, prices, start_date, num_days, rng):
+    """
+    Samples a block of consecutive sales with vectorized NumPy draws.
 
-df_products = pd.DataFrame(products_data)
+    Args:
+        first_id (int): `sale_id` of the first row.
+        size (int): Number of rows.
+        num_customers (int): Customers to sample from (ids 1..n).
+        prices (np.ndarray): Unit price per product (index = product_id - 1).
+        start_date (str): First possible sale date (YYYY-MM-DD).
+        num_days (int): Maximum day offset from `start_date`.
+        rng (np.random.Generator): Random generator.
 
-# 4. Generar Ventas (Sales)
-sales_list = []
+    Returns:
+        pd.DataFrame: One block of the sales source, `sale_date` as datetime64.
+    """
+    product_id = rng.integers(1, len(prices) + 1, size)
+    customer_id = rng.integers(1, num_customers + 1, size)
+    channel_id = rng.integers(1, len(CHANNELS) + 1, size)
 
-for i in range(1, NUM_SALES + 1):
-    prod = random.choice(products_data)
-    cust_id = random.randint(1, NUM_CUSTOMERS)
-    chan_id = random.randint(1, 3)
-    
     # Fecha aleatoria
-    days_offset = random.randint(0, 120)
-    sale_date = START_DATE + timedelta(days=days_offset)
-    
+    day_offset = rng.integers(0, num_days + 1, size)
+    sale_date = np.datetime64(start_date, 'D') + day_offset
+
     # Cantidad: En supermercado la gente lleva más unidades (1 a 10)
-    qty = random.randint(1, 10)
-    
-    # Descuentos ocasionales
-    discount = 1.0
-    if random.random() < 0.2: # 20% de probabilidad de descuento
-        discount = 0.90 # 10% descuento
-        
-    final_price = round(prod['unit_price'] * discount, 2)
-    
-    sales_list.append({
-        'sale_id': i,
-        'sale_date': sale_date.strftime('%Y-%m-%d'),
-        'product_id': prod['product_id'],
-        'customer_id': cust_id,
-        'channel_id': chan_id,
-        'quantity': qty,
-        'unit_price_sale': final_price
+    quantity = rng.integers(1, 11, size)
+
+    # Descuentos ocasionales: 20% de probabilidad de un 10% de descuento
+    discount = np.where(rng.random(size) < 0.2, 0.90, 1.0)
+    unit_price_sale = np.round(prices[product_id - 1] * discount, 2)
+
+    df_sales = pd.DataFrame({
+        'sale_id': np.arange(first_id, first_id + size),
+        'sale_date': sale_date.astype('datetime64[ns]'),
+        'product_id': product_id,
+        'customer_id': customer_id,
+        'channel_id': channel_id,
+        'quantity': quantity,
+        'unit_price_sale': unit_price_sale
     })
+    return df_sales.astype(SALES_DTYPES)
+
+def _write_sales_shard(path, first_id, size, num_customers, prices, start_date, num_days,
+                       seed_sequence, file_format, chunk_size):
+    """Generates one shard of sales and writes it chunk by chunk."""
+    rng = np.random.default_rng(seed_sequence)
+    writer = None
+    if os.path.exists(path):
+        os.remove(path)
+    try:
+        # Un shard vacío también lleva la cabecera
+        for offset in range(0, max(size, 1), chunk_size):
+            rows = min(chunk_size, size - offset)
+            chunk = generate_sales_chunk(first_id + offset, rows, num_customers, prices,
+                                         start_date, num_days, rng)
+            if file_format == 'csv':
+                chunk.to_csv(path, mode='a', header=(offset == 0), index=False, date_format='%Y-%m-%d')
+            else:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema, compression='zstd')
+                writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    return path
+
+def _concat_shards(shard_paths, path, file_format):
+    """Concatenates the shard files into one file and removes them."""
+    if file_format == 'csv':
+        with open(path, 'wb') as target:
+            for number, shard_path in enumerate(shard_paths):
+                with open(shard_path, 'rb') as source:
+                    header = source.readline()
+                    if number == 0:
+                        target.write(header)
+                    shutil.copyfileobj(source, target)
+    else:
+        writer = None
+        try:
+            for shard_path in shard_paths:
+                parquet_file = pq.ParquetFile(shard_path)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, parquet_file.schema_arrow, compression='zstd')
+                for group in range(parquet_file.num_row_groups):
+                    writer.write_table(parquet_file.read_row_group(group))
+        finally:
+            if writer is not None:
+                writer.close()
+    for shard_path in shard_paths:
+        os.remove(shard_path)
+
+def _shard_path(path, number):
+    """Returns the temporary file name of one shard."""
+    root, extension = os.path.splitext(path)
+    return f'{root}.part{number:04d}{extension}'
+
+def _write_frame(df, path, file_format):
+    """Writes a dimension source."""
+    if file_format == 'csv':
+        df.to_csv(path, index=False)
+    else:
+        df.to_parquet(path, index=False, compression='zstd')
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the synthetic GROCERY CHAIN raw dataset.")
+    parser.add_argument('--output', default=os.path.join('data', 'raw'), help="Output directory (default: data/raw).")
+    parser.add_argument('--sales', type=int, default=NUM_SALES, help=f"Sales rows (default: {NUM_SALES}).")
+    parser.add_argument('--customers', type=int, default=NUM_CUSTOMERS, help=f"Customers (default: {NUM_CUSTOMERS}).")
+    parser.add_argument('--products', type=int, default=len(BASE_PRODUCTS),
+                        help=f"Products (default: {len(BASE_PRODUCTS)}, the base catalog).")
+    parser.add_argument('--start-date', default=START_DATE, help=f"First sale date (default: {START_DATE}).")
+    parser.add_argument('--days', type=int, default=NUM_DAYS, help=f"Date span in days (default: {NUM_DAYS}).")
+    parser.add_argument('--seed', type=int, default=None, help="Random seed for a reproducible dataset.")
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, default='csv', help="Output format (default: csv).")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help=f"Rows per write (default: {CHUNK_SIZE}).")
+    parser.add_argument('--shards', type=int, default=1, help="Independent sales shards (default: 1).")
+    parser.add_argument('--workers', type=int, default=1, help="Processes generating shards (default: 1).")
+    args = parser.parse_args()
 
-df_sales = pd.DataFrame(sales_list)
+    paths = generate_dataset(
+        output_path=args.output, num_sales=args.sales, num_customers=args.customers,
+        num_products=args.products, start_date=args.start_date, num_days=args.days, seed=args.seed,
+        file_format=args.format, chunk_size=args.chunk_size, shards=args.shards, workers=args.workers
+    )
 
-# 5. Exportar a CSV (Raw Layer)
-df_channels.to_csv('data/raw/channels.csv', index=False)
-df_customers.to_csv('data/raw/customers.csv', index=False)
-df_products.to_csv('data/raw/products.csv', index=False)
-df_sales.to_csv('data/raw/sales.csv', index=False)
+    print("✅ Archivos generados exitosamente para GROCERY CHAIN (Grupos 4, 9).")
+    print(f"Total Ventas: {args.sales:,}")
+    print(f"Archivos: {', '.join(paths.values())}")
 
-print("✅ Archivos CSV generados exitosamente para GROCERY CHAIN (Grupos 4, 9).")
-print(f"Total Ventas: {len(df_sales)}")
-print(f"Categorías: {df_products['category'].unique()}")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
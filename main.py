@@ -1,108 +1,501 @@
+import argparse
 import os
 import sys
-from dotenv import load_dotenv
-from sqlalchemy import create_engine, text
-from urllib.parse import quote_plus
+import pandas as pd
 
 # Import ETL stages
-from src.extract import extract_data
-from src.transform import transform_data
-from src.load import load_data
-from src.warehouse import dump_warehouse
+from src.extract import extract_data, extract_data_chunked
+from src.transform import ORPHAN_POLICIES, transform_data, transform_data_chunked, transform_data_parallel
+from src.db import get_db_settings, get_engine
+from src.load import load_data, load_data_chunked, load_data_parallel, load_data_swap
+from src.bulk_load import LOAD_STRATEGIES, DEFAULT_BATCH_SIZE
+from src.incremental import get_watermark
+from src.staging import STAGING_FORMATS
+from src.aggregates import (
+    refresh_aggregates, check_aggregates, invalidate_late_sales, invalidate_late_sales_stream
+)
+from src.ddl import SCHEMA_FILES, apply_schema
+from src.ingest import DEFAULT_READ_WORKERS, mark_ingested, pending_sales_files, resolve_sales_files
+from src.checkpoint import RunCheckpoint, input_fingerprint
+from src.instrumentation import RunReport, stage
+from src.kpi_cache import KpiCache
+from src.money import MONEY_MODES
+from src.scd import SCD_DIMENSIONS, read_dimension_versions
+from src.warehouse import BACKUP_COMPRESSIONS, backup_warehouse, dump_warehouse
 from visualization.kpi_dashboard import create_dashboard
 
-def run_pipeline():
+# Frames produced by the batch Transform stage, in return order
+TRANSFORM_OUTPUTS = ('dim_channel', 'dim_customer', 'dim_product', 'dim_date', 'fact_sale')
+
+def run_pipeline(chunk_size=None, load_strategy='multi_insert', batch_size=DEFAULT_BATCH_SIZE,
+                 full_rebuild=False, workers=1, full_calendar=False, staging_format=None,
+                 rebuild_aggregates=False, check_aggregates_consistency=False, schema='standard',
+                 partition_sale=False, profile=False, trace_memory=False, kpi_cache=True,
+                 background_dashboard=False, backup_compression='gzip', single_dump=False,
+                 orphan_policy='quarantine', transform_workers=1, sales_source=None,
+                 read_workers=DEFAULT_READ_WORKERS, full_refresh=False, money='float', resume=True,
+                 checkpoint_artifacts=False):
     """
     Orchestrates the complete data pipeline:
     Data Gen -> Schema Creation -> Extract -> Transform -> Load -> Visualization.
     
     This function manages the entire workflow, from checking for raw data
     to generating the final visual dashboard.
+
+    Args:
+        chunk_size (int, optional): When set, sales are streamed through
+            Extract -> Transform -> Load in chunks of this many rows, so memory
+            usage is bounded by the chunk size instead of the input size.
+            Defaults to None (batch mode, the whole file in memory).
+        load_strategy (str): Bulk load strategy for the fact table, one of
+            `src.bulk_load.LOAD_STRATEGIES`. Defaults to 'multi_insert'.
+        batch_size (int): Rows per batch for the fact table bulk load.
+        full_rebuild (bool): When True, every warehouse table is dropped and
+            the full history is reloaded. By default the run is incremental:
+            only sales above the persisted watermark are extracted and loaded,
+            and dimension members are upserted.
+        workers (int): Degree of load parallelism. Above 1, dimensions are
+            loaded concurrently and the fact table in parallel `id_sale`
+            ranges over the shared connection pool. Defaults to 1 (serial).
+        full_calendar (bool): When True, the Date dimension covers every day
+            in the sales date range, including days without sales.
+        staging_format (str, optional): 'parquet' or 'arrow'. When set, the raw
+            CSVs are converted once into a typed columnar staging layer
+            (`data/staging`) and later runs extract from it.
+        rebuild_aggregates (bool): Recompute the KPI aggregate tables from the
+            whole fact table instead of folding in only the new sales.
+        check_aggregates_consistency (bool): After refreshing, compare the
+            aggregates against a GROUP BY over the fact table (full scan).
+        schema (str): Physical schema variant: 'standard' (sql/create_tables.sql),
+            'optimized' (narrow `sale` primary key and covering indexes,
+            sql/create_tables_optimized.sql) or 'scd2' (optimized, with SCD
+            Type 2 customer/product dimensions, see `src.scd`; batch mode,
+            serial transform). Switching variants needs a full rebuild.
+        partition_sale (bool): RANGE-partition `sale` by `date_iddate`
+            (sql/partition_sale.sql). This drops the fact Foreign Keys.
+        profile (bool): Dump a cProfile file per stage next to the run report.
+        trace_memory (bool): Record tracemalloc peaks per stage (off by
+            default, it slows the stages down). Each run writes a JSON report
+            with per-stage (and per-table) wall time, CPU time, rows and
+            memory to `data/reports/`.
+        kpi_cache (bool): Let the dashboard reuse cached KPI results while the
+            warehouse version is unchanged.
+        background_dashboard (bool): Fetch the KPIs and render the dashboard
+            in a separate process while the run is finalized. The pipeline
+            waits for it before returning and logs its exit code.
+        backup_compression (str): Compression of the per-table backup
+            ('gzip', 'zstd' or 'none'), see `src.warehouse.backup_warehouse`.
+        single_dump (bool): Write the single, uncompressed
+            `data/warehouse/warehouse_dump.sql` instead of the per-table backup.
+        orphan_policy (str): Handling of sales with unknown product, customer
+            or channel keys ('quarantine', 'unknown' or 'fail').
+        transform_workers (int): Processes used by the batch Transform stage.
+            Above 1, sales are transformed in row partitions by
+            `transform_data_parallel` (ignored in chunked mode). Workers are
+            started with forkserver/spawn, not forked from this threaded process.
+        sales_source (str, optional): Directory or glob of sales shard files
+            (CSV, gzip CSV or Parquet) read instead of data/raw/sales.csv.
+            Shards listed in the ingest manifest are skipped unless
+            `full_rebuild` is set; loaded shards are added to it.
+        read_workers (int): Shard files read concurrently in batch mode.
+        full_refresh (bool): Reload the full history into shadow tables and
+            swap them over the live ones with one atomic `RENAME TABLE`
+            (`load_data_swap`), so the warehouse stays readable throughout.
+            Batch mode only.
+        money (str): 'float' or 'cents'. With 'cents', prices are held as
+            exact int64 cents from extraction to load, see `src.money`.
+        resume (bool): Checkpoint the run (`src.checkpoint`). When the
+            previous run with the same inputs and options failed, this run
+            skips its completed stages and the fact chunks it had committed,
+            extracting the same sales window again.
+        checkpoint_artifacts (bool): Also keep the batch Transform output as
+            Parquet under `data/checkpoints/`, so a resumed run skips Extract
+            and Transform. Off by default: it writes the whole fact table to
+            disk on every run, which costs more than it saves unless
+            transforming is much slower than re-reading the sources.
     """
     print("="*50)
     print("🚀 Starting ETL Pipeline - AbastoYa BI")
     print("="*50)
     
     # 1. Load Configuration
-    load_dotenv(override=True)
-    DB_USER = os.getenv("DB_USER")
-    DB_PASSWORD = os.getenv("DB_PASSWORD")
-    DB_HOST = os.getenv("DB_HOST")
-    DB_PORT = os.getenv("DB_PORT")
-    DB_NAME = os.getenv("DB_NAME")
-    
-    print(f"DEBUG: Connecting as {DB_USER} to {DB_HOST}:{DB_PORT}")
+    settings = get_db_settings()
+    DB_NAME = settings['database']
     
-    # 2. Synthetic Data Generation (Optional, if not exists)
-    if not os.path.exists('data/raw/sales.csv'):
-        print("🛠 Generating synthetic data...")
-        try:
-            import subprocess
-            # Use sys.executable to ensure the correct Python interpreter is used (cross-platform compatibility)
-            subprocess.run([sys.executable, 'data/raw/data_gen.py'], check=True)
-        except Exception as e:
-            print(f"❌ Error generating data: {e}")
-            return
+    print(f"DEBUG: Connecting as {settings['user']} to {settings['host']}:{settings['port']}")
     
-    # 3. Create Database Structure (DDL)
-    print("📋 Executing DDL to prepare schema...")
-    encoded_password = quote_plus(DB_PASSWORD)
-    # Connect without specifying a database first to create it if it doesn't exist
-    engine_init = create_engine(f"mysql+pymysql://{DB_USER}:{encoded_password}@{DB_HOST}:{DB_PORT}/")
-    
-    with open('sql/create_tables.sql', 'r') as f:
-        # Clean comments and split by semicolon
-        sql_content = f.read()
-        sql_commands = [cmd.strip() for cmd in sql_content.split(';') if cmd.strip()]
+    if full_refresh and chunk_size:
+        print("❌ --full-refresh loads whole tables and cannot be combined with --chunk-size. Aborting.")
+        return
+    if schema == 'scd2' and chunk_size:
+        print("❌ The scd2 schema versions the dimensions per batch and cannot be combined with --chunk-size. Aborting.")
+        return
     
-    with engine_init.connect() as conn:
-        conn.execute(text(f"CREATE DATABASE IF NOT EXISTS {DB_NAME}"))
-        conn.execute(text(f"USE {DB_NAME}"))
+    report = RunReport(profile=profile, trace_memory=trace_memory)
+    try:
+        # 2. Synthetic Data Generation (Optional, if not exists)
+        if not sales_source and not os.path.exists('data/raw/sales.csv'):
+            print("🛠 Generating synthetic data...")
+            try:
+                import subprocess
+                # Use sys.executable to ensure the correct Python interpreter is used (cross-platform compatibility)
+                with stage(report, 'data_gen'):
+                    subprocess.run([sys.executable, 'data/raw/data_gen.py'], check=True)
+            except Exception as e:
+                print(f"❌ Error generating data: {e}")
+                return
         
-        # Force table recreation to ensure schema updates
-        print("🧹 Recreating tables to update schema...")
-        conn.execute(text("SET FOREIGN_KEY_CHECKS = 0;"))
-        conn.execute(text("DROP TABLE IF EXISTS sale;"))
-        conn.execute(text("DROP TABLE IF EXISTS customer;"))
-        conn.execute(text("DROP TABLE IF EXISTS product;"))
-        conn.execute(text("DROP TABLE IF EXISTS channel;"))
-        conn.execute(text("DROP TABLE IF EXISTS date;"))
-        conn.execute(text("SET FOREIGN_KEY_CHECKS = 1;"))
+        # Progress of this run, so a failed run resumes where it stopped
+        raw_path = 'data/raw'
+        all_sales_files = resolve_sales_files(sales_source) if sales_source else None
+        checkpoint = None
+        if resume:
+            inputs = [os.path.join(raw_path, f'{name}.csv') for name in ('channels', 'customers', 'products')]
+            inputs += all_sales_files or [os.path.join(raw_path, 'sales.csv')]
+            checkpoint = RunCheckpoint(input_fingerprint(
+                inputs, schema=schema, partition_sale=partition_sale, full_rebuild=full_rebuild,
+                full_refresh=full_refresh, chunk_size=chunk_size, full_calendar=full_calendar,
+                orphan_policy=orphan_policy, money=money, staging_format=staging_format
+            ))
+            if checkpoint.resumed:
+                print(f"♻️ Resuming the previous run of these inputs (run {checkpoint.key[:12]}).")
         
-        for command in sql_commands:
-            # Ignore USE commands as we handle context above
-            if command.upper().startswith("USE"):
-                continue
-            conn.execute(text(command))
+        # 3. Create Database Structure (DDL)
+        if checkpoint and checkpoint.is_done('ddl'):
+            full_rebuild = checkpoint.get('full_rebuild', full_rebuild)
+            print("⏩ Schema already prepared by this run.")
+        else:
+            print("📋 Executing DDL to prepare schema...")
+            with stage(report, 'ddl') as metrics:
+                # Connect without specifying a database first to create it if it doesn't exist
+                engine_init = get_engine(with_database=False)
+                metrics['schema'] = apply_schema(
+                    engine_init, DB_NAME, schema=schema, full_rebuild=full_rebuild, partition_sale=partition_sale
+                )
+            if metrics['schema'] == 'recreated' and not full_rebuild:
+                # A changed DDL left the warehouse empty: reload the full history
+                print("🧹 Warehouse recreated by a schema change, switching to a full rebuild.")
+                full_rebuild = True
+            if checkpoint:
+                checkpoint.set('full_rebuild', full_rebuild)
+                checkpoint.mark_done('ddl')
+            print("✅ Database schema updated.")
         
-        conn.commit()
-    print("✅ Database schema updated.")
+        # Resume from the high-water mark unless a full rebuild was requested
+        engine = get_engine(local_infile=(load_strategy == 'load_data_infile'))
+        after_sale_id = last_date = None
+        full_reload = full_rebuild or full_refresh
+        if not full_reload:
+            if checkpoint and not chunk_size and checkpoint.get('after_sale_id') is not None:
+                # Same extraction window as the interrupted attempt, so its fact chunks line up
+                after_sale_id = checkpoint.get('after_sale_id')
+                last_date = checkpoint.get('last_date')
+                print(f"🔖 Incremental run (resumed): loading sales after id {after_sale_id}.")
+            else:
+                after_sale_id, last_date = get_watermark(engine)
+                print(f"🔖 Incremental run: loading sales after id {after_sale_id} (last date key: {last_date}).")
+                if checkpoint and not chunk_size:
+                    checkpoint.set('after_sale_id', after_sale_id)
+                    checkpoint.set('last_date', last_date)
+        # Dimension rows may already be in place when resuming: upsert them
+        incremental = not full_rebuild or (checkpoint is not None and checkpoint.resumed)
+        checkpoint_key = checkpoint.key if checkpoint else None
 
-    # 4. EXTRACTION
-    raw_path = 'data/raw'
-    df_chan, df_cust, df_prod, df_sales = extract_data(raw_path)
-    
-    if df_sales is None:
-        print("❌ Error in extraction phase. Aborting.")
-        return
+        # 4-6. EXTRACT -> TRANSFORM -> LOAD
+        sales_files = all_sales_files
+        if sales_files and not full_reload:
+            new_files = pending_sales_files(sales_files)
+            print(f"🗂 {len(new_files)} of {len(sales_files)} sales file(s) not ingested yet.")
+            sales_files = new_files
+        if checkpoint and checkpoint.is_done('load'):
+            print("⏩ Extract, transform and load already completed by this run.")
+        elif chunk_size:
+            # Streaming mode: sales are never fully materialized. Sales chunks are
+            # extracted and transformed lazily, inside the 'load' stage.
+            with stage(report, 'extract'):
+                df_chan, df_cust, df_prod, sales_chunks = extract_data_chunked(
+                    raw_path, chunk_size, after_sale_id=after_sale_id, staging_format=staging_format,
+                    sales_files=sales_files, money=money
+                )
+            
+            if sales_chunks is None:
+                print("❌ Error in extraction phase. Aborting.")
+                return
+            
+            with stage(report, 'transform'):
+                dim_channel, dim_customer, dim_product, fact_stream = transform_data_chunked(
+                    df_chan, df_cust, df_prod, sales_chunks, full_calendar=full_calendar,
+                    orphan_policy=orphan_policy
+                )
+            if sales_files:
+                # Shards are not filtered by the watermark: late sales reset the aggregates they fall under
+                fact_stream = invalidate_late_sales_stream(engine, fact_stream, after_sale_id)
+            with stage(report, 'load'):
+                # The watermark advances per chunk, so a rerun resumes after the last one
+                load_data_chunked(
+                    dim_channel, dim_customer, dim_product, fact_stream,
+                    strategy=load_strategy, batch_size=batch_size,
+                    incremental=incremental, workers=workers, engine=engine, report=report
+                )
+        else:
+            cached = None
+            if checkpoint and checkpoint_artifacts:
+                cached = checkpoint.load_frames('transform', TRANSFORM_OUTPUTS)
+            if cached is not None:
+                dim_channel, dim_customer, dim_product, dim_date, fact_sale = cached
+                print(f"⏩ Reusing the transformed data of this run ({len(fact_sale)} sales).")
+            else:
+                # 4. EXTRACTION
+                with stage(report, 'extract') as metrics:
+                    df_chan, df_cust, df_prod, df_sales = extract_data(
+                        raw_path, after_sale_id=after_sale_id, staging_format=staging_format,
+                        sales_files=sales_files, read_workers=read_workers, money=money
+                    )
+                    metrics['rows_out'] = len(df_sales) if df_sales is not None else 0
+                
+                if df_sales is None:
+                    print("❌ Error in extraction phase. Aborting.")
+                    return
 
-    # 5. TRANSFORMATION
-    dim_channel, dim_customer, dim_product, dim_date, fact_sale = transform_data(
-        df_chan, df_cust, df_prod, df_sales
-    )
+                # Stored dimension versions, compared against the source members
+                dimension_versions = effective_date = None
+                if schema == 'scd2':
+                    dimension_versions = {
+                        dimension: read_dimension_versions(engine, dimension, money=money)
+                        for dimension in SCD_DIMENSIONS
+                    }
+                    if last_date:
+                        # Changes apply after the last loaded day; late-arriving sales keep the old version
+                        effective_date = pd.Timestamp(str(last_date)) + pd.Timedelta(days=1)
 
-    # 6. LOAD
-    load_data(dim_channel, dim_customer, dim_product, dim_date, fact_sale)
+                # 5. TRANSFORMATION
+                with stage(report, 'transform', rows_in=len(df_sales)) as metrics:
+                    if dimension_versions is not None:
+                        if transform_workers > 1:
+                            print("⚠️ The scd2 schema transforms serially; --transform-workers is ignored.")
+                        dim_channel, dim_customer, dim_product, dim_date, fact_sale = transform_data(
+                            df_chan, df_cust, df_prod, df_sales, full_calendar=full_calendar,
+                            orphan_policy=orphan_policy, dimension_versions=dimension_versions,
+                            effective_date=effective_date
+                        )
+                    elif transform_workers > 1:
+                        dim_channel, dim_customer, dim_product, dim_date, fact_sale = transform_data_parallel(
+                            df_chan, df_cust, df_prod, df_sales, workers=transform_workers,
+                            full_calendar=full_calendar, orphan_policy=orphan_policy
+                        )
+                    else:
+                        dim_channel, dim_customer, dim_product, dim_date, fact_sale = transform_data(
+                            df_chan, df_cust, df_prod, df_sales, full_calendar=full_calendar,
+                            orphan_policy=orphan_policy
+                        )
+                    metrics['rows_out'] = len(fact_sale)
+                    metrics['orphans'] = fact_sale.attrs.get('orphans', {})
+                if checkpoint and checkpoint_artifacts:
+                    checkpoint.save_frames('transform', dict(zip(
+                        TRANSFORM_OUTPUTS, (dim_channel, dim_customer, dim_product, dim_date, fact_sale)
+                    )))
 
-    # 7. BACKUP (Warehouse Dump)
-    dump_warehouse()
+            # 6. LOAD
+            if sales_files:
+                # Shards are not filtered by the watermark: late sales reset the aggregates they fall under
+                invalidate_late_sales(engine, fact_sale, after_sale_id)
+            with stage(report, 'load', rows_in=len(fact_sale)) as metrics:
+                if full_refresh:
+                    load_data_swap(
+                        dim_channel, dim_customer, dim_product, dim_date, fact_sale,
+                        workers=workers, strategy=load_strategy, batch_size=batch_size,
+                        engine=engine, report=report
+                    )
+                elif workers > 1:
+                    load_data_parallel(
+                        dim_channel, dim_customer, dim_product, dim_date, fact_sale,
+                        workers=workers, strategy=load_strategy, batch_size=batch_size,
+                        incremental=incremental, engine=engine, report=report, checkpoint_key=checkpoint_key
+                    )
+                else:
+                    load_data(
+                        dim_channel, dim_customer, dim_product, dim_date, fact_sale,
+                        strategy=load_strategy, batch_size=batch_size,
+                        incremental=incremental, engine=engine, report=report, checkpoint_key=checkpoint_key
+                    )
+                metrics['rows_out'] = len(fact_sale)
 
-    # 8. VISUALIZATION (Dashboard)
-    create_dashboard()
+        if not (checkpoint and checkpoint.is_done('load')):
+            # Shards are only recorded once their rows are in the warehouse
+            if sales_files:
+                mark_ingested(sales_files)
+            if checkpoint:
+                checkpoint.mark_done('load')
 
-    print("="*50)
-    print("🎉 Pipeline finished successfully.")
-    print("="*50)
+        # 6b. KPI AGGREGATES (incremental refresh from the newly loaded sales)
+        if not (checkpoint and checkpoint.is_done('aggregates')):
+            with stage(report, 'aggregates') as metrics:
+                # A swapped-in warehouse needs its aggregates recomputed from scratch
+                metrics['rows_in'] = refresh_aggregates(engine, rebuild=rebuild_aggregates or full_refresh)
+                if check_aggregates_consistency:
+                    metrics['mismatches'] = check_aggregates(engine)
+            if checkpoint:
+                checkpoint.mark_done('aggregates')
+
+        # 7. BACKUP (parallel, compressed per-table dumps)
+        if not (checkpoint and checkpoint.is_done('backup')):
+            with stage(report, 'backup'):
+                if single_dump:
+                    dump_warehouse()
+                else:
+                    backup_warehouse(compression=backup_compression)
+            if checkpoint:
+                checkpoint.mark_done('backup')
+
+        # 8. VISUALIZATION (Dashboard)
+        # The warehouse changed: the dashboard must read its version again
+        KpiCache().forget_version()
+        with stage(report, 'dashboard'):
+            dashboard_process = create_dashboard(use_cache=kpi_cache, background=background_dashboard)
+
+        if checkpoint:
+            # Finished: the next run starts from scratch
+            checkpoint.complete(engine)
+
+        if dashboard_process is not None:
+            with stage(report, 'dashboard_wait') as metrics:
+                dashboard_process.join()
+                metrics['exitcode'] = dashboard_process.exitcode
+            if dashboard_process.exitcode != 0:
+                print(f"⚠️ The background dashboard failed (exit code {dashboard_process.exitcode}).")
+            else:
+                print("✅ Background dashboard finished.")
+
+        print("="*50)
+        print("🎉 Pipeline finished successfully.")
+        print("="*50)
+    except Exception:
+        # A failed run may have committed part of its load
+        KpiCache().forget_version()
+        raise
+    finally:
+        # Written for failed runs too, so the failing stage is visible
+        report.write()
 
 if __name__ == "__main__":
-    run_pipeline()
+    parser = argparse.ArgumentParser(description="AbastoYa BI - ETL Pipeline")
+    parser.add_argument(
+        '--chunk-size', type=int, default=None,
+        help="Stream sales.csv in chunks of this many rows instead of loading it all in memory."
+    )
+    parser.add_argument(
+        '--load-strategy', choices=LOAD_STRATEGIES, default='multi_insert',
+        help="Bulk load strategy for the fact table (default: multi_insert)."
+    )
+    parser.add_argument(
+        '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+        help=f"Rows per batch for the fact table bulk load (default: {DEFAULT_BATCH_SIZE})."
+    )
+    parser.add_argument(
+        '--full-rebuild', action='store_true',
+        help="Drop and recreate every table and reload the full history instead of loading incrementally."
+    )
+    parser.add_argument(
+        '--full-refresh', action='store_true',
+        help="Reload the full history into shadow tables and swap them in atomically, "
+             "keeping the warehouse readable during the load (batch mode only)."
+    )
+    parser.add_argument(
+        '--money', choices=MONEY_MODES, default='float',
+        help="Money arithmetic: float64 (default) or exact int64 cents from extraction to load."
+    )
+    parser.add_argument(
+        '--no-resume', action='store_true',
+        help="Start over instead of resuming a failed run with the same inputs."
+    )
+    parser.add_argument(
+        '--checkpoint-artifacts', action='store_true',
+        help="Keep the transformed frames as Parquet so a resumed run skips Extract and Transform."
+    )
+    parser.add_argument(
+        '--workers', type=int, default=1,
+        help="Parallel connections used to load dimensions and fact partitions (default: 1, serial)."
+    )
+    parser.add_argument(
+        '--full-calendar', action='store_true',
+        help="Build the date dimension as a continuous calendar instead of only days with sales."
+    )
+    parser.add_argument(
+        '--staging', choices=STAGING_FORMATS, default=None,
+        help="Extract from a typed columnar staging layer (requires pyarrow) instead of the raw CSVs."
+    )
+    parser.add_argument(
+        '--rebuild-aggregates', action='store_true',
+        help="Recompute the KPI aggregate tables from the whole fact table."
+    )
+    parser.add_argument(
+        '--check-aggregates', action='store_true',
+        help="Verify the KPI aggregate tables against the fact table after refreshing them."
+    )
+    parser.add_argument(
+        '--schema', choices=list(SCHEMA_FILES), default='standard',
+        help="Physical schema variant to create (default: standard)."
+    )
+    parser.add_argument(
+        '--partition-sale', action='store_true',
+        help="RANGE-partition the sale table by date_iddate (drops its Foreign Keys)."
+    )
+    parser.add_argument(
+        '--profile', action='store_true',
+        help="Dump a cProfile .prof file per stage into data/reports/."
+    )
+    parser.add_argument(
+        '--trace-memory', action='store_true',
+        help="Record tracemalloc allocation peaks per stage in the run report (slows the stages down)."
+    )
+    parser.add_argument(
+        '--no-kpi-cache', action='store_true',
+        help="Always run the dashboard KPI queries instead of reusing cached results."
+    )
+    parser.add_argument(
+        '--background-dashboard', action='store_true',
+        help="Fetch the KPIs and render the dashboard in a background process while the run is finalized."
+    )
+    parser.add_argument(
+        '--backup-compression', choices=tuple(BACKUP_COMPRESSIONS), default='gzip',
+        help="Compression of the per-table warehouse backup (default: gzip)."
+    )
+    parser.add_argument(
+        '--single-dump', action='store_true',
+        help="Write one uncompressed warehouse_dump.sql instead of the per-table backup."
+    )
+    parser.add_argument(
+        '--orphan-policy', choices=ORPHAN_POLICIES, default='quarantine',
+        help="Sales with unknown product/customer/channel keys: quarantine them to "
+             "data/quarantine/ (default), map them to an 'Unknown' member, or fail."
+    )
+    parser.add_argument(
+        '--sales-source', default=None,
+        help="Directory or glob of sales files (CSV, .csv.gz or Parquet) to read instead of "
+             "data/raw/sales.csv. Files already ingested are skipped."
+    )
+    parser.add_argument(
+        '--read-workers', type=int, default=DEFAULT_READ_WORKERS,
+        help=f"Sales files read concurrently (default: {DEFAULT_READ_WORKERS})."
+    )
+    parser.add_argument(
+        '--transform-workers', type=int, default=1,
+        help="Processes used to transform sales in row partitions (default: 1, serial). Workers start "
+             "with forkserver/spawn, so each imports the code and receives its partition pickled; "
+             "worth it only for large sales inputs."
+    )
+    args = parser.parse_args()
+    
+    run_pipeline(
+        chunk_size=args.chunk_size, load_strategy=args.load_strategy, batch_size=args.batch_size,
+        full_rebuild=args.full_rebuild, workers=args.workers, full_calendar=args.full_calendar,
+        staging_format=args.staging, rebuild_aggregates=args.rebuild_aggregates,
+        check_aggregates_consistency=args.check_aggregates, schema=args.schema,
+        partition_sale=args.partition_sale, profile=args.profile, trace_memory=args.trace_memory,
+        kpi_cache=not args.no_kpi_cache, background_dashboard=args.background_dashboard,
+        backup_compression=args.backup_compression, single_dump=args.single_dump,
+        orphan_policy=args.orphan_policy, transform_workers=args.transform_workers,
+        sales_source=args.sales_source, read_workers=args.read_workers, full_refresh=args.full_refresh,
+        money=args.money, resume=not args.no_resume,
+        checkpoint_artifacts=args.checkpoint_artifacts
+    )
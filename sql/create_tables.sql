@@ -53,6 +53,9 @@ CREATE TABLE IF NOT EXISTS `date` (
   `month` TINYINT(2) NOT NULL,    -- Month number (1-12)
   `year` INT NOT NULL,            -- 4-digit Year
   `quarter` TINYINT(1) NOT NULL,  -- Quarter (1-4)
+  `weekday` TINYINT(1) NOT NULL,  -- ISO day of week (1 = Monday ... 7 = Sunday)
+  `iso_week` TINYINT(2) NOT NULL, -- ISO week number (1-53)
+  `is_weekend` TINYINT(1) NOT NULL, -- 1 for Saturday/Sunday, else 0
   PRIMARY KEY (`id_date`))
 ENGINE = InnoDB;
 
@@ -92,3 +95,73 @@ CREATE TABLE IF NOT EXISTS `sale` (
     FOREIGN KEY (`date_iddate`)
     REFERENCES `date` (`id_date`))
 ENGINE = InnoDB;
+
+
+-- -----------------------------------------------------
+-- Table `etl_watermark` (ETL Control)
+-- -----------------------------------------------------
+-- Persists the high-water mark of each fact table so incremental runs only
+-- extract and load rows newer than what the warehouse already holds.
+CREATE TABLE IF NOT EXISTS `etl_watermark` (
+  `table_name` VARCHAR(45) NOT NULL, -- Fact table the mark belongs to
+  `last_id` INT NOT NULL,            -- Highest transaction ID loaded
+  `last_date` INT NULL,              -- Highest date key loaded (YYYYMMDD)
+  `updated_at` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  PRIMARY KEY (`table_name`))
+ENGINE = InnoDB;
+
+
+-- =========================================================
+-- KPI Aggregate Tables (Materialized Aggregates)
+-- =========================================================
+-- Pre-aggregated totals at the grain of each dashboard KPI.
+-- They are refreshed incrementally by the ETL after every load
+-- (see src/aggregates.py), so the dashboard never scans `sale`.
+
+-- -----------------------------------------------------
+-- Table `agg_sales_category` (Aggregate)
+-- -----------------------------------------------------
+CREATE TABLE IF NOT EXISTS `agg_sales_category` (
+  `category` VARCHAR(45) NOT NULL,         -- Product category
+  `sales_volume` BIGINT NOT NULL,          -- SUM(quantity)
+  `revenue` DECIMAL(18,2) NOT NULL,        -- SUM(total_amount)
+  `profit` DECIMAL(18,2) NOT NULL,         -- SUM(profit)
+  PRIMARY KEY (`category`))
+ENGINE = InnoDB;
+
+
+-- -----------------------------------------------------
+-- Table `agg_sales_channel` (Aggregate)
+-- -----------------------------------------------------
+CREATE TABLE IF NOT EXISTS `agg_sales_channel` (
+  `channel` VARCHAR(100) NOT NULL,         -- Channel name
+  `sales_volume` BIGINT NOT NULL,
+  `revenue` DECIMAL(18,2) NOT NULL,
+  `profit` DECIMAL(18,2) NOT NULL,
+  PRIMARY KEY (`channel`))
+ENGINE = InnoDB;
+
+
+-- -----------------------------------------------------
+-- Table `agg_sales_month` (Aggregate)
+-- -----------------------------------------------------
+CREATE TABLE IF NOT EXISTS `agg_sales_month` (
+  `year` INT NOT NULL,                     -- 4-digit Year
+  `month` TINYINT(2) NOT NULL,             -- Month number (1-12)
+  `sales_volume` BIGINT NOT NULL,
+  `revenue` DECIMAL(18,2) NOT NULL,
+  `profit` DECIMAL(18,2) NOT NULL,
+  PRIMARY KEY (`year`, `month`))
+ENGINE = InnoDB;
+
+
+-- -----------------------------------------------------
+-- Table `agg_sales_brand` (Aggregate)
+-- -----------------------------------------------------
+CREATE TABLE IF NOT EXISTS `agg_sales_brand` (
+  `brand` VARCHAR(45) NOT NULL,            -- Brand manufacturer
+  `sales_volume` BIGINT NOT NULL,
+  `revenue` DECIMAL(18,2) NOT NULL,
+  `profit` DECIMAL(18,2) NOT NULL,
+  PRIMARY KEY (`brand`))
+ENGINE = InnoDB;
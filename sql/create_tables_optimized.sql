@@ -0,0 +1,185 @@
+-- =========================================================
+-- DDL for Dimensional Data Warehouse (Star Schema)
+-- Optimized physical schema (python3 main.py --schema optimized)
+-- Lab 3 - ETL & BI
+-- =========================================================
+
+-- -----------------------------------------------------
+-- Table `customer` (Dimension)
+-- -----------------------------------------------------
+-- Stores demographic information about customers.
+CREATE TABLE IF NOT EXISTS `customer` (
+  `id_customer` INT NOT NULL,     -- Surrogate Key (matches source ID)
+  `name` VARCHAR(100) NOT NULL,   -- Full customer name
+  `city` VARCHAR(45) NOT NULL,    -- City of residence
+  `country` VARCHAR(45) NOT NULL, -- Country
+  `age` INT NOT NULL,             -- Customer age
+  PRIMARY KEY (`id_customer`))
+ENGINE = InnoDB;
+
+
+-- -----------------------------------------------------
+-- Table `product` (Dimension)
+-- -----------------------------------------------------
+-- Stores product catalog details including costs and prices.
+CREATE TABLE IF NOT EXISTS `product` (
+  `id_product` INT NOT NULL,        -- Surrogate Key (matches source ID)
+  `name` VARCHAR(100) NOT NULL,     -- Product name
+  `category` VARCHAR(45) NOT NULL,  -- Product category
+  `brand` VARCHAR(45) NOT NULL,     -- Brand manufacturer
+  `unit_price` DECIMAL(10,2) NOT NULL, -- List price
+  `unit_cost` DECIMAL(10,2) NOT NULL,  -- Acquisition cost
+  PRIMARY KEY (`id_product`))
+ENGINE = InnoDB;
+
+
+-- -----------------------------------------------------
+-- Table `channel` (Dimension)
+-- -----------------------------------------------------
+-- Captures the sales channel (e.g., Physical Store vs. Online).
+CREATE TABLE IF NOT EXISTS `channel` (
+  `id_channel` INT NOT NULL,        -- Surrogate Key (matches source ID)
+  `channel` VARCHAR(100) NOT NULL,  -- Channel name
+  PRIMARY KEY (`id_channel`))
+ENGINE = InnoDB;
+
+
+-- -----------------------------------------------------
+-- Table `date` (Dimension)
+-- -----------------------------------------------------
+-- A dedicated time dimension for temporal analysis.
+CREATE TABLE IF NOT EXISTS `date` (
+  `id_date` INT NOT NULL,         -- Surrogate Key (YYYYMMDD)
+  `day` TINYINT(2) NOT NULL,      -- Day of month (1-31)
+  `month` TINYINT(2) NOT NULL,    -- Month number (1-12)
+  `year` INT NOT NULL,            -- 4-digit Year
+  `quarter` TINYINT(1) NOT NULL,  -- Quarter (1-4)
+  `weekday` TINYINT(1) NOT NULL,  -- ISO day of week (1 = Monday ... 7 = Sunday)
+  `iso_week` TINYINT(2) NOT NULL, -- ISO week number (1-53)
+  `is_weekend` TINYINT(1) NOT NULL, -- 1 for Saturday/Sunday, else 0
+  PRIMARY KEY (`id_date`))
+ENGINE = InnoDB;
+
+
+-- -----------------------------------------------------
+-- Table `sale` (Fact Table) - Optimized physical design
+-- -----------------------------------------------------
+-- The central fact table storing quantitative transactional data.
+-- It links to all dimensions via Foreign Keys.
+--
+-- Differences with sql/create_tables.sql:
+--   * Narrow primary key on `id_sale`. InnoDB copies the PK into every
+--     secondary index, so a 4-byte key keeps them small and inserts cheap.
+--   * Covering secondary indexes for the KPI access paths in sql/queries.sql,
+--     so the GROUP BY queries read the index only, never the clustered rows.
+--     They also serve the Foreign Keys (leading column).
+CREATE TABLE IF NOT EXISTS `sale` (
+  `id_sale` INT NOT NULL,           -- Transaction Identifier
+  `quantity` INT NOT NULL,          -- Units sold
+  `unit_price_sale` DECIMAL(10,2) NOT NULL, -- Actual sale price per unit
+  `total_amount` DECIMAL(10,2) NOT NULL,    -- Total Revenue (Qty * Price)
+  `profit` DECIMAL(10,2) NOT NULL,          -- Net Profit (Revenue - Cost)
+  
+  -- Foreign Keys
+  `customer_idcustomer` INT NOT NULL,
+  `product_idproduct` INT NOT NULL,
+  `channel_idchannel` INT NOT NULL,
+  `date_iddate` INT NOT NULL,
+  
+  -- Primary Key (Narrow)
+  PRIMARY KEY (`id_sale`),
+  
+  -- Covering Indexes for the KPI queries
+  -- Queries 1 & 4: revenue/volume/profit by product category and brand
+  INDEX `idx_sale_product_date` (`product_idproduct`, `date_iddate`, `quantity`, `total_amount`, `profit`),
+  -- Query 2: revenue by channel
+  INDEX `idx_sale_channel_date` (`channel_idchannel`, `date_iddate`, `total_amount`),
+  -- Query 3: monthly revenue and profit
+  INDEX `idx_sale_date` (`date_iddate`, `total_amount`, `profit`),
+  -- Customer Foreign Key lookups
+  INDEX `idx_sale_customer` (`customer_idcustomer`),
+  
+  -- Referential Integrity Constraints
+  CONSTRAINT `fk_sale_customer`
+    FOREIGN KEY (`customer_idcustomer`)
+    REFERENCES `customer` (`id_customer`),
+  CONSTRAINT `fk_sale_product1`
+    FOREIGN KEY (`product_idproduct`)
+    REFERENCES `product` (`id_product`),
+  CONSTRAINT `fk_sale_channel1`
+    FOREIGN KEY (`channel_idchannel`)
+    REFERENCES `channel` (`id_channel`),
+  CONSTRAINT `fk_sale_date1`
+    FOREIGN KEY (`date_iddate`)
+    REFERENCES `date` (`id_date`))
+ENGINE = InnoDB;
+
+
+-- -----------------------------------------------------
+-- Table `etl_watermark` (ETL Control)
+-- -----------------------------------------------------
+-- Persists the high-water mark of each fact table so incremental runs only
+-- extract and load rows newer than what the warehouse already holds.
+CREATE TABLE IF NOT EXISTS `etl_watermark` (
+  `table_name` VARCHAR(45) NOT NULL, -- Fact table the mark belongs to
+  `last_id` INT NOT NULL,            -- Highest transaction ID loaded
+  `last_date` INT NULL,              -- Highest date key loaded (YYYYMMDD)
+  `updated_at` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  PRIMARY KEY (`table_name`))
+ENGINE = InnoDB;
+
+
+-- =========================================================
+-- KPI Aggregate Tables (Materialized Aggregates)
+-- =========================================================
+-- Pre-aggregated totals at the grain of each dashboard KPI.
+-- They are refreshed incrementally by the ETL after every load
+-- (see src/aggregates.py), so the dashboard never scans `sale`.
+
+-- -----------------------------------------------------
+-- Table `agg_sales_category` (Aggregate)
+-- -----------------------------------------------------
+CREATE TABLE IF NOT EXISTS `agg_sales_category` (
+  `category` VARCHAR(45) NOT NULL,         -- Product category
+  `sales_volume` BIGINT NOT NULL,          -- SUM(quantity)
+  `revenue` DECIMAL(18,2) NOT NULL,        -- SUM(total_amount)
+  `profit` DECIMAL(18,2) NOT NULL,         -- SUM(profit)
+  PRIMARY KEY (`category`))
+ENGINE = InnoDB;
+
+
+-- -----------------------------------------------------
+-- Table `agg_sales_channel` (Aggregate)
+-- -----------------------------------------------------
+CREATE TABLE IF NOT EXISTS `agg_sales_channel` (
+  `channel` VARCHAR(100) NOT NULL,         -- Channel name
+  `sales_volume` BIGINT NOT NULL,
+  `revenue` DECIMAL(18,2) NOT NULL,
+  `profit` DECIMAL(18,2) NOT NULL,
+  PRIMARY KEY (`channel`))
+ENGINE = InnoDB;
+
+
+-- -----------------------------------------------------
+-- Table `agg_sales_month` (Aggregate)
+-- -----------------------------------------------------
+CREATE TABLE IF NOT EXISTS `agg_sales_month` (
+  `year` INT NOT NULL,                     -- 4-digit Year
+  `month` TINYINT(2) NOT NULL,             -- Month number (1-12)
+  `sales_volume` BIGINT NOT NULL,
+  `revenue` DECIMAL(18,2) NOT NULL,
+  `profit` DECIMAL(18,2) NOT NULL,
+  PRIMARY KEY (`year`, `month`))
+ENGINE = InnoDB;
+
+
+-- -----------------------------------------------------
+-- Table `agg_sales_brand` (Aggregate)
+-- -----------------------------------------------------
+CREATE TABLE IF NOT EXISTS `agg_sales_brand` (
+  `brand` VARCHAR(45) NOT NULL,            -- Brand manufacturer
+  `sales_volume` BIGINT NOT NULL,
+  `revenue` DECIMAL(18,2) NOT NULL,
+  `profit` DECIMAL(18,2) NOT NULL,
+  PRIMARY KEY (`brand`))
+ENGINE = InnoDB;
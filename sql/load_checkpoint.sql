@@ -0,0 +1,14 @@
+-- =========================================================
+-- Fact load checkpoints (ETL Control)
+-- =========================================================
+-- Fact chunks committed by the current run. A failed run that is started
+-- again with the same inputs skips these chunks (see src/checkpoint.py).
+CREATE TABLE IF NOT EXISTS `etl_load_checkpoint` (
+  `run_key` CHAR(64) NOT NULL,  -- Fingerprint of the run inputs
+  `chunk_no` INT NOT NULL,      -- Position of the chunk in the sorted fact rows
+  `first_id` INT NOT NULL,      -- Lowest id_sale of the chunk
+  `last_id` INT NOT NULL,       -- Highest id_sale of the chunk
+  `row_count` INT NOT NULL,     -- Rows committed
+  `loaded_at` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (`run_key`, `chunk_no`))
+ENGINE = InnoDB;
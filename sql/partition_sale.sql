@@ -0,0 +1,40 @@
+-- =========================================================
+-- Optional RANGE partitioning of the `sale` fact table
+-- Lab 3 - ETL & BI
+-- Applied once by `python3 main.py --partition-sale`.
+-- =========================================================
+-- Partitioning by `date_iddate` (YYYYMMDD) lets MySQL prune every partition
+-- outside a date filter and makes archiving a quarter a metadata operation
+-- (ALTER TABLE ... DROP/EXCHANGE PARTITION).
+--
+-- MySQL restrictions that shape this script:
+--   * Partitioned InnoDB tables cannot have Foreign Keys, so they are dropped.
+--     Referential integrity is then guaranteed by the ETL, which always loads
+--     the dimensions before the facts.
+--   * Every unique key must contain the partitioning column, so the primary
+--     key becomes (`id_sale`, `date_iddate`).
+-- Extend the partition list (REORGANIZE PARTITION p_future) as time goes on.
+
+ALTER TABLE `sale`
+  DROP FOREIGN KEY `fk_sale_customer`,
+  DROP FOREIGN KEY `fk_sale_product1`,
+  DROP FOREIGN KEY `fk_sale_channel1`,
+  DROP FOREIGN KEY `fk_sale_date1`;
+
+ALTER TABLE `sale`
+  DROP PRIMARY KEY,
+  ADD PRIMARY KEY (`id_sale`, `date_iddate`);
+
+ALTER TABLE `sale`
+  PARTITION BY RANGE (`date_iddate`) (
+    PARTITION p_history VALUES LESS THAN (20250101),
+    PARTITION p2025q1 VALUES LESS THAN (20250401),
+    PARTITION p2025q2 VALUES LESS THAN (20250701),
+    PARTITION p2025q3 VALUES LESS THAN (20251001),
+    PARTITION p2025q4 VALUES LESS THAN (20260101),
+    PARTITION p2026q1 VALUES LESS THAN (20260401),
+    PARTITION p2026q2 VALUES LESS THAN (20260701),
+    PARTITION p2026q3 VALUES LESS THAN (20261001),
+    PARTITION p2026q4 VALUES LESS THAN (20270101),
+    PARTITION p_future VALUES LESS THAN MAXVALUE
+  );
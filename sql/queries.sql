@@ -2,6 +2,8 @@
 -- Business Intelligence SQL Queries
 -- Lab 3 - ETL & BI
 -- These queries correspond to the business questions defined in the requirements.
+-- The dashboard answers them from the aggregate tables
+-- (sql/queries_aggregates.sql) when those are up to date.
 -- =========================================================
 
 -- ---------------------------------------------------------
@@ -0,0 +1,44 @@
+-- =========================================================
+-- Business Intelligence SQL Queries (Aggregate Tables)
+-- Lab 3 - ETL & BI
+-- Same four KPIs as sql/queries.sql, answered from the
+-- pre-aggregated tables maintained by the ETL instead of
+-- scanning the `sale` fact table. Result columns match.
+-- =========================================================
+
+-- ---------------------------------------------------------
+-- Query 1: Sales Volume and Revenue by Product Category
+-- ---------------------------------------------------------
+SELECT category, 
+       sales_volume, 
+       revenue
+FROM agg_sales_category
+ORDER BY revenue DESC;
+
+-- ---------------------------------------------------------
+-- Query 2: Revenue by Sales Channel
+-- ---------------------------------------------------------
+SELECT channel, 
+       revenue
+FROM agg_sales_channel
+ORDER BY revenue DESC;
+
+-- ---------------------------------------------------------
+-- Query 3: Monthly Sales Trend (Revenue & Profit)
+-- ---------------------------------------------------------
+-- Months of different years are combined, as in sql/queries.sql.
+SELECT month, 
+       SUM(revenue) AS revenue,
+       SUM(profit) AS profit
+FROM agg_sales_month
+GROUP BY month
+ORDER BY month;
+
+-- ---------------------------------------------------------
+-- Query 4: Most Profitable Brands (Top 10)
+-- ---------------------------------------------------------
+SELECT brand, 
+       profit AS total_profit
+FROM agg_sales_brand
+ORDER BY total_profit DESC
+LIMIT 10;
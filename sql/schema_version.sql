@@ -0,0 +1,13 @@
+-- =========================================================
+-- Schema version (ETL Control)
+-- =========================================================
+-- Hash of the warehouse DDL last applied. `src.ddl.apply_schema` compares it
+-- with the current DDL file and only re-creates the tables when it changed.
+CREATE TABLE IF NOT EXISTS `etl_schema_version` (
+  `component` VARCHAR(45) NOT NULL,    -- Versioned part of the database (warehouse)
+  `schema_name` VARCHAR(45) NOT NULL,  -- Schema variant applied (standard, optimized)
+  `schema_file` VARCHAR(255) NOT NULL, -- DDL file the hash was computed from
+  `ddl_hash` CHAR(64) NOT NULL,        -- SHA-256 of the normalized DDL statements
+  `applied_at` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  PRIMARY KEY (`component`))
+ENGINE = InnoDB;
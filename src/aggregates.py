@@ -0,0 +1,272 @@
+import pandas as pd
+from sqlalchemy import bindparam, inspect, text
+from src.incremental import WATERMARK_TABLE, read_watermark, advance_watermark
+
+# Aggregate table -> (grouping columns, SELECT expressions, join clause)
+AGGREGATES = {
+    'agg_sales_category': (
+        ['category'],
+        ['p.category'],
+        "JOIN product p ON s.product_idproduct = p.id_product",
+    ),
+    'agg_sales_channel': (
+        ['channel'],
+        ['c.channel'],
+        "JOIN channel c ON s.channel_idchannel = c.id_channel",
+    ),
+    'agg_sales_month': (
+        ['year', 'month'],
+        ['d.year', 'd.month'],
+        "JOIN date d ON s.date_iddate = d.id_date",
+    ),
+    'agg_sales_brand': (
+        ['brand'],
+        ['p.brand'],
+        "JOIN product p ON s.product_idproduct = p.id_product",
+    ),
+}
+
+MEASURES = ['sales_volume', 'revenue', 'profit']
+
+# Aggregate table -> (dimension it groups by, dimension key). Each aggregate has
+# its own watermark entry (named after the table) recording how far it has been
+# refreshed; a changed grouping attribute of an existing member resets it.
+AGGREGATE_DIMENSIONS = {
+    'agg_sales_category': ('product', 'id_product'),
+    'agg_sales_channel': ('channel', 'id_channel'),
+    'agg_sales_month': ('date', 'id_date'),
+    'agg_sales_brand': ('product', 'id_product'),
+}
+
+def refresh_aggregates(engine, rebuild=False):
+    """
+    Brings the KPI aggregate tables up to date with the `sale` fact table.
+
+    Only the fact rows loaded since an aggregate's previous refresh (between
+    its own watermark and the fact watermark) are grouped and added to the
+    existing totals with `INSERT ... SELECT ... ON DUPLICATE KEY UPDATE`, so
+    the cost follows the size of the load, not of the history. An aggregate
+    without a watermark (first refresh, or reset by
+    `invalidate_changed_aggregates` after a dimension change) is emptied and
+    recomputed from the whole fact table. Everything runs in one transaction
+    together with the watermark moves, so a failed refresh is simply retried
+    on the next run.
+
+    Args:
+        engine (sqlalchemy.engine.Engine): Warehouse engine.
+        rebuild (bool): When True, every aggregate is emptied and recomputed
+            from the whole fact table.
+
+    Returns:
+        int: Number of fact rows folded into the aggregates (the largest
+            range any aggregate read).
+    """
+    print("📊 Refreshing KPI aggregate tables...")
+
+    with engine.begin() as conn:
+        upper_id, upper_date = read_watermark(conn, 'sale')
+        lower_ids = {
+            table_name: 0 if rebuild else read_watermark(conn, table_name)[0]
+            for table_name in AGGREGATES
+        }
+        if upper_id <= min(lower_ids.values()) and all(lower_ids.values()):
+            print("✅ KPI aggregates already up to date.")
+            return 0
+
+        for table_name, (columns, expressions, join) in AGGREGATES.items():
+            lower_id = lower_ids[table_name]
+            if lower_id == 0:
+                conn.execute(text(f"DELETE FROM {table_name}"))
+                print(f"    [{table_name}] recomputed from the whole fact table.")
+            elif upper_id <= lower_id:
+                continue
+            select_list = ', '.join(f'{expr} AS {col}' for expr, col in zip(expressions, columns))
+            increments = ', '.join(f'{m} = {m} + VALUES({m})' for m in MEASURES)
+            conn.execute(
+                text(
+                    f"INSERT INTO {table_name} ({', '.join(columns + MEASURES)}) "
+                    f"SELECT {select_list}, SUM(s.quantity), SUM(s.total_amount), SUM(s.profit) "
+                    f"FROM sale s {join} "
+                    "WHERE s.id_sale > :lower_id AND s.id_sale <= :upper_id "
+                    f"GROUP BY {', '.join(expressions)} "
+                    f"ON DUPLICATE KEY UPDATE {increments}"
+                ),
+                {'lower_id': lower_id, 'upper_id': upper_id}
+            )
+            advance_watermark(conn, table_name, upper_id, upper_date)
+
+        lower_id = min(lower_ids.values())
+        rows = conn.execute(
+            text("SELECT COUNT(*) FROM sale WHERE id_sale > :lower_id AND id_sale <= :upper_id"),
+            {'lower_id': lower_id, 'upper_id': upper_id}
+        ).scalar()
+
+    print(f"✅ KPI aggregates refreshed with {rows} sales (id_sale {lower_id + 1}..{upper_id}).")
+    return rows
+
+def invalidate_changed_aggregates(engine, table_name, df):
+    """
+    Resets the watermark of the aggregates a dimension upsert would make stale.
+
+    An aggregate groups by dimension attributes (e.g. `product.category`), so
+    updating them for an existing member moves its past sales to another
+    group. The incoming rows are compared with the stored ones on those
+    attributes only: new members (such as a new day) change nothing, while
+    a changed category resets `agg_sales_category`, which the next
+    `refresh_aggregates` recomputes. Call it before the upsert, so a failure
+    in between only costs an unneeded recompute.
+
+    Args:
+        engine (sqlalchemy.engine.Engine): Warehouse engine.
+        table_name (str): Dimension about to be upserted.
+        df (pd.DataFrame): Dimension rows about to be upserted.
+
+    Returns:
+        list: Aggregate tables that were reset.
+    """
+    affected = {
+        aggregate: key for aggregate, (dimension, key) in AGGREGATE_DIMENSIONS.items() if dimension == table_name
+    }
+    if not affected or not inspect(engine).has_table(table_name) or not inspect(engine).has_table(WATERMARK_TABLE):
+        return []
+
+    key = next(iter(affected.values()))
+    attributes = {aggregate: [expr.split('.')[1] for expr in AGGREGATES[aggregate][1]] for aggregate in affected}
+    columns = [key] + sorted({column for names in attributes.values() for column in names})
+    stored = pd.read_sql(f"SELECT {', '.join(columns)} FROM `{table_name}`", con=engine)
+    merged = df[columns].merge(stored, on=key, suffixes=('', '_stored'))
+
+    changed = [
+        aggregate for aggregate, names in attributes.items()
+        if any((merged[name].astype(str) != merged[f'{name}_stored'].astype(str)).any() for name in names)
+    ]
+    if changed:
+        with engine.begin() as conn:
+            conn.execute(
+                text(f"DELETE FROM {WATERMARK_TABLE} WHERE table_name IN :tables").bindparams(
+                    bindparam('tables', expanding=True)
+                ),
+                {'tables': changed}
+            )
+        print(f"    [{table_name}] grouping attributes changed; {', '.join(changed)} will be recomputed.")
+    return changed
+
+def invalidate_late_sales(engine, fact_sale, after_sale_id):
+    """
+    Resets the watermark of the aggregates that already cover sales about to be loaded.
+
+    Sales shards are tracked by the ingest manifest, not by the `sale_id`
+    watermark, so a shard delivered late can hold ids at or below the ids
+    already loaded. An incremental refresh only reads the ids above an
+    aggregate's watermark and would never fold those sales in; resetting
+    the watermark makes the next `refresh_aggregates` recompute the
+    aggregate. Call it before the fact rows are loaded, so a failure in
+    between only costs an unneeded recompute.
+
+    Args:
+        engine (sqlalchemy.engine.Engine): Warehouse engine.
+        fact_sale (pd.DataFrame): Fact rows (or one chunk) about to be loaded.
+        after_sale_id (int): Fact watermark the sales were extracted after.
+
+    Returns:
+        list: Aggregate tables that were reset.
+    """
+    if not after_sale_id or fact_sale.empty:
+        return []
+    first_id = int(fact_sale['id_sale'].min())
+    if first_id > after_sale_id or not inspect(engine).has_table(WATERMARK_TABLE):
+        return []
+
+    tables = bindparam('tables', expanding=True)
+    params = {'tables': list(AGGREGATES), 'first_id': first_id}
+    with engine.begin() as conn:
+        stale = [
+            row[0] for row in conn.execute(
+                text(
+                    f"SELECT table_name FROM {WATERMARK_TABLE} WHERE table_name IN :tables AND last_id >= :first_id"
+                ).bindparams(tables),
+                params
+            )
+        ]
+        if stale:
+            conn.execute(
+                text(f"DELETE FROM {WATERMARK_TABLE} WHERE table_name IN :tables").bindparams(tables),
+                {'tables': stale}
+            )
+    if stale:
+        print(f"    [sale] late-arriving sales from id {first_id}; {', '.join(stale)} will be recomputed.")
+    return stale
+
+def invalidate_late_sales_stream(engine, fact_stream, after_sale_id):
+    """Streaming form of `invalidate_late_sales`: checks each fact chunk before it is loaded."""
+    for dim_date, fact_sale in fact_stream:
+        invalidate_late_sales(engine, fact_sale, after_sale_id)
+        yield dim_date, fact_sale
+
+def aggregates_are_current(engine, control_rows=None):
+    """
+    Tells whether the aggregate tables exist and cover every loaded sale.
+
+    An aggregate reset by a dimension change has no watermark, so it is not
+    current until the next `refresh_aggregates`.
+
+    Args:
+        engine (sqlalchemy.engine.Engine): Warehouse engine.
+        control_rows (list, optional): Control table rows already read by
+            `src.kpi_cache.read_control_rows`. The watermarks are then taken
+            from them without querying the database (every aggregate
+            watermark is written by `refresh_aggregates`, which needs the
+            aggregate tables, so their existence is implied).
+
+    Returns:
+        bool: True when the dashboard can safely read the aggregates.
+    """
+    if control_rows is not None:
+        marks = {row[0]: int(row[1]) for row in control_rows}
+    else:
+        inspector = inspect(engine)
+        if not all(inspector.has_table(table_name) for table_name in list(AGGREGATES) + [WATERMARK_TABLE]):
+            return False
+        with engine.connect() as conn:
+            marks = {table_name: read_watermark(conn, table_name)[0] for table_name in ['sale'] + list(AGGREGATES)}
+    sale_id = marks.get('sale', 0)
+    return sale_id > 0 and all(marks.get(table_name, 0) >= sale_id for table_name in AGGREGATES)
+
+def check_aggregates(engine):
+    """
+    Compares every aggregate table against the same GROUP BY on the base fact.
+
+    This is a full scan of `sale` and is meant as an occasional consistency
+    check, not as part of every run.
+
+    Args:
+        engine (sqlalchemy.engine.Engine): Warehouse engine.
+
+    Returns:
+        dict: Aggregate table name -> number of mismatching groups (0 = consistent).
+    """
+    print("🔎 Checking KPI aggregates against the fact table...")
+    mismatches = {}
+
+    for table_name, (columns, expressions, join) in AGGREGATES.items():
+        select_list = ', '.join(f'{expr} AS {col}' for expr, col in zip(expressions, columns))
+        df_base = pd.read_sql(
+            f"SELECT {select_list}, SUM(s.quantity) AS sales_volume, "
+            f"SUM(s.total_amount) AS revenue, SUM(s.profit) AS profit "
+            f"FROM sale s {join} GROUP BY {', '.join(expressions)}",
+            con=engine
+        )
+        df_agg = pd.read_sql(f"SELECT {', '.join(columns + MEASURES)} FROM {table_name}", con=engine)
+
+        merged = df_base.merge(df_agg, on=columns, how='outer', suffixes=('_base', '_agg'), indicator=True)
+        bad = merged['_merge'] != 'both'
+        for measure in MEASURES:
+            # DECIMAL sums are exact; the tolerance only absorbs float conversion
+            diff = (merged[f'{measure}_base'].astype(float) - merged[f'{measure}_agg'].astype(float)).abs()
+            bad |= diff.fillna(float('inf')) > 0.005
+        mismatches[table_name] = int(bad.sum())
+
+        status = "✅" if mismatches[table_name] == 0 else "❌"
+        print(f" {status} {table_name}: {mismatches[table_name]} mismatching groups.")
+
+    return mismatches
@@ -0,0 +1,140 @@
+import csv
+import os
+import tempfile
+import time
+from pandas.api.types import is_numeric_dtype, is_datetime64_any_dtype
+from sqlalchemy import text
+from src.money import CENTS_PER_UNIT, cents_columns, scale_for_load
+
+# Available strategies for pushing a DataFrame into a warehouse table:
+# - 'to_sql': pandas default, one parameter set per row (baseline).
+# - 'multi_insert': batched multi-row INSERT ... VALUES (...), (...), ...
+# - 'load_data_infile': MySQL LOAD DATA LOCAL INFILE from a temporary CSV/TSV.
+LOAD_STRATEGIES = ('to_sql', 'multi_insert', 'load_data_infile')
+
+DEFAULT_BATCH_SIZE = 10000
+
+def bulk_load(df, table_name, engine, strategy='multi_insert', batch_size=DEFAULT_BATCH_SIZE, file_format='csv'):
+    """
+    Appends a DataFrame to a warehouse table using the selected bulk strategy.
+
+    Args:
+        df (pd.DataFrame): Rows to append. Column names must match the table.
+        table_name (str): Target table name.
+        engine (sqlalchemy.engine.Engine): Warehouse engine.
+        strategy (str): One of `LOAD_STRATEGIES`. Defaults to 'multi_insert'.
+        batch_size (int): Rows per INSERT statement ('multi_insert') or per
+            write to the temporary file ('load_data_infile').
+        file_format (str): 'csv' or 'tsv', only used by 'load_data_infile'.
+
+    Money columns holding int64 cents (`src.money`) are scaled to units by
+    `scale_for_load` for the INSERT strategies, and written as integers and
+    scaled by the server (`LOAD DATA ... SET col = @col / 100`) otherwise.
+
+    Returns:
+        dict: Load statistics with keys `table`, `strategy`, `rows`,
+            `seconds` and `rows_per_sec`.
+
+    Raises:
+        ValueError: If the strategy or file format is unknown.
+    """
+    if strategy not in LOAD_STRATEGIES:
+        raise ValueError(f"Unknown load strategy '{strategy}'. Expected one of {LOAD_STRATEGIES}.")
+
+    start = time.perf_counter()
+
+    if strategy == 'to_sql':
+        scale_for_load(df, table_name).to_sql(table_name, con=engine, if_exists='append', index=False)
+    elif strategy == 'multi_insert':
+        # One round trip per batch instead of one per row
+        scale_for_load(df, table_name).to_sql(
+            table_name, con=engine, if_exists='append', index=False, method='multi', chunksize=batch_size
+        )
+    else:
+        _load_data_infile(df, table_name, engine, batch_size, file_format)
+
+    seconds = time.perf_counter() - start
+    stats = {
+        'table': table_name,
+        'strategy': strategy,
+        'rows': len(df),
+        'seconds': seconds,
+        'rows_per_sec': len(df) / seconds if seconds > 0 else float('inf'),
+    }
+    print(f"    [{strategy}] {stats['rows']} rows into '{table_name}' in {seconds:.2f}s ({stats['rows_per_sec']:,.0f} rows/s)")
+    return stats
+
+def _load_data_infile(df, table_name, engine, batch_size, file_format):
+    """
+    Streams the DataFrame to a temporary delimited file and bulk loads it.
+
+    Requires `local_infile` to be enabled both on the server and in the client
+    connection (pymysql `connect_args={'local_infile': True}`).
+    """
+    if file_format not in ('csv', 'tsv'):
+        raise ValueError(f"Unknown file format '{file_format}'. Expected 'csv' or 'tsv'.")
+    sql_separator = ',' if file_format == 'csv' else '\\t'
+
+    fd, tmp_path = tempfile.mkstemp(suffix=f'.{file_format}')
+    try:
+        with os.fdopen(fd, 'w', newline='') as f:
+            write_load_file(df, f, file_format, batch_size)
+
+        # Integer cents go through user variables and are scaled by the server
+        cents = cents_columns(df, table_name)
+        columns = ', '.join(f'@{col}' if col in cents else f'`{col}`' for col in df.columns)
+        scaling = ''
+        if cents:
+            scaling = ' SET ' + ', '.join(f'`{col}` = @{col} / {CENTS_PER_UNIT}' for col in cents)
+        # MySQL expects forward slashes in the file path, also on Windows
+        file_path = tmp_path.replace('\\', '/')
+        enclosure = "OPTIONALLY ENCLOSED BY '\"'" if file_format == 'csv' else ''
+        statement = (
+            f"LOAD DATA LOCAL INFILE '{file_path}' INTO TABLE `{table_name}` "
+            f"FIELDS TERMINATED BY '{sql_separator}' {enclosure} ESCAPED BY '\\\\' "
+            f"LINES TERMINATED BY '\\n' ({columns}){scaling}"
+        )
+        with engine.begin() as conn:
+            conn.execute(text(statement))
+    finally:
+        os.remove(tmp_path)
+
+def write_load_file(df, f, file_format='csv', batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Writes the rows of a DataFrame in the format `LOAD DATA` reads back.
+
+    NULLs are written as `\\N`. Text is escaped for the server's `ESCAPED BY
+    '\\\\'`: backslashes are doubled and tabs, newlines and carriage returns
+    become `\\t`, `\\n` and `\\r`, so a literal `\\N` or `C:\\dir` survives. In
+    'csv' fields with commas or quotes are enclosed in double quotes (inner
+    quotes doubled); 'tsv' is never quoted, as its statement has no
+    `ENCLOSED BY`.
+
+    Args:
+        df (pd.DataFrame): Rows to write, in table column order.
+        f (io.TextIOBase): Text file opened with `newline=''`.
+        file_format (str): 'csv' or 'tsv'.
+        batch_size (int): Rows formatted per write.
+    """
+    separator = ',' if file_format == 'csv' else '\t'
+    quoting = csv.QUOTE_MINIMAL if file_format == 'csv' else csv.QUOTE_NONE
+    text_columns = [
+        column for column in df.columns
+        if not (is_numeric_dtype(df[column].dtype) or is_datetime64_any_dtype(df[column].dtype))
+    ]
+    # Written in slices so the text buffer never holds the whole frame
+    for offset in range(0, len(df), batch_size):
+        batch = df.iloc[offset:offset + batch_size]
+        if text_columns:
+            batch = batch.assign(**{column: _escape_text(batch[column]) for column in text_columns})
+        batch.to_csv(
+            f, sep=separator, header=False, index=False, na_rep='\\N', lineterminator='\n', quoting=quoting
+        )
+
+def _escape_text(values):
+    """Applies the `LOAD DATA` escape sequences to a text column, keeping NULLs."""
+    values = values.astype(object)
+    escaped = values[values.notna()].astype(str)
+    for raw, sequence in (('\\', '\\\\'), ('\t', '\\t'), ('\n', '\\n'), ('\r', '\\r')):
+        escaped = escaped.str.replace(raw, sequence, regex=False)
+    return escaped.reindex(values.index)
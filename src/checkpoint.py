@@ -0,0 +1,221 @@
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime
+import pandas as pd
+from sqlalchemy import text
+
+try:
+    import pyarrow  # noqa: F401  (needed by DataFrame.to_parquet)
+except ImportError:  # Optional dependency: without it stage outputs are not cached
+    pyarrow = None
+
+DEFAULT_CHECKPOINT_PATH = os.path.join('data', 'checkpoints')
+RUN_STATE_FILE = 'run_state.json'
+
+# Control table recording the fact chunks already committed by a run
+CHECKPOINT_FILE = 'sql/load_checkpoint.sql'
+CHECKPOINT_TABLE = 'etl_load_checkpoint'
+# Fact rows per checkpointed chunk: a failed load resumes at this granularity
+CHECKPOINT_CHUNK_ROWS = 500_000
+
+def input_fingerprint(paths, **params):
+    """
+    Hashes the inputs of a run: the source files and the parameters.
+
+    Files are identified by path, size and mtime (hashing the content of
+    multi-GB sources would cost as much as reading them again).
+
+    Args:
+        paths (list[str]): Source files read by the run.
+        **params: Options that change the run output (schema, policies...).
+
+    Returns:
+        str: Hex SHA-256 digest.
+    """
+    files = []
+    for path in sorted(paths):
+        stat = os.stat(path)
+        files.append((os.path.abspath(path), stat.st_size, stat.st_mtime_ns))
+    payload = json.dumps({'files': files, 'params': params}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+class RunCheckpoint:
+    """
+    Persistent progress of one pipeline run, used to resume it after a failure.
+
+    The run is identified by the fingerprint of its inputs. Completed stages,
+    values that must not change when resuming (e.g. the watermark the run
+    started from) and the transformed frames are kept under
+    `data/checkpoints/`. A new run with the same fingerprint finds them and
+    skips what was already done; a run with different inputs starts over and
+    discards them. `complete` clears everything once the run succeeds.
+
+    Usage:
+        checkpoint = RunCheckpoint(input_fingerprint(paths, schema=schema))
+        if not checkpoint.is_done('ddl'):
+            ...
+            checkpoint.mark_done('ddl')
+        checkpoint.complete()
+    """
+
+    def __init__(self, key, checkpoint_path=DEFAULT_CHECKPOINT_PATH):
+        """
+        Args:
+            key (str): Run fingerprint (`input_fingerprint`).
+            checkpoint_path (str): Directory holding the run state and artifacts.
+        """
+        self.key = key
+        self.checkpoint_path = checkpoint_path
+        self._state_path = os.path.join(checkpoint_path, RUN_STATE_FILE)
+        self._artifact_path = os.path.join(checkpoint_path, 'artifacts')
+
+        state = None
+        if os.path.exists(self._state_path):
+            with open(self._state_path) as f:
+                state = json.load(f)
+        self.resumed = state is not None and state.get('key') == key
+        if self.resumed:
+            self._state = state
+        else:
+            # Progress of a run with other inputs can not be reused
+            shutil.rmtree(self._artifact_path, ignore_errors=True)
+            self._state = {'key': key, 'started_at': datetime.now().isoformat(timespec='seconds'),
+                           'stages': {}, 'values': {}}
+            self._write()
+
+    def is_done(self, stage):
+        """Tells whether a stage already completed in this run."""
+        return stage in self._state['stages']
+
+    def mark_done(self, stage):
+        """Records a stage as completed."""
+        self._state['stages'][stage] = datetime.now().isoformat(timespec='seconds')
+        self._write()
+
+    def get(self, name, default=None):
+        """Returns a value saved with `set` by this run."""
+        return self._state['values'].get(name, default)
+
+    def set(self, name, value):
+        """Saves a JSON-serializable value for a resumed run."""
+        self._state['values'][name] = value
+        self._write()
+
+    def save_frames(self, stage, frames):
+        """
+        Persists a stage's output frames as Parquet files.
+
+        Written into a temporary directory that is renamed when complete, so
+        a crash never leaves a partial artifact. `attrs` are kept. Nothing is
+        saved when pyarrow is not installed.
+
+        Args:
+            stage (str): Stage name, e.g. 'transform'.
+            frames (dict): Name -> DataFrame.
+
+        Returns:
+            bool: True when the artifact was written.
+        """
+        if pyarrow is None:
+            print("⚠️ pyarrow is not installed; stage outputs are not checkpointed.")
+            return False
+        target = os.path.join(self._artifact_path, stage)
+        tmp_path = target + '.tmp'
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        attrs = {}
+        for name, df in frames.items():
+            df.to_parquet(os.path.join(tmp_path, f'{name}.parquet'), index=False)
+            attrs[name] = df.attrs
+        with open(os.path.join(tmp_path, 'attrs.json'), 'w') as f:
+            json.dump(attrs, f)
+        shutil.rmtree(target, ignore_errors=True)
+        os.replace(tmp_path, target)
+        return True
+
+    def load_frames(self, stage, names):
+        """
+        Reads the frames saved by `save_frames` for this run.
+
+        Args:
+            stage (str): Stage name.
+            names (list[str]): Frame names, in the order to return them.
+
+        Returns:
+            list[pd.DataFrame]: The frames, or None if there is no artifact.
+        """
+        source = os.path.join(self._artifact_path, stage)
+        if pyarrow is None or not os.path.isdir(source):
+            return None
+        with open(os.path.join(source, 'attrs.json')) as f:
+            attrs = json.load(f)
+        frames = []
+        for name in names:
+            df = pd.read_parquet(os.path.join(source, f'{name}.parquet'))
+            df.attrs = attrs.get(name, {})
+            frames.append(df)
+        return frames
+
+    def complete(self, engine=None):
+        """
+        Clears the progress of a finished run: state, artifacts and, when an
+        engine is given, its fact chunk checkpoints.
+        """
+        if engine is not None:
+            clear_chunks(engine, self.key)
+        shutil.rmtree(self._artifact_path, ignore_errors=True)
+        if os.path.exists(self._state_path):
+            os.remove(self._state_path)
+
+    def _write(self):
+        """Writes the run state atomically."""
+        os.makedirs(self.checkpoint_path, exist_ok=True)
+        tmp_path = self._state_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self._state, f, indent=2)
+        os.replace(tmp_path, self._state_path)
+
+def ensure_checkpoint_table(engine):
+    """Creates the fact chunk checkpoint table if it does not exist."""
+    with open(CHECKPOINT_FILE) as f:
+        statement = f.read().split(';')[0]
+    with engine.begin() as conn:
+        conn.execute(text(statement))
+
+def completed_chunks(engine, run_key):
+    """
+    Returns the fact chunks a run already committed.
+
+    Checkpoints of other runs are removed first: their chunks can not be
+    matched to this run's data any more.
+
+    Returns:
+        dict: chunk number -> `(first_id, last_id)`.
+    """
+    ensure_checkpoint_table(engine)
+    with engine.begin() as conn:
+        conn.execute(text(f"DELETE FROM {CHECKPOINT_TABLE} WHERE run_key <> :run_key"), {'run_key': run_key})
+        rows = conn.execute(
+            text(f"SELECT chunk_no, first_id, last_id FROM {CHECKPOINT_TABLE} WHERE run_key = :run_key"),
+            {'run_key': run_key}
+        ).fetchall()
+    return {int(row[0]): (int(row[1]), int(row[2])) for row in rows}
+
+def record_chunk(engine, run_key, chunk_no, first_id, last_id, rows):
+    """Records a committed fact chunk."""
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                f"INSERT INTO {CHECKPOINT_TABLE} (run_key, chunk_no, first_id, last_id, row_count) "
+                "VALUES (:run_key, :chunk_no, :first_id, :last_id, :row_count)"
+            ),
+            {'run_key': run_key, 'chunk_no': chunk_no, 'first_id': first_id, 'last_id': last_id, 'row_count': rows}
+        )
+
+def clear_chunks(engine, run_key):
+    """Removes the fact chunk checkpoints of a run."""
+    ensure_checkpoint_table(engine)
+    with engine.begin() as conn:
+        conn.execute(text(f"DELETE FROM {CHECKPOINT_TABLE} WHERE run_key = :run_key"), {'run_key': run_key})
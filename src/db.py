@@ -0,0 +1,63 @@
+import os
+from functools import lru_cache
+from dotenv import load_dotenv
+from sqlalchemy import create_engine
+from urllib.parse import quote_plus
+
+def get_db_settings():
+    """
+    Reads the warehouse connection settings from the `.env` file.
+
+    Returns:
+        dict: `user`, `password`, `host`, `port` and `database` values.
+    """
+    # Reload environment variables to ensure fresh configuration
+    load_dotenv(override=True)
+    return {
+        'user': os.getenv("DB_USER"),
+        'password': os.getenv("DB_PASSWORD"),
+        'host': os.getenv("DB_HOST"),
+        'port': os.getenv("DB_PORT"),
+        'database': os.getenv("DB_NAME"),
+    }
+
+def get_engine(with_database=True, local_infile=False, database=None):
+    """
+    Returns the shared, pooled SQLAlchemy engine for the warehouse.
+
+    Every pipeline stage goes through this factory, so they all reuse the same
+    connection pool instead of opening their own. The pool is configured from
+    the environment:
+        - DB_POOL_SIZE: persistent connections kept open (default 5).
+        - DB_MAX_OVERFLOW: extra connections allowed under load (default 10).
+        - DB_POOL_RECYCLE: seconds before a connection is recycled (default 3600).
+
+    Args:
+        with_database (bool): When False, the engine connects to the server
+            without selecting a database (used to CREATE DATABASE).
+        local_infile (bool): Enables client-side LOAD DATA LOCAL INFILE.
+        database (str, optional): Database to connect to instead of DB_NAME
+            (e.g. a scratch database for benchmarks).
+
+    Returns:
+        sqlalchemy.engine.Engine: A cached engine, one per argument combination.
+    """
+    settings = get_db_settings()
+    return _build_engine(
+        settings['user'], settings['password'], settings['host'], settings['port'],
+        (database or settings['database']) if with_database else '', local_infile
+    )
+
+@lru_cache(maxsize=None)
+def _build_engine(user, password, host, port, database, local_infile):
+    """Creates (once per distinct configuration) the pooled engine."""
+    encoded_password = quote_plus(password)
+    return create_engine(
+        f"mysql+pymysql://{user}:{encoded_password}@{host}:{port}/{database}",
+        pool_size=int(os.getenv("DB_POOL_SIZE", 5)),
+        max_overflow=int(os.getenv("DB_MAX_OVERFLOW", 10)),
+        pool_recycle=int(os.getenv("DB_POOL_RECYCLE", 3600)),
+        # Transparently replace connections dropped by the server between stages
+        pool_pre_ping=True,
+        connect_args={'local_infile': True} if local_infile else {}
+    )
@@ -0,0 +1,184 @@
+import hashlib
+import re
+from sqlalchemy import bindparam, text
+from src.incremental import WATERMARK_TABLE
+from src.aggregates import AGGREGATES
+from src.checkpoint import CHECKPOINT_TABLE
+
+# Physical schema variants of the warehouse
+SCHEMA_FILES = {
+    # Original DDL: composite 5-column primary key on `sale`
+    'standard': 'sql/create_tables.sql',
+    # Narrow `id_sale` primary key plus covering indexes for the KPI queries
+    'optimized': 'sql/create_tables_optimized.sql',
+    # Optimized schema with SCD Type 2 customer/product dimensions (src.scd)
+    'scd2': 'sql/create_tables_scd2.sql',
+}
+PARTITION_FILE = 'sql/partition_sale.sql'
+
+# Control table holding the hash of the DDL last applied
+SCHEMA_VERSION_FILE = 'sql/schema_version.sql'
+SCHEMA_VERSION_TABLE = 'etl_schema_version'
+SCHEMA_COMPONENT = 'warehouse'
+
+# Warehouse tables, children before parents
+WAREHOUSE_TABLES = (
+    ['sale', 'customer', 'product', 'channel', 'date', WATERMARK_TABLE, SCHEMA_VERSION_TABLE, CHECKPOINT_TABLE]
+    + list(AGGREGATES)
+)
+
+def read_sql_statements(path):
+    """
+    Reads a SQL script and splits it into individual statements.
+
+    Args:
+        path (str): Path to the .sql file. Statements are separated by semicolons.
+
+    Returns:
+        list: Non-empty statements, without `USE` commands (the connection
+            already selects the database).
+    """
+    with open(path, 'r') as f:
+        # Clean comments and split by semicolon
+        sql_content = f.read()
+        sql_commands = [cmd.strip() for cmd in sql_content.split(';') if cmd.strip()]
+    # Ignore USE commands as we handle context on the connection
+    return [cmd for cmd in sql_commands if not cmd.upper().startswith("USE")]
+
+def ddl_hash(sql_commands):
+    """
+    Hashes DDL statements, ignoring comments and whitespace.
+
+    Editing a comment or re-indenting the DDL file keeps the version, while
+    any change to a table definition produces a new one.
+
+    Args:
+        sql_commands (list): Statements as returned by `read_sql_statements`.
+
+    Returns:
+        str: Hex SHA-256 digest.
+    """
+    normalized = []
+    for command in sql_commands:
+        command = re.sub(r'--[^\n]*', '', command)
+        normalized.append(' '.join(command.split()))
+    return hashlib.sha256(';'.join(normalized).encode()).hexdigest()
+
+def apply_schema(engine_init, db_name, schema='standard', full_rebuild=False, partition_sale=False):
+    """
+    Creates the warehouse database and tables, only when the DDL changed.
+
+    The hash of the schema file (`ddl_hash`) is stored in
+    `etl_schema_version`. When it matches the current file the DDL is not
+    executed at all and the existing tables, indexes and data are kept, so an
+    incremental run goes straight to the load. When it differs every table is
+    dropped and created again from the new DDL, which needs a full reload. A
+    warehouse created before versioning (tables but no version row) is
+    treated as a schema change too: its tables may predate the current DDL
+    (e.g. a `date` table without `weekday`), and `CREATE TABLE IF NOT EXISTS`
+    would keep them as they are.
+
+    Args:
+        engine_init (sqlalchemy.engine.Engine): Engine connected to the server
+            without a default database.
+        db_name (str): Warehouse database name.
+        schema (str): Physical schema variant, a key of `SCHEMA_FILES`.
+        full_rebuild (bool): Drop every warehouse table before creating them.
+        partition_sale (bool): RANGE-partition `sale` by `date_iddate` (see
+            `sql/partition_sale.sql`) if it is not partitioned yet.
+
+    Returns:
+        str: 'unchanged' (no DDL executed), 'created' (statements applied to
+            a new, empty database) or 'recreated' (tables dropped and created
+            again, the warehouse is empty).
+    """
+    schema_file = SCHEMA_FILES[schema]
+    sql_commands = read_sql_statements(schema_file)
+    version = ddl_hash(sql_commands)
+
+    with engine_init.connect() as conn:
+        conn.execute(text(f"CREATE DATABASE IF NOT EXISTS {db_name}"))
+        conn.execute(text(f"USE {db_name}"))
+        for command in read_sql_statements(SCHEMA_VERSION_FILE):
+            conn.execute(text(command))
+
+        applied = _read_schema_version(conn)
+        unversioned = applied is None and _has_warehouse_tables(conn, db_name)
+        if full_rebuild or unversioned or (applied is not None and applied != version):
+            if full_rebuild:
+                # Force table recreation to ensure schema updates
+                print("🧹 Recreating tables to update schema...")
+            elif unversioned:
+                print(f"🔀 Warehouse tables without a schema version, recreating them (version {version[:12]})...")
+            else:
+                print(f"🔀 Schema changed ({applied[:12]} -> {version[:12]}), recreating tables...")
+            _drop_warehouse_tables(conn)
+            for command in read_sql_statements(SCHEMA_VERSION_FILE):
+                conn.execute(text(command))
+            status = 'recreated'
+        elif applied == version:
+            print(f"⏩ Schema unchanged (version {version[:12]}), skipping DDL.")
+            status = 'unchanged'
+        else:
+            status = 'created'
+
+        if status != 'unchanged':
+            for command in sql_commands:
+                conn.execute(text(command))
+            _write_schema_version(conn, schema, schema_file, version)
+
+        if partition_sale and not _is_partitioned(conn, db_name, 'sale'):
+            print("🗂 Partitioning 'sale' by date_iddate...")
+            for command in read_sql_statements(PARTITION_FILE):
+                conn.execute(text(command))
+
+        conn.commit()
+    return status
+
+def _drop_warehouse_tables(conn):
+    """Drops every warehouse table, ignoring foreign keys between them."""
+    conn.execute(text("SET FOREIGN_KEY_CHECKS = 0;"))
+    for table_name in WAREHOUSE_TABLES:
+        conn.execute(text(f"DROP TABLE IF EXISTS {table_name};"))
+    conn.execute(text("SET FOREIGN_KEY_CHECKS = 1;"))
+
+def _read_schema_version(conn):
+    """Returns the DDL hash last applied to the warehouse, or None."""
+    return conn.execute(
+        text(f"SELECT ddl_hash FROM {SCHEMA_VERSION_TABLE} WHERE component = :component"),
+        {'component': SCHEMA_COMPONENT}
+    ).scalar()
+
+def _write_schema_version(conn, schema, schema_file, version):
+    """Records the DDL hash just applied."""
+    conn.execute(
+        text(
+            f"INSERT INTO {SCHEMA_VERSION_TABLE} (component, schema_name, schema_file, ddl_hash) "
+            "VALUES (:component, :schema_name, :schema_file, :ddl_hash) "
+            "ON DUPLICATE KEY UPDATE schema_name = VALUES(schema_name), "
+            "schema_file = VALUES(schema_file), ddl_hash = VALUES(ddl_hash)"
+        ),
+        {'component': SCHEMA_COMPONENT, 'schema_name': schema, 'schema_file': schema_file, 'ddl_hash': version}
+    )
+
+def _has_warehouse_tables(conn, db_name):
+    """Tells whether any warehouse table, besides the version table, already exists."""
+    count = conn.execute(
+        text(
+            "SELECT COUNT(*) FROM information_schema.TABLES "
+            "WHERE TABLE_SCHEMA = :schema AND TABLE_NAME IN :tables"
+        ).bindparams(bindparam('tables', expanding=True)),
+        {'schema': db_name, 'tables': [t for t in WAREHOUSE_TABLES if t != SCHEMA_VERSION_TABLE]}
+    ).scalar()
+    return count > 0
+
+def _is_partitioned(conn, db_name, table_name):
+    """Tells whether a table already has partitions."""
+    count = conn.execute(
+        text(
+            "SELECT COUNT(*) FROM information_schema.PARTITIONS "
+            "WHERE TABLE_SCHEMA = :schema AND TABLE_NAME = :table AND PARTITION_NAME IS NOT NULL"
+        ),
+        {'schema': db_name, 'table': table_name}
+    ).scalar()
+    return count > 0
@@ -1,15 +1,40 @@
 import pandas as pd
 import os
+from src.incremental import filter_new_sales
+from src.ingest import DEFAULT_READ_WORKERS, iter_sales_files, read_sales_files
+from src.money import apply_money_mode
+from src.schema import csv_read_options, memory_usage_mb
+from src.staging import (
+    DEFAULT_STAGING_PATH, stage_raw_data, read_staged, iter_staged, staging_available
+)
 
-def extract_data(raw_data_path):
+def extract_data(raw_data_path, after_sale_id=None, staging_format=None, staging_path=DEFAULT_STAGING_PATH,
+                 sales_files=None, read_workers=DEFAULT_READ_WORKERS, money='float'):
     """
     Extracts data from CSV files located in the raw data layer.
 
-    This function reads the source CSV files for channels, customers, products, 
+    This function reads the source CSV files for channels, customers, products,
     and sales, loading them into Pandas DataFrames for further processing.
+    Every file is parsed with its declared schema (`src.schema.RAW_SCHEMAS`).
 
     Args:
         raw_data_path (str): The directory path where the raw CSV files are stored.
+        after_sale_id (int, optional): Incremental watermark. When set, only
+            sales with a `sale_id` greater than this value are returned.
+            Not applied to `sales_files`: shards are tracked by the ingest
+            manifest, and a late shard may hold ids below the watermark.
+        staging_format (str, optional): 'parquet' or 'arrow'. When set, the CSVs
+            are first converted (only if they changed) into the columnar
+            staging layer and read back from there. Falls back to the CSVs
+            when pyarrow is not installed.
+        staging_path (str): Directory of the staging layer.
+        sales_files (list[str], optional): Sales shard files (CSV, gzip CSV
+            or Parquet, see `src.ingest.resolve_sales_files`) read instead of
+            sales.csv. They are read concurrently and concatenated in order.
+            The staging layer is not used for them.
+        read_workers (int): Shard files read at the same time.
+        money (str): 'float' keeps prices as parsed; 'cents' converts the
+            product and sale prices to exact int64 cents (`src.money`).
 
     Returns:
         tuple: A tuple containing four Pandas DataFrames:
@@ -17,21 +42,155 @@ def extract_data(raw_data_path):
             - df_customers (pd.DataFrame): Data from customers.csv.
             - df_products (pd.DataFrame): Data from products.csv.
             - df_sales (pd.DataFrame): Data from sales.csv.
-            
+
         Returns (None, None, None, None) if an error occurs during extraction.
     """
     print("Starting Extraction process (Extract)...")
-    
+
     try:
-        # Read CSV files into DataFrames
-        df_channels = pd.read_csv(os.path.join(raw_data_path, 'channels.csv'))
-        df_customers = pd.read_csv(os.path.join(raw_data_path, 'customers.csv'))
-        df_products = pd.read_csv(os.path.join(raw_data_path, 'products.csv'))
-        df_sales = pd.read_csv(os.path.join(raw_data_path, 'sales.csv'))
-        
+        if sales_files is not None:
+            # Sales come as shards: dimensions from the raw CSVs, shards read in parallel
+            _warn_staging_ignored(staging_format)
+            df_channels, df_customers, df_products = _read_dimension_sources(raw_data_path)
+            print(f" -> Reading {len(sales_files)} sales file(s) with {read_workers} worker(s)...")
+            df_sales = read_sales_files(sales_files, workers=read_workers)
+            _report_late_sales(df_sales, after_sale_id)
+        elif _use_staging(raw_data_path, staging_format, staging_path):
+            # Read the typed columnar copies (memory-mapped, filtered at read time)
+            df_channels, df_customers, df_products = _read_staged_dimensions(staging_path, staging_format)
+            filters = [('sale_id', '>', after_sale_id)] if after_sale_id else None
+            df_sales = read_staged('sales', staging_path, staging_format, filters=filters)
+            df_sales = filter_new_sales(df_sales, after_sale_id).reset_index(drop=True)
+        else:
+            # Read CSV files into DataFrames
+            df_channels, df_customers, df_products = _read_dimension_sources(raw_data_path)
+            df_sales = _read_csv_source(raw_data_path, 'sales')
+            df_sales = filter_new_sales(df_sales, after_sale_id).reset_index(drop=True)
+        df_products = apply_money_mode(df_products, 'products', money)
+        df_sales = apply_money_mode(df_sales, 'sales', money)
+        _log_memory_usage(channels=df_channels, customers=df_customers, products=df_products, sales=df_sales)
+
         print("✅ Extraction completed successfully.")
         return df_channels, df_customers, df_products, df_sales
-        
+
+    except Exception as e:
+        print(f"Error during extraction: {e}")
+        return None, None, None, None
+
+def extract_data_chunked(raw_data_path, chunk_size, after_sale_id=None, staging_format=None,
+                         staging_path=DEFAULT_STAGING_PATH, sales_files=None, money='float'):
+    """
+    Extracts the raw layer in streaming mode.
+
+    The small dimension sources (channels, customers, products) are fully read
+    into memory, while sales.csv is returned as a lazy iterator of DataFrames
+    with at most `chunk_size` rows each. Nothing from sales.csv is read until
+    the iterator is consumed, so peak memory is bounded by the chunk size.
+
+    Args:
+        raw_data_path (str): The directory path where the raw CSV files are stored.
+        chunk_size (int): Maximum number of sales rows per chunk.
+        after_sale_id (int, optional): Incremental watermark. When set, rows
+            with a `sale_id` up to this value are dropped from every chunk
+            (not from `sales_files`, see `extract_data`).
+        staging_format (str, optional): 'parquet' or 'arrow'. When set, chunks
+            are streamed from the columnar staging layer. See `extract_data`.
+        staging_path (str): Directory of the staging layer.
+        sales_files (list[str], optional): Sales shard files streamed one
+            after another instead of sales.csv. See `extract_data`.
+        money (str): 'float' or 'cents', applied to products and to every
+            sales chunk. See `extract_data`.
+
+    Returns:
+        tuple: A tuple containing:
+            - df_channels (pd.DataFrame): Data from channels.csv.
+            - df_customers (pd.DataFrame): Data from customers.csv.
+            - df_products (pd.DataFrame): Data from products.csv.
+            - sales_chunks (Iterator[pd.DataFrame]): Chunks of sales.csv.
+
+        Returns (None, None, None, None) if an error occurs during extraction.
+    """
+    print(f"Starting Extraction process (Extract, streaming in chunks of {chunk_size} rows)...")
+
+    try:
+        if sales_files is not None:
+            _warn_staging_ignored(staging_format)
+            df_channels, df_customers, df_products = _read_dimension_sources(raw_data_path)
+            reader = iter_sales_files(sales_files, chunk_size)
+            # The ingest manifest, not the watermark, tells which shards are new
+            after_sale_id = None
+        elif _use_staging(raw_data_path, staging_format, staging_path):
+            df_channels, df_customers, df_products = _read_staged_dimensions(staging_path, staging_format)
+            reader = iter_staged('sales', chunk_size, staging_path, staging_format)
+        else:
+            df_channels, df_customers, df_products = _read_dimension_sources(raw_data_path)
+            reader = _read_csv_source(raw_data_path, 'sales', chunksize=chunk_size)
+        df_products = apply_money_mode(df_products, 'products', money)
+        _log_memory_usage(channels=df_channels, customers=df_customers, products=df_products)
+        sales_chunks = _filter_chunks(reader, after_sale_id, money)
+
+        print("✅ Extraction prepared successfully (sales will be streamed).")
+        return df_channels, df_customers, df_products, sales_chunks
+
     except Exception as e:
         print(f"Error during extraction: {e}")
         return None, None, None, None
+
+def _read_dimension_sources(raw_data_path):
+    """Reads the channel, customer and product CSV files."""
+    df_channels = _read_csv_source(raw_data_path, 'channels')
+    df_customers = _read_csv_source(raw_data_path, 'customers')
+    df_products = _read_csv_source(raw_data_path, 'products')
+    return df_channels, df_customers, df_products
+
+def _read_csv_source(raw_data_path, name, **kwargs):
+    """
+    Reads one raw CSV with its declared schema (`src.schema`).
+
+    Keys come back as downcast integers and low-cardinality text as
+    categoricals, instead of pandas' default int64/float64/object inference.
+    """
+    return pd.read_csv(os.path.join(raw_data_path, f'{name}.csv'), **csv_read_options(name), **kwargs)
+
+def _read_staged_dimensions(staging_path, staging_format):
+    """Reads the channel, customer and product sources from the staging layer."""
+    df_channels = read_staged('channels', staging_path, staging_format)
+    df_customers = read_staged('customers', staging_path, staging_format)
+    df_products = read_staged('products', staging_path, staging_format)
+    return df_channels, df_customers, df_products
+
+def _use_staging(raw_data_path, staging_format, staging_path):
+    """Refreshes the staging layer if requested and possible; returns whether to read from it."""
+    if not staging_format:
+        return False
+    if not staging_available():
+        print("⚠️ pyarrow is not installed; reading the raw CSV files instead of the staging layer.")
+        return False
+    stage_raw_data(raw_data_path, staging_path, staging_format)
+    return True
+
+def _log_memory_usage(**frames):
+    """Prints the rows and deep memory footprint of each extracted frame."""
+    for name, df in frames.items():
+        print(f" -> '{name}': {len(df):,} rows, {memory_usage_mb(df):.2f} MiB in memory.")
+
+def _warn_staging_ignored(staging_format):
+    """Tells that sales shards bypass the staging layer."""
+    if staging_format:
+        print("⚠️ The staging layer only covers sales.csv; reading the sales files directly.")
+
+def _report_late_sales(df_sales, after_sale_id):
+    """Tells how many shard rows fall at or below the watermark (they are loaded anyway)."""
+    if not after_sale_id:
+        return
+    late = int((df_sales['sale_id'] <= after_sale_id).sum())
+    if late:
+        print(f"⚠️ {late} sales in the new file(s) have a sale_id at or below the watermark "
+              f"({after_sale_id}); loading them as late-arriving sales.")
+
+def _filter_chunks(reader, after_sale_id, money='float'):
+    """Drops already-loaded rows from each chunk and skips chunks left empty."""
+    for chunk in reader:
+        chunk = filter_new_sales(chunk, after_sale_id)
+        if not chunk.empty:
+            yield apply_money_mode(chunk, 'sales', money)
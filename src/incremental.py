@@ -0,0 +1,158 @@
+from sqlalchemy import text
+
+# Control table that stores the high-water mark of the fact table
+WATERMARK_TABLE = 'etl_watermark'
+
+# Watermark entry counting completed loads (any load changes the warehouse version)
+LOAD_RUN_MARK = 'load_run'
+
+def get_watermark(engine, table_name='sale'):
+    """
+    Reads the persisted high-water mark of a fact table.
+
+    Args:
+        engine (sqlalchemy.engine.Engine): Warehouse engine.
+        table_name (str): Fact table the watermark belongs to.
+
+    Returns:
+        tuple: `(last_id, last_date)` of the newest row already loaded, where
+            `last_date` is a YYYYMMDD int. Returns `(0, None)` when nothing has
+            been loaded yet.
+    """
+    with engine.connect() as conn:
+        return read_watermark(conn, table_name)
+
+def update_watermark(engine, fact_sale, table_name='sale'):
+    """
+    Advances the high-water mark with the rows just loaded.
+
+    The mark only ever moves forward, so re-running it with an older batch
+    is harmless.
+
+    Args:
+        engine (sqlalchemy.engine.Engine): Warehouse engine.
+        fact_sale (pd.DataFrame): Fact rows that were committed.
+        table_name (str): Fact table the watermark belongs to.
+    """
+    if fact_sale.empty:
+        return
+    last_id = int(fact_sale['id_sale'].max())
+    last_date = int(fact_sale['date_iddate'].max())
+    with engine.begin() as conn:
+        advance_watermark(conn, table_name, last_id, last_date)
+
+def read_watermark(conn, table_name='sale'):
+    """
+    Reads a high-water mark inside an open connection or transaction.
+
+    Returns:
+        tuple: `(last_id, last_date)`, or `(0, None)` when no mark exists.
+    """
+    row = conn.execute(
+        text(f"SELECT last_id, last_date FROM {WATERMARK_TABLE} WHERE table_name = :table_name"),
+        {'table_name': table_name}
+    ).fetchone()
+    if row is None:
+        return 0, None
+    return int(row[0]), (int(row[1]) if row[1] is not None else None)
+
+def advance_watermark(conn, table_name, last_id, last_date):
+    """
+    Moves a high-water mark forward inside an open transaction.
+
+    Both values only ever increase, so replaying an older batch is harmless.
+    """
+    updates = upsert_clause(conn, {
+        'last_id': 'GREATEST(last_id, {new})',
+        'last_date': 'GREATEST(COALESCE(last_date, 0), COALESCE({new}, 0))',
+    })
+    conn.execute(
+        text(
+            f"INSERT INTO {WATERMARK_TABLE} (table_name, last_id, last_date) "
+            f"VALUES (:table_name, :last_id, :last_date) {updates}"
+        ),
+        {'table_name': table_name, 'last_id': last_id, 'last_date': last_date}
+    )
+
+def record_load_run(engine):
+    """
+    Counts a completed load in the control table.
+
+    The `load_run` entry's counter (and so its `updated_at`) changes on every
+    load, even one that only touched dimensions, which lets readers such as the
+    KPI cache detect that the warehouse content may have changed.
+
+    Args:
+        engine (sqlalchemy.engine.Engine): Warehouse engine.
+    """
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                f"INSERT INTO {WATERMARK_TABLE} (table_name, last_id) VALUES (:table_name, 1) "
+                + upsert_clause(conn, {'last_id': 'last_id + 1'})
+            ),
+            {'table_name': LOAD_RUN_MARK}
+        )
+
+def filter_new_sales(df_sales, after_sale_id):
+    """
+    Keeps only the raw sales rows above the watermark.
+
+    Args:
+        df_sales (pd.DataFrame): Raw sales data (whole file or a chunk).
+        after_sale_id (int): Last `sale_id` already in the warehouse.
+
+    Returns:
+        pd.DataFrame: Rows with `sale_id > after_sale_id`.
+    """
+    if not after_sale_id:
+        return df_sales
+    return df_sales[df_sales['sale_id'] > after_sale_id].copy()
+
+def upsert_on_duplicate_key(pd_table, conn, keys, data_iter):
+    """
+    `DataFrame.to_sql` insertion method issuing `INSERT ... ON DUPLICATE KEY UPDATE`.
+
+    New keys are inserted and existing keys get their non-key columns
+    overwritten, so changed dimension members are updated in place without
+    dropping the table. Meant to be passed as `method=upsert_on_duplicate_key`.
+    On SQLite the statement uses `ON CONFLICT DO UPDATE` (`upsert_clause`).
+    """
+    rows = [dict(zip(keys, row)) for row in data_iter]
+    if not rows:
+        return 0
+
+    columns = ', '.join(f'`{key}`' for key in keys)
+    placeholders = ', '.join(f':{key}' for key in keys)
+    updates = upsert_clause(conn, {f'`{key}`': '{new}' for key in keys})
+    statement = text(f"INSERT INTO `{pd_table.name}` ({columns}) VALUES ({placeholders}) {updates}")
+    result = conn.execute(statement, rows)
+    return result.rowcount
+
+def upsert_clause(conn, updates):
+    """
+    Builds the conflict clause of an `INSERT` that updates existing keys.
+
+    The warehouse is MySQL (`ON DUPLICATE KEY UPDATE`). SQLite 3.35+
+    (`ON CONFLICT DO UPDATE`) is accepted too, so the load path can run
+    against a file database, as the tests do.
+
+    Args:
+        conn (sqlalchemy.engine.Connection): Connection the statement runs on.
+        updates (dict): Column -> new value expression. `{new}` stands for
+            the value the row was inserted with, `GREATEST` for the larger
+            of its arguments.
+
+    Returns:
+        str: The clause, to append after `VALUES (...)`.
+    """
+    sqlite = conn.dialect.name == 'sqlite'
+    assignments = []
+    for column, expression in updates.items():
+        expression = expression.format(new=f'excluded.{column}' if sqlite else f'VALUES({column})')
+        if sqlite:
+            # Multi-argument MAX is SQLite's scalar GREATEST
+            expression = expression.replace('GREATEST(', 'MAX(')
+        assignments.append(f'{column} = {expression}')
+    prefix = 'ON CONFLICT DO UPDATE SET' if sqlite else 'ON DUPLICATE KEY UPDATE'
+    return f"{prefix} {', '.join(assignments)}"
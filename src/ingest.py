@@ -0,0 +1,175 @@
+import glob
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import pandas as pd
+from src.schema import RAW_DATE_COLUMNS, RAW_SCHEMAS, csv_read_options
+from src.staging import file_sha256
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # Optional dependency: only needed for Parquet shards
+    pq = None
+
+# Sales shard files accepted when a directory is given as the sales source
+SALES_FILE_PATTERNS = ('*.csv', '*.csv.gz', '*.parquet')
+DEFAULT_INGEST_MANIFEST = os.path.join('data', 'ingest', 'sales_manifest.json')
+DEFAULT_READ_WORKERS = 4
+
+def resolve_sales_files(sales_source):
+    """
+    Lists the sales shard files of a source.
+
+    Args:
+        sales_source (str): A directory (every `.csv`, `.csv.gz` and `.parquet`
+            file in it) or a glob pattern such as `data/landing/sales_*.csv.gz`.
+
+    Returns:
+        list[str]: Matching files, sorted by path so runs are reproducible.
+
+    Raises:
+        FileNotFoundError: If nothing matches.
+    """
+    if os.path.isdir(sales_source):
+        files = []
+        for pattern in SALES_FILE_PATTERNS:
+            files.extend(glob.glob(os.path.join(sales_source, pattern)))
+    else:
+        files = [path for path in glob.glob(sales_source) if os.path.isfile(path)]
+
+    if not files:
+        raise FileNotFoundError(f"No sales files match '{sales_source}'.")
+    return sorted(files)
+
+def pending_sales_files(files, manifest_path=DEFAULT_INGEST_MANIFEST):
+    """
+    Filters out the shards that were already ingested.
+
+    A file is skipped when the manifest holds its path with the same size and
+    mtime, or with the same SHA-256 (a touched but identical file). New or
+    modified files are returned.
+
+    Args:
+        files (list[str]): Candidate shard files (`resolve_sales_files`).
+        manifest_path (str): Ingest manifest written by `mark_ingested`.
+
+    Returns:
+        list[str]: Files still to ingest, in the given order.
+    """
+    manifest = _read_manifest(manifest_path)
+    pending = []
+    for path in files:
+        entry = manifest.get(os.path.abspath(path))
+        if entry is None:
+            pending.append(path)
+            continue
+        stat = os.stat(path)
+        if entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            continue
+        if entry['size'] != stat.st_size or file_sha256(path) != entry['sha256']:
+            pending.append(path)
+    return pending
+
+def mark_ingested(files, manifest_path=DEFAULT_INGEST_MANIFEST):
+    """
+    Records shards as ingested. Call it only once their rows are loaded, so a
+    failed run reads them again.
+
+    Args:
+        files (list[str]): Shard files that were loaded.
+        manifest_path (str): Ingest manifest to update.
+    """
+    if not files:
+        return
+    manifest = _read_manifest(manifest_path)
+    ingested_at = datetime.now().isoformat(timespec='seconds')
+    for path in files:
+        stat = os.stat(path)
+        manifest[os.path.abspath(path)] = {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': file_sha256(path),
+            'ingested_at': ingested_at,
+        }
+
+    os.makedirs(os.path.dirname(manifest_path) or '.', exist_ok=True)
+    tmp_path = manifest_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+    print(f" -> {len(files)} sales file(s) recorded in {manifest_path}.")
+
+def read_sales_files(files, workers=DEFAULT_READ_WORKERS):
+    """
+    Reads sales shards concurrently into a single frame.
+
+    Files are parsed on a thread pool (the CSV parser and gzip/Parquet
+    decoding release the GIL for most of the work, and threads avoid pickling
+    the frames back) and concatenated in file order.
+
+    Args:
+        files (list[str]): Shard files (CSV, gzip CSV or Parquet).
+        workers (int): Files read at the same time.
+
+    Returns:
+        pd.DataFrame: Sales rows with the declared raw schema.
+    """
+    if not files:
+        return empty_sales_frame()
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(files)))) as executor:
+        frames = list(executor.map(read_sales_file, files))
+    return pd.concat(frames, ignore_index=True)
+
+def iter_sales_files(files, chunk_size):
+    """
+    Streams sales shards as chunks of at most `chunk_size` rows, file by file.
+
+    Args:
+        files (list[str]): Shard files (CSV, gzip CSV or Parquet).
+        chunk_size (int): Maximum number of rows per chunk.
+
+    Yields:
+        pd.DataFrame: Sales chunks with the declared raw schema.
+    """
+    for path in files:
+        if path.endswith('.parquet'):
+            _require_parquet(path)
+            for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+                yield _apply_sales_schema(batch.to_pandas())
+        else:
+            yield from pd.read_csv(path, chunksize=chunk_size, **csv_read_options('sales'))
+
+def read_sales_file(path):
+    """Reads one sales shard with the declared raw schema."""
+    if path.endswith('.parquet'):
+        _require_parquet(path)
+        return _apply_sales_schema(pd.read_parquet(path))
+    # gzip (and other) compression is inferred from the extension
+    return pd.read_csv(path, **csv_read_options('sales'))
+
+def empty_sales_frame():
+    """Returns an empty sales frame with the declared raw schema."""
+    columns = {name: pd.Series(dtype=dtype) for name, dtype in RAW_SCHEMAS['sales'].items()}
+    for name in RAW_DATE_COLUMNS['sales']:
+        columns[name] = pd.Series(dtype='datetime64[ns]')
+    return pd.DataFrame(columns)
+
+def _apply_sales_schema(df):
+    """Casts a Parquet shard to the declared raw dtypes."""
+    df = df.astype(RAW_SCHEMAS['sales'])
+    for name in RAW_DATE_COLUMNS['sales']:
+        df[name] = pd.to_datetime(df[name])
+    return df
+
+def _require_parquet(path):
+    """Fails with a clear message when a Parquet shard cannot be read."""
+    if pq is None:
+        raise ImportError(f"pyarrow is required to read '{path}' (pip install pyarrow).")
+
+def _read_manifest(manifest_path):
+    """Loads the ingest manifest, or an empty one."""
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path) as f:
+        return json.load(f)
@@ -0,0 +1,181 @@
+import cProfile
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+try:
+    import resource  # Unix only
+except ImportError:
+    resource = None
+
+DEFAULT_REPORT_PATH = os.path.join('data', 'reports')
+
+class RunReport:
+    """
+    Collects per-stage metrics for one pipeline run.
+
+    Every stage records wall time, CPU time, rows in/out, the resident set
+    size sampled at its end (`rss_mb`) and the process peak RSS so far
+    (`process_peak_rss_mb`, a lifetime high-water mark, so stages after the
+    largest one repeat it). With `trace_memory` it also records the
+    tracemalloc peak reached while it ran (nested stages included). The report is written as JSON so runs can be compared over
+    time, and each top-level stage can optionally be profiled with cProfile.
+
+    Usage:
+        report = RunReport()
+        with report.stage('transform', rows_in=len(df_sales)) as stage:
+            ...
+            stage['rows_out'] = len(fact_sale)
+        report.write()
+    """
+
+    def __init__(self, report_path=DEFAULT_REPORT_PATH, profile=False, trace_memory=False):
+        """
+        Args:
+            report_path (str): Directory for the JSON report and profiles.
+            profile (bool): Dump a cProfile `.prof` file per top-level stage.
+            trace_memory (bool): Track Python allocation peaks with tracemalloc.
+                Off by default: it slows allocation-heavy stages down
+                considerably, so their timings are no longer representative.
+        """
+        self.run_id = datetime.now().strftime('%Y%m%dT%H%M%S')
+        self.report_path = report_path
+        self.profile = profile
+        self.trace_memory = trace_memory
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        self.stages = []
+        self._stack = []
+
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        """
+        Measures a block of work as a named stage.
+
+        Yields:
+            dict: The stage record; set `rows_out` (or extra keys) on it.
+        """
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if self.trace_memory:
+            # Keep the parent's peak so far before measuring this stage alone
+            if self._stack:
+                parent = self._stack[-1]
+                parent['_peak'] = max(parent['_peak'], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+
+        record = {
+            'stage': name,
+            'parent': self._stack[-1]['stage'] if self._stack else None,
+            'rows_in': rows_in,
+            'rows_out': None,
+            'status': 'ok',
+            '_peak': 0,
+        }
+        profiler = None
+        if self.profile and not self._stack:
+            profiler = cProfile.Profile()
+        self._stack.append(record)
+
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield record
+        except BaseException:
+            record['status'] = 'failed'
+            raise
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            record['wall_seconds'] = round(time.perf_counter() - wall_start, 4)
+            record['cpu_seconds'] = round(time.process_time() - cpu_start, 4)
+            self._stack.pop()
+
+            peak = record.pop('_peak')
+            if self.trace_memory:
+                peak = max(peak, tracemalloc.get_traced_memory()[1])
+                record['tracemalloc_peak_mb'] = round(peak / (1024 ** 2), 2)
+                if self._stack:
+                    parent = self._stack[-1]
+                    parent['_peak'] = max(parent['_peak'], peak)
+                tracemalloc.reset_peak()
+            record['rss_mb'] = current_rss_mb()
+            record['process_peak_rss_mb'] = peak_rss_mb()
+
+            if profiler is not None:
+                os.makedirs(self.report_path, exist_ok=True)
+                profile_file = os.path.join(self.report_path, f"run_{self.run_id}_{name}.prof")
+                profiler.dump_stats(profile_file)
+                record['profile'] = profile_file
+
+            self.stages.append(record)
+
+    def record(self, name, **metrics):
+        """
+        Adds a stage measured elsewhere (e.g. a table loaded on a worker thread).
+
+        Args:
+            name (str): Stage name.
+            **metrics: Values such as `wall_seconds` or `rows_out`.
+        """
+        entry = {'stage': name, 'parent': self._stack[-1]['stage'] if self._stack else None}
+        entry.update(metrics)
+        self.stages.append(entry)
+
+    def write(self):
+        """
+        Writes the run report as JSON.
+
+        Returns:
+            str: Path of the written report.
+        """
+        os.makedirs(self.report_path, exist_ok=True)
+        path = os.path.join(self.report_path, f"run_{self.run_id}.json")
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2, default=str)
+        print(f"📈 Run report written to: {path}")
+        return path
+
+    def to_dict(self):
+        """Returns the report as a JSON-serializable dict."""
+        return {
+            'run_id': self.run_id,
+            'started_at': self.started_at,
+            'stages': self.stages,
+        }
+
+def stage(report, name, rows_in=None):
+    """
+    Returns `report.stage(...)`, or a no-op context when `report` is None.
+
+    Lets the ETL functions accept an optional report without branching.
+    """
+    if report is None:
+        return nullcontext({})
+    return report.stage(name, rows_in=rows_in)
+
+def current_rss_mb():
+    """Returns the current resident set size in MiB (Linux only, None elsewhere)."""
+    try:
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return round(resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 ** 2), 2)
+
+def peak_rss_mb():
+    """
+    Returns the process peak resident set size in MiB (None where unsupported).
+
+    This is the high-water mark since the process started, not per stage.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes
+    divisor = 1024 ** 2 if os.uname().sysname == 'Darwin' else 1024
+    return round(peak / divisor, 2)
@@ -0,0 +1,239 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from src.incremental import WATERMARK_TABLE
+
+DEFAULT_CACHE_PATH = os.path.join('data', 'cache', 'kpi')
+DEFAULT_MAX_ENTRIES = 64
+DEFAULT_MAX_MB = 256
+# Seconds a warehouse version read from the database is trusted without reading it again
+DEFAULT_VERSION_MAX_AGE = 300
+VERSION_FILE = 'version.json'
+
+def read_control_rows(engine):
+    """
+    Reads the ETL control table (`etl_watermark`) in one round trip.
+
+    The rows serve both as the warehouse version stamp (`warehouse_version`)
+    and as the watermarks `src.aggregates.aggregates_are_current` checks, so
+    a dashboard needs a single control query before its KPI queries.
+
+    Args:
+        engine (sqlalchemy.engine.Engine): Warehouse engine.
+
+    Returns:
+        list: `(table_name, last_id, last_date, updated_at)` tuples ordered by
+            table name, or None if the table can not be read.
+    """
+    try:
+        with engine.connect() as conn:
+            rows = conn.execute(
+                text(f"SELECT table_name, last_id, last_date, updated_at FROM {WATERMARK_TABLE} ORDER BY table_name")
+            ).fetchall()
+    except DBAPIError:
+        return None
+    return [tuple(row) for row in rows]
+
+def warehouse_version(engine=None, control_rows=None):
+    """
+    Returns a stamp of the warehouse content, read from the control table.
+
+    Every load advances the `load_run` counter (see
+    `src.incremental.record_load_run`) and moves the fact watermark, and every
+    aggregate refresh moves its own marks, so the stamp changes whenever the KPI
+    results can change. A full rebuild recreates the control rows with new
+    `updated_at` values, so it changes the stamp as well.
+
+    Args:
+        engine (sqlalchemy.engine.Engine, optional): Warehouse engine, used to
+            read the control table when `control_rows` is not given.
+        control_rows (list, optional): Rows already read by `read_control_rows`.
+
+    Returns:
+        str: Hex digest of the control table, or None if it does not exist
+            (nothing is cached then).
+    """
+    if control_rows is None:
+        control_rows = read_control_rows(engine)
+    if control_rows is None:
+        return None
+    return hashlib.sha256(repr(control_rows).encode()).hexdigest()
+
+class KpiCache:
+    """
+    Local, size-bounded cache of KPI query results.
+
+    An entry is keyed by the hash of the query text and the warehouse version
+    stamp, so a new load invalidates every entry automatically. The version
+    last read from the control table is kept next to the entries
+    (`remember_version`) and trusted for `version_max_age` seconds, so a
+    dashboard regenerated within that window is served without touching the
+    database at all. The pipeline drops that stamp (`forget_version`) after
+    every run, so its own loads are seen at once; a load made from another
+    machine is seen once the stamp expires. Entries are pickled DataFrames;
+    the least recently used ones are evicted once `max_entries` or `max_mb`
+    is exceeded, and entries of older versions are removed as soon as a newer
+    version is written. A cache can be shared by threads running queries
+    concurrently.
+
+    Usage:
+        cache = KpiCache()
+        stamp = cache.cached_version()
+        version = stamp['version'] if stamp else warehouse_version(engine)
+        df = cache.read_sql(query, engine, version)
+    """
+
+    def __init__(self, cache_path=DEFAULT_CACHE_PATH, max_entries=DEFAULT_MAX_ENTRIES, max_mb=DEFAULT_MAX_MB,
+                 version_max_age=DEFAULT_VERSION_MAX_AGE):
+        """
+        Args:
+            cache_path (str): Directory holding the cached results.
+            max_entries (int): Maximum number of cached results.
+            max_mb (float): Maximum total size of the cached results in MiB.
+            version_max_age (float): Seconds a remembered warehouse version
+                is used without reading the control table again.
+        """
+        self.cache_path = cache_path
+        self.max_entries = max_entries
+        self.max_bytes = max_mb * 1024 ** 2
+        self.version_max_age = version_max_age
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def read_sql(self, query, engine, version):
+        """
+        Returns the result of a KPI query, from the cache when possible.
+
+        Args:
+            query (str): SQL text.
+            engine (sqlalchemy.engine.Engine): Warehouse engine, used on a miss.
+            version (str): Warehouse version stamp (`warehouse_version`). When
+                None the query is always run and nothing is stored.
+
+        Returns:
+            pd.DataFrame: The query result.
+        """
+        if version is None:
+            return pd.read_sql(query, con=engine)
+
+        path = self._entry_path(query, version)
+        if os.path.exists(path):
+            try:
+                df = pd.read_pickle(path)
+                # Refresh the access time used by the LRU eviction
+                os.utime(path)
+                with self._lock:
+                    self.hits += 1
+                return df
+            except FileNotFoundError:
+                # Evicted by a concurrent writer in the meantime
+                pass
+            except Exception:
+                # Truncated or unreadable entry: drop it and query again
+                _remove(path)
+
+        df = pd.read_sql(query, con=engine)
+        with self._lock:
+            self.misses += 1
+            self._store(path, df, version)
+        return df
+
+    def cached_version(self):
+        """
+        Returns the warehouse version remembered by `remember_version`.
+
+        Returns:
+            dict: `version` and `aggregates` (whether the aggregate tables were
+                current), or None when there is no stamp or it is older than
+                `version_max_age` seconds.
+        """
+        try:
+            with open(os.path.join(self.cache_path, VERSION_FILE)) as f:
+                stamp = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - stamp.get('read_at', 0) > self.version_max_age:
+            return None
+        return stamp
+
+    def remember_version(self, version, aggregates):
+        """
+        Records the warehouse version just read from the control table.
+
+        Args:
+            version (str): Warehouse version stamp (`warehouse_version`).
+            aggregates (bool): Whether the aggregate tables were current.
+        """
+        os.makedirs(self.cache_path, exist_ok=True)
+        path = os.path.join(self.cache_path, VERSION_FILE)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': version, 'aggregates': aggregates, 'read_at': time.time()}, f)
+        os.replace(tmp_path, path)
+
+    def forget_version(self):
+        """Drops the remembered version, so the next read checks the control table."""
+        _remove(os.path.join(self.cache_path, VERSION_FILE))
+
+    def clear(self):
+        """Removes every cached result and the remembered version."""
+        for entry in self._entries():
+            _remove(entry)
+        self.forget_version()
+
+    def _store(self, path, df, version):
+        """Writes an entry atomically, then drops stale versions and evicts LRU entries."""
+        os.makedirs(self.cache_path, exist_ok=True)
+        tmp_path = path + '.tmp'
+        df.to_pickle(tmp_path)
+        os.replace(tmp_path, path)
+
+        prefix = self._version_prefix(version)
+        entries = []
+        for entry in self._entries():
+            if not os.path.basename(entry).startswith(prefix):
+                _remove(entry)
+            else:
+                entries.append((os.path.getmtime(entry), os.path.getsize(entry), entry))
+
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        while entries and (len(entries) > self.max_entries or total > self.max_bytes):
+            _, size, entry = entries.pop(0)
+            if entry == path:
+                # Never evict the result just written
+                continue
+            _remove(entry)
+            total -= size
+
+    def _entries(self):
+        """Lists the cached result files."""
+        if not os.path.isdir(self.cache_path):
+            return []
+        return [
+            os.path.join(self.cache_path, name)
+            for name in os.listdir(self.cache_path) if name.endswith('.pkl')
+        ]
+
+    def _entry_path(self, query, version):
+        """Returns the file of a (query, version) entry."""
+        query_hash = hashlib.sha256(query.encode()).hexdigest()[:32]
+        return os.path.join(self.cache_path, f"{self._version_prefix(version)}{query_hash}.pkl")
+
+    @staticmethod
+    def _version_prefix(version):
+        """File name prefix shared by all the entries of one warehouse version."""
+        return f"{version[:16]}_"
+
+def _remove(path):
+    """Deletes a cache file, ignoring one already removed by another process."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
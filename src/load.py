@@ -1,10 +1,26 @@
+import time
+import numpy as np
 import pandas as pd
-import os
-from dotenv import load_dotenv
-from sqlalchemy import create_engine
-from urllib.parse import quote_plus 
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import bindparam, inspect, text
+from src.db import get_engine
+from src.bulk_load import bulk_load, DEFAULT_BATCH_SIZE
+from src.incremental import (
+    WATERMARK_TABLE, advance_watermark, get_watermark, update_watermark, record_load_run, upsert_on_duplicate_key
+)
+from src.checkpoint import CHECKPOINT_CHUNK_ROWS, completed_chunks, record_chunk
+from src.instrumentation import stage
+from src.money import scale_for_load
+from src.aggregates import invalidate_changed_aggregates
 
-def load_data(dim_channel, dim_customer, dim_product, dim_date, fact_sale):
+# Full-refresh swap: shadow tables are loaded, then renamed over the live ones
+SWAP_TABLES = ('channel', 'customer', 'product', 'date', 'sale')
+STAGING_SUFFIX = '__staging'
+OLD_SUFFIX = '__old'
+
+def load_data(dim_channel, dim_customer, dim_product, dim_date, fact_sale,
+              strategy='multi_insert', batch_size=DEFAULT_BATCH_SIZE, incremental=False,
+              engine=None, report=None, checkpoint_key=None):
     """
     Loads transformed data into the MySQL Data Warehouse.
 
@@ -18,45 +34,518 @@ def load_data(dim_channel, dim_customer, dim_product, dim_date, fact_sale):
         dim_product (pd.DataFrame): Transformed Product dimension data.
         dim_date (pd.DataFrame): Transformed Date dimension data.
         fact_sale (pd.DataFrame): Transformed Fact table data.
+        strategy (str): Bulk load strategy for the fact table, one of
+            `src.bulk_load.LOAD_STRATEGIES`. Defaults to 'multi_insert'.
+        batch_size (int): Rows per batch for the fact table bulk load.
+        incremental (bool): When True, dimension rows are upserted
+            (`INSERT ... ON DUPLICATE KEY UPDATE`) instead of appended, so
+            existing members are refreshed rather than duplicated.
+        engine (sqlalchemy.engine.Engine, optional): Target engine. Defaults
+            to the shared warehouse engine from `src.db.get_engine`.
+        report (src.instrumentation.RunReport, optional): When given, every
+            table load is recorded as a 'load.<table>' stage.
+        checkpoint_key (str, optional): Run fingerprint. When given, the fact
+            table is loaded in checkpointed `id_sale` chunks and chunks this
+            run already committed are skipped (see `src.checkpoint`).
     
     Raises:
         Exception: Propagates any error that occurs during the database transaction.
     """
     print("Starting Load process (Load)...")
     
-    # Reload environment variables to ensure fresh configuration
-    load_dotenv(override=True)
-    DB_USER = os.getenv("DB_USER")
-    DB_PASSWORD = os.getenv("DB_PASSWORD")
-    DB_HOST = os.getenv("DB_HOST")
-    DB_PORT = os.getenv("DB_PORT")
-    DB_NAME = os.getenv("DB_NAME")
-
-    encoded_password = quote_plus(DB_PASSWORD)
-    
-    # Create SQLAlchemy engine connection
-    engine = create_engine(f"mysql+pymysql://{DB_USER}:{encoded_password}@{DB_HOST}:{DB_PORT}/{DB_NAME}")
+    if engine is None:
+        engine = get_engine(local_infile=(strategy == 'load_data_infile'))
     
     try:
         # Load Dimension Tables first (Critical for Referential Integrity)
-        dim_channel.to_sql('channel', con=engine, if_exists='append', index=False)
+        _load_dimension(dim_channel, 'channel', engine, incremental, report)
         print(" -> Table 'channel' loaded.")
         
-        dim_customer.to_sql('customer', con=engine, if_exists='append', index=False)
+        _load_dimension(dim_customer, 'customer', engine, incremental, report)
         print(" -> Table 'customer' loaded.")
         
-        dim_product.to_sql('product', con=engine, if_exists='append', index=False)
+        _load_dimension(dim_product, 'product', engine, incremental, report)
         print(" -> Table 'product' loaded.")
         
-        dim_date.to_sql('date', con=engine, if_exists='append', index=False)
+        _load_dimension(dim_date, 'date', engine, incremental, report)
         print(" -> Table 'date' loaded.")
         
-        # Load Fact Table last
-        fact_sale.to_sql('sale', con=engine, if_exists='append', index=False)
+        # Load Fact Table last, through the bulk loader (the bulk of the volume)
+        with stage(report, 'load.sale', rows_in=len(fact_sale)) as metrics:
+            if checkpoint_key:
+                metrics['chunks_skipped'] = _load_fact_checkpointed(
+                    fact_sale, engine, checkpoint_key,
+                    lambda chunk: bulk_load(chunk, 'sale', engine, strategy=strategy, batch_size=batch_size)
+                )
+            else:
+                bulk_load(fact_sale, 'sale', engine, strategy=strategy, batch_size=batch_size)
+            update_watermark(engine, fact_sale)
+            metrics['rows_out'] = len(fact_sale)
         print(" -> Fact Table 'sale' loaded.")
         
+        record_load_run(engine)
+        print("✅ Load completed successfully.")
+        
+    except Exception as e:
+        print(f"Error during load: {e}")
+        raise e
+
+def load_data_chunked(dim_channel, dim_customer, dim_product, fact_stream,
+                      strategy='multi_insert', batch_size=DEFAULT_BATCH_SIZE, incremental=False,
+                      workers=1, engine=None, report=None):
+    """
+    Loads the Data Warehouse from a stream of transformed fact chunks.
+
+    The static dimensions are loaded first. Then, for every chunk, the date
+    rows that chunk introduces are appended before the chunk's fact rows, so
+    Foreign Key constraints hold at every step while only one chunk is held
+    in memory. Sales with an id at or below the watermark (late-arriving
+    sales of a sales shard, or a shard read again after a failed run)
+    replace the stored rows with the same id.
+
+    Args:
+        dim_channel (pd.DataFrame): Transformed Channel dimension data.
+        dim_customer (pd.DataFrame): Transformed Customer dimension data.
+        dim_product (pd.DataFrame): Transformed Product dimension data.
+        fact_stream (Iterable[tuple]): `(dim_date_new, fact_sale)` pairs as
+            produced by `transform_data_chunked`.
+        strategy (str): Bulk load strategy for the fact chunks, one of
+            `src.bulk_load.LOAD_STRATEGIES`. Defaults to 'multi_insert'.
+        batch_size (int): Rows per batch for the fact chunk bulk loads.
+        incremental (bool): When True, dimension rows are upserted instead of
+            appended. See `load_data`.
+        workers (int): Parallel connections used to load each fact chunk,
+            split by `id_sale` range. Defaults to 1 (serial).
+        engine (sqlalchemy.engine.Engine, optional): Target engine. Defaults
+            to the shared warehouse engine.
+        report (src.instrumentation.RunReport, optional): Per-table metrics sink.
+
+    Raises:
+        Exception: Propagates any error that occurs during the database transaction.
+    """
+    print("Starting Load process (Load, streaming)...")
+    
+    if engine is None:
+        engine = get_engine(local_infile=(strategy == 'load_data_infile'))
+    
+    try:
+        _load_dimension(dim_channel, 'channel', engine, incremental, report)
+        print(" -> Table 'channel' loaded.")
+        
+        _load_dimension(dim_customer, 'customer', engine, incremental, report)
+        print(" -> Table 'customer' loaded.")
+        
+        _load_dimension(dim_product, 'product', engine, incremental, report)
+        print(" -> Table 'product' loaded.")
+        
+        total_dates = 0
+        total_sales = 0
+        total_seconds = 0.0
+        chunk_number = 0
+        watermark = get_watermark(engine)[0]
+        # The stream also extracts and transforms each sales chunk lazily
+        with stage(report, 'load.sale') as metrics:
+            for chunk_number, (dim_date, fact_sale) in enumerate(fact_stream, start=1):
+                # New dates must exist before the fact rows that reference them
+                _load_dimension(dim_date, 'date', engine, incremental)
+                if not fact_sale.empty and fact_sale['id_sale'].min() <= watermark:
+                    with engine.begin() as conn:
+                        _delete_late_sales(conn, fact_sale, watermark)
+                stats = _load_fact_partitions(fact_sale, engine, workers, strategy, batch_size)
+                # Advance the mark per chunk so a failed run keeps what was committed
+                update_watermark(engine, fact_sale)
+                total_dates += len(dim_date)
+                total_sales += len(fact_sale)
+                total_seconds += stats['seconds']
+                print(f" -> Chunk {chunk_number}: {len(fact_sale)} sales, {len(dim_date)} new dates loaded.")
+            metrics['rows_out'] = total_sales
+            metrics['date_rows_out'] = total_dates
+            metrics['chunks'] = chunk_number
+        
+        print(f" -> Table 'date' loaded ({total_dates} rows).")
+        rate = total_sales / total_seconds if total_seconds > 0 else float('inf')
+        print(f" -> Fact Table 'sale' loaded ({total_sales} rows, {rate:,.0f} rows/s).")
+        record_load_run(engine)
+        print("✅ Load completed successfully.")
+        
+    except Exception as e:
+        print(f"Error during load: {e}")
+        raise e
+
+def load_data_parallel(dim_channel, dim_customer, dim_product, dim_date, fact_sale,
+                       workers=4, strategy='multi_insert', batch_size=DEFAULT_BATCH_SIZE,
+                       incremental=False, engine=None, report=None, checkpoint_key=None):
+    """
+    Loads the Data Warehouse using concurrent connections from the shared pool.
+
+    The four dimensions do not depend on each other, so they are pushed at the
+    same time on a thread pool. Once all of them are committed, the fact table
+    is split into `workers` contiguous `id_sale` ranges that are loaded in
+    parallel, each over its own pooled connection. The database driver releases
+    the GIL while waiting on the server, so threads overlap the network and
+    InnoDB work.
+
+    Args:
+        dim_channel (pd.DataFrame): Transformed Channel dimension data.
+        dim_customer (pd.DataFrame): Transformed Customer dimension data.
+        dim_product (pd.DataFrame): Transformed Product dimension data.
+        dim_date (pd.DataFrame): Transformed Date dimension data.
+        fact_sale (pd.DataFrame): Transformed Fact table data.
+        workers (int): Degree of parallelism (threads and connections). Keep
+            it within DB_POOL_SIZE + DB_MAX_OVERFLOW. Defaults to 4.
+        strategy (str): Bulk load strategy for the fact table.
+        batch_size (int): Rows per batch for the fact table bulk load.
+        incremental (bool): When True, dimension rows are upserted.
+        engine (sqlalchemy.engine.Engine, optional): Target engine. Defaults
+            to the shared warehouse engine.
+        report (src.instrumentation.RunReport, optional): Per-table metrics sink.
+        checkpoint_key (str, optional): Run fingerprint; each checkpointed
+            chunk is then loaded in parallel partitions. See `load_data`.
+
+    Raises:
+        Exception: Propagates any error that occurs during the database transaction.
+    """
+    print(f"Starting Load process (Load, parallel with {workers} workers)...")
+    
+    if engine is None:
+        engine = get_engine(local_infile=(strategy == 'load_data_infile'))
+    
+    try:
+        dimensions = {
+            'channel': dim_channel,
+            'customer': dim_customer,
+            'product': dim_product,
+            'date': dim_date,
+        }
+        
+        # Dimensions first, concurrently (Critical for Referential Integrity)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                table_name: executor.submit(_timed_load_dimension, df, table_name, engine, incremental)
+                for table_name, df in dimensions.items()
+            }
+            table_seconds = {table_name: future.result() for table_name, future in futures.items()}
+        dims_wall = time.perf_counter() - start
+        for table_name, seconds in table_seconds.items():
+            print(f" -> Table '{table_name}' loaded in {seconds:.2f}s.")
+            if report is not None:
+                report.record(f'load.{table_name}', wall_seconds=round(seconds, 4),
+                              rows_out=len(dimensions[table_name]))
+        print(f" -> Dimensions: {sum(table_seconds.values()):.2f}s of work in {dims_wall:.2f}s wall-clock.")
+        
+        # Fact Table last, partitioned by id_sale range
+        with stage(report, 'load.sale', rows_in=len(fact_sale)) as metrics:
+            start = time.perf_counter()
+            if checkpoint_key:
+                partition_seconds = []
+                metrics['chunks_skipped'] = _load_fact_checkpointed(
+                    fact_sale, engine, checkpoint_key,
+                    lambda chunk: partition_seconds.append(
+                        _load_fact_partitions(chunk, engine, workers, strategy, batch_size)['partition_seconds']
+                    )
+                )
+                seconds = time.perf_counter() - start
+                stats = {
+                    'seconds': seconds,
+                    'partition_seconds': sum(partition_seconds),
+                    'rows_per_sec': len(fact_sale) / seconds if seconds > 0 else float('inf'),
+                }
+            else:
+                stats = _load_fact_partitions(fact_sale, engine, workers, strategy, batch_size)
+            update_watermark(engine, fact_sale)
+            metrics['rows_out'] = len(fact_sale)
+            metrics['partitions'] = min(workers, max(len(fact_sale), 1))
+        print(f" -> Fact Table 'sale' loaded: {stats['partition_seconds']:.2f}s of work in "
+              f"{stats['seconds']:.2f}s wall-clock ({stats['rows_per_sec']:,.0f} rows/s).")
+        
+        record_load_run(engine)
         print("✅ Load completed successfully.")
         
     except Exception as e:
         print(f"Error during load: {e}")
         raise e
+
+def load_data_swap(dim_channel, dim_customer, dim_product, dim_date, fact_sale,
+                   workers=1, strategy='multi_insert', batch_size=DEFAULT_BATCH_SIZE,
+                   engine=None, report=None):
+    """
+    Replaces the whole warehouse content without a read downtime.
+
+    Every table is bulk loaded into a shadow copy (`sale__staging`, ...)
+    created with `CREATE TABLE ... LIKE`, which copies the keys but not the
+    Foreign Keys, so no constraint is checked row by row. The secondary
+    indexes of the shadow fact table are dropped before the insert and built
+    once afterwards in a single `ALTER TABLE`. The Foreign Keys of the live
+    tables are then moved to the shadow tables and one `RENAME TABLE` swaps
+    all of them atomically: readers see either the previous or the new
+    warehouse, never an empty or partial one. The fact watermark is set to
+    the new content; the caller should rebuild the KPI aggregates.
+
+    Args:
+        dim_channel (pd.DataFrame): Transformed Channel dimension data.
+        dim_customer (pd.DataFrame): Transformed Customer dimension data.
+        dim_product (pd.DataFrame): Transformed Product dimension data.
+        dim_date (pd.DataFrame): Transformed Date dimension data.
+        fact_sale (pd.DataFrame): Transformed Fact table data (full history).
+        workers (int): Parallel connections for the shadow fact table load.
+        strategy (str): Bulk load strategy for the fact table.
+        batch_size (int): Rows per batch for the fact table bulk load.
+        engine (sqlalchemy.engine.Engine, optional): Target engine. Defaults
+            to the shared warehouse engine.
+        report (src.instrumentation.RunReport, optional): Per-table metrics sink.
+
+    Raises:
+        Exception: Propagates any error. The live tables are left untouched
+            unless the final swap itself fails, and the shadow tables are
+            dropped so a failed refresh does not hold a second copy of the
+            warehouse until the next run.
+    """
+    print("Starting Load process (Load, full refresh into shadow tables)...")
+
+    if engine is None:
+        engine = get_engine(local_infile=(strategy == 'load_data_infile'))
+
+    try:
+        _create_shadow_tables(engine)
+        dimensions = {
+            'channel': dim_channel,
+            'customer': dim_customer,
+            'product': dim_product,
+            'date': dim_date,
+        }
+        for table_name, df in dimensions.items():
+            with stage(report, f'load.{table_name}', rows_in=len(df)) as metrics:
+                scale_for_load(df, table_name).to_sql(
+                    table_name + STAGING_SUFFIX, con=engine, if_exists='append', index=False
+                )
+                metrics['rows_out'] = len(df)
+            print(f" -> Shadow table '{table_name}{STAGING_SUFFIX}' loaded.")
+
+        with stage(report, 'load.sale', rows_in=len(fact_sale)) as metrics:
+            shadow_sale = 'sale' + STAGING_SUFFIX
+            indexes = _drop_secondary_indexes(engine, shadow_sale)
+            stats = _load_fact_partitions(fact_sale, engine, workers, strategy, batch_size, table_name=shadow_sale)
+            start = time.perf_counter()
+            _add_indexes(engine, shadow_sale, indexes)
+            metrics['rows_out'] = len(fact_sale)
+            metrics['index_seconds'] = round(time.perf_counter() - start, 4)
+        print(f" -> Shadow fact table loaded ({stats['rows_per_sec']:,.0f} rows/s), "
+              f"{len(indexes)} secondary index(es) built in {metrics['index_seconds']:.2f}s.")
+
+        with stage(report, 'load.swap'):
+            _swap_shadow_tables(engine)
+        print(f" -> Swapped {len(SWAP_TABLES)} tables in a single RENAME TABLE.")
+
+        with engine.begin() as conn:
+            # The warehouse now holds exactly this history: reset the mark to it
+            conn.execute(text(f"DELETE FROM {WATERMARK_TABLE} WHERE table_name = 'sale'"))
+            if not fact_sale.empty:
+                advance_watermark(conn, 'sale', int(fact_sale['id_sale'].max()), int(fact_sale['date_iddate'].max()))
+        record_load_run(engine)
+        print("✅ Load completed successfully.")
+
+    except Exception as e:
+        print(f"Error during load: {e}")
+        _drop_shadow_tables(engine)
+        raise e
+
+def _create_shadow_tables(engine):
+    """Creates empty shadow copies of the live tables, dropping leftovers of a failed run."""
+    with engine.begin() as conn:
+        for table_name in SWAP_TABLES:
+            conn.execute(text(f"DROP TABLE IF EXISTS `{table_name}{STAGING_SUFFIX}`"))
+            conn.execute(text(f"DROP TABLE IF EXISTS `{table_name}{OLD_SUFFIX}`"))
+            conn.execute(text(f"CREATE TABLE `{table_name}{STAGING_SUFFIX}` LIKE `{table_name}`"))
+
+def _drop_shadow_tables(engine):
+    """Drops the shadow and previous copies left by a failed full refresh, never the live tables."""
+    try:
+        with engine.begin() as conn:
+            for table_name in SWAP_TABLES:
+                conn.execute(text(f"DROP TABLE IF EXISTS `{table_name}{STAGING_SUFFIX}`"))
+                conn.execute(text(f"DROP TABLE IF EXISTS `{table_name}{OLD_SUFFIX}`"))
+    except Exception as e:
+        # The next full refresh drops them before loading again
+        print(f"⚠️ Could not drop the shadow tables: {e}")
+
+def _drop_secondary_indexes(engine, table_name):
+    """Drops the non-primary indexes of a table and returns their definitions."""
+    indexes = inspect(engine).get_indexes(table_name)
+    if indexes:
+        drops = ', '.join(f"DROP INDEX `{index['name']}`" for index in indexes)
+        with engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE `{table_name}` {drops}"))
+    return indexes
+
+def _add_indexes(engine, table_name, indexes):
+    """Builds several indexes with a single ALTER TABLE (one pass over the table)."""
+    if not indexes:
+        return
+    adds = []
+    for index in indexes:
+        kind = 'UNIQUE INDEX' if index['unique'] else 'INDEX'
+        columns = ', '.join(f'`{column}`' for column in index['column_names'])
+        adds.append(f"ADD {kind} `{index['name']}` ({columns})")
+    with engine.begin() as conn:
+        conn.execute(text(f"ALTER TABLE `{table_name}` {', '.join(adds)}"))
+
+def _swap_shadow_tables(engine):
+    """
+    Moves the Foreign Keys to the shadow tables and renames them over the live ones.
+
+    Constraint names are unique per database, so the live constraints are
+    dropped before being recreated on the shadow tables (both are metadata-only
+    changes with FOREIGN_KEY_CHECKS off). If the swap fails, the live
+    constraints are restored.
+    """
+    inspector = inspect(engine)
+    foreign_keys = {table_name: inspector.get_foreign_keys(table_name) for table_name in SWAP_TABLES}
+    renames = ', '.join(
+        f"`{t}` TO `{t}{OLD_SUFFIX}`, `{t}{STAGING_SUFFIX}` TO `{t}`" for t in SWAP_TABLES
+    )
+
+    with engine.connect() as conn:
+        conn.execute(text("SET FOREIGN_KEY_CHECKS = 0"))
+        try:
+            _move_foreign_keys(conn, foreign_keys, source_suffix='', target_suffix=STAGING_SUFFIX)
+            try:
+                conn.execute(text(f"RENAME TABLE {renames}"))
+            except Exception:
+                _move_foreign_keys(conn, foreign_keys, source_suffix=STAGING_SUFFIX, target_suffix='')
+                raise
+            for table_name in SWAP_TABLES:
+                conn.execute(text(f"DROP TABLE `{table_name}{OLD_SUFFIX}`"))
+        finally:
+            conn.execute(text("SET FOREIGN_KEY_CHECKS = 1"))
+            conn.commit()
+
+def _move_foreign_keys(conn, foreign_keys, source_suffix, target_suffix):
+    """Drops the given Foreign Keys from one set of tables and adds them to the other."""
+    for table_name, keys in foreign_keys.items():
+        if not keys:
+            continue
+        drops = ', '.join(f"DROP FOREIGN KEY `{key['name']}`" for key in keys)
+        conn.execute(text(f"ALTER TABLE `{table_name}{source_suffix}` {drops}"))
+
+        adds = []
+        for key in keys:
+            referred = key['referred_table']
+            if referred in SWAP_TABLES:
+                referred += target_suffix
+            columns = ', '.join(f'`{column}`' for column in key['constrained_columns'])
+            referred_columns = ', '.join(f'`{column}`' for column in key['referred_columns'])
+            adds.append(
+                f"ADD CONSTRAINT `{key['name']}` FOREIGN KEY ({columns}) "
+                f"REFERENCES `{referred}` ({referred_columns})"
+            )
+        conn.execute(text(f"ALTER TABLE `{table_name}{target_suffix}` {', '.join(adds)}"))
+
+def _load_fact_checkpointed(fact_sale, engine, checkpoint_key, load_chunk):
+    """
+    Loads the fact rows in `id_sale` chunks, recording each committed chunk.
+
+    Chunks already recorded for this run are skipped. A chunk without a
+    record first has its `id_sale` range deleted, which removes rows a failed
+    attempt may have committed before it could record the chunk (ids above
+    the watermark belong to no completed load). Ids at or below the watermark
+    (late-arriving sales of a sales shard) share their range with earlier
+    loads, so only the chunk's own ids are deleted there: a failed attempt's
+    rows are cleared and a re-delivered sale replaces the stored one.
+
+    Args:
+        fact_sale (pd.DataFrame): Transformed Fact table data.
+        engine (sqlalchemy.engine.Engine): Warehouse engine.
+        checkpoint_key (str): Run fingerprint.
+        load_chunk (callable): Loads one chunk DataFrame into `sale`.
+
+    Returns:
+        int: Number of chunks skipped.
+    """
+    done = completed_chunks(engine, checkpoint_key)
+    # The watermark only moves once the whole fact table is loaded
+    watermark = get_watermark(engine)[0]
+    ordered = fact_sale.sort_values('id_sale', kind='stable')
+    skipped = 0
+    for chunk_no, offset in enumerate(range(0, len(ordered), CHECKPOINT_CHUNK_ROWS)):
+        chunk = ordered.iloc[offset:offset + CHECKPOINT_CHUNK_ROWS]
+        first_id, last_id = int(chunk['id_sale'].iloc[0]), int(chunk['id_sale'].iloc[-1])
+        if done.get(chunk_no) == (first_id, last_id):
+            skipped += 1
+            continue
+        with engine.begin() as conn:
+            if last_id > watermark:
+                conn.execute(
+                    text("DELETE FROM sale WHERE id_sale BETWEEN :first_id AND :last_id"),
+                    {'first_id': max(first_id, watermark + 1), 'last_id': last_id}
+                )
+            _delete_late_sales(conn, chunk, watermark)
+        load_chunk(chunk)
+        record_chunk(engine, checkpoint_key, chunk_no, first_id, last_id, len(chunk))
+    if skipped:
+        print(f" -> Resumed fact load: {skipped} chunk(s) already committed were skipped.")
+    return skipped
+
+def _delete_late_sales(conn, fact_sale, watermark):
+    """Deletes the stored sales whose ids, at or below the watermark, are loaded again."""
+    ids = fact_sale['id_sale'].to_numpy()
+    late_ids = ids[ids <= watermark]
+    if len(late_ids):
+        conn.execute(
+            text("DELETE FROM sale WHERE id_sale IN :ids").bindparams(bindparam('ids', expanding=True)),
+            {'ids': late_ids.tolist()}
+        )
+
+def _load_fact_partitions(fact_sale, engine, workers, strategy, batch_size, table_name='sale'):
+    """
+    Bulk loads the fact rows split into `workers` contiguous `id_sale` ranges.
+
+    Returns:
+        dict: Aggregated statistics with `rows`, `seconds` (wall-clock),
+            `partition_seconds` (sum over partitions) and `rows_per_sec`.
+    """
+    if workers <= 1 or len(fact_sale) < 2:
+        stats = bulk_load(fact_sale, table_name, engine, strategy=strategy, batch_size=batch_size)
+        stats['partition_seconds'] = stats['seconds']
+        return stats
+    
+    # Sorting once makes every partition a contiguous id range of similar size
+    ordered = fact_sale.sort_values('id_sale', kind='stable')
+    bounds = np.linspace(0, len(ordered), min(workers, len(ordered)) + 1).astype(int)
+    partitions = [ordered.iloc[lo:hi] for lo, hi in zip(bounds[:-1], bounds[1:])]
+    
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(bulk_load, partition, table_name, engine, strategy=strategy, batch_size=batch_size)
+            for partition in partitions
+        ]
+        results = [future.result() for future in futures]
+    seconds = time.perf_counter() - start
+    
+    return {
+        'table': table_name,
+        'strategy': strategy,
+        'rows': len(fact_sale),
+        'seconds': seconds,
+        'partition_seconds': sum(result['seconds'] for result in results),
+        'rows_per_sec': len(fact_sale) / seconds if seconds > 0 else float('inf'),
+    }
+
+def _load_dimension(df, table_name, engine, incremental, report=None):
+    """
+    Appends a dimension, or upserts it when running incrementally. Before an
+    upsert, aggregates grouped by attributes it changes are reset.
+    """
+    method = upsert_on_duplicate_key if incremental else None
+    with stage(report, f'load.{table_name}', rows_in=len(df)) as metrics:
+        if incremental:
+            invalidate_changed_aggregates(engine, table_name, df)
+        scale_for_load(df, table_name).to_sql(table_name, con=engine, if_exists='append', index=False, method=method)
+        metrics['rows_out'] = len(df)
+
+def _timed_load_dimension(df, table_name, engine, incremental):
+    """Loads one dimension and returns the seconds it took."""
+    start = time.perf_counter()
+    _load_dimension(df, table_name, engine, incremental)
+    return time.perf_counter() - start
@@ -0,0 +1,62 @@
+# Declared schema of the raw data layer.
+# Explicit dtypes avoid pandas' type inference on every read and keep frames
+# compact: integer keys fit in int32 (the warehouse uses INT), low-cardinality
+# text columns are categoricals and prices stay float64.
+
+# Columns parsed as datetimes, per source file
+RAW_DATE_COLUMNS = {
+    'sales': ['sale_date'],
+}
+
+# Column dtypes, per source file (file name without extension)
+RAW_SCHEMAS = {
+    'channels': {
+        'channel_id': 'int32',
+        'channel': 'category',
+    },
+    'customers': {
+        'customer_id': 'int32',
+        'name': 'object',
+        'city': 'category',
+        'country': 'category',
+        'age': 'int16',
+    },
+    'products': {
+        'product_id': 'int32',
+        'name': 'object',
+        'category': 'category',
+        'brand': 'category',
+        'unit_price': 'float64',
+        'unit_cost': 'float64',
+    },
+    'sales': {
+        'sale_id': 'int32',
+        'product_id': 'int32',
+        'customer_id': 'int32',
+        'channel_id': 'int32',
+        'quantity': 'int32',
+        'unit_price_sale': 'float64',
+    },
+}
+
+# Raw source files, in the order `extract_data` returns them
+RAW_SOURCES = ('channels', 'customers', 'products', 'sales')
+
+def csv_read_options(name):
+    """
+    Returns the `pd.read_csv` keyword arguments that apply a source's schema.
+
+    Args:
+        name (str): Source name, e.g. 'sales'.
+
+    Returns:
+        dict: `dtype` and `parse_dates` options.
+    """
+    return {
+        'dtype': RAW_SCHEMAS[name],
+        'parse_dates': RAW_DATE_COLUMNS.get(name, False),
+    }
+
+def memory_usage_mb(df):
+    """Returns the deep memory footprint of a DataFrame in MiB."""
+    return df.memory_usage(deep=True).sum() / (1024 ** 2)
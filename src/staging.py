@@ -0,0 +1,208 @@
+import hashlib
+import json
+import os
+import pandas as pd
+from src.schema import RAW_SCHEMAS, RAW_SOURCES, csv_read_options
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Optional dependency: without it the pipeline reads the raw CSVs
+    pa = None
+    pq = None
+
+STAGING_FORMATS = ('parquet', 'arrow')
+STAGING_EXTENSIONS = {'parquet': '.parquet', 'arrow': '.arrow'}
+DEFAULT_STAGING_PATH = os.path.join('data', 'staging')
+MANIFEST_FILE = '_manifest.json'
+
+# Rows converted per step, so staging a huge sales.csv never holds it all in memory
+CONVERSION_CHUNK_SIZE = 1_000_000
+
+def staging_available():
+    """Returns True when pyarrow is installed and the staging layer can be used."""
+    return pa is not None
+
+def stage_raw_data(raw_data_path, staging_path=DEFAULT_STAGING_PATH, file_format='parquet'):
+    """
+    Converts the raw CSV layer into typed, compressed columnar files.
+
+    Each source is parsed once with the declared schema (`src.schema`) and
+    written as Parquet (zstd) or Arrow IPC (lz4). Conversion is idempotent: a
+    manifest keeps every source's size, mtime and SHA-256, and a file is only
+    converted again when its content actually changed (a touched but identical
+    file just refreshes its manifest entry).
+
+    Args:
+        raw_data_path (str): Directory holding the raw CSV files.
+        staging_path (str): Directory where staged files are written.
+        file_format (str): 'parquet' or 'arrow'.
+
+    Returns:
+        dict: Source name -> staged file path.
+
+    Raises:
+        ImportError: If pyarrow is not installed.
+        ValueError: If the file format is unknown.
+    """
+    if not staging_available():
+        raise ImportError("pyarrow is required for the staging layer (pip install pyarrow).")
+    if file_format not in STAGING_FORMATS:
+        raise ValueError(f"Unknown staging format '{file_format}'. Expected one of {STAGING_FORMATS}.")
+
+    os.makedirs(staging_path, exist_ok=True)
+    manifest = _read_manifest(staging_path)
+    staged = {}
+
+    for name in RAW_SOURCES:
+        source = os.path.join(raw_data_path, f'{name}.csv')
+        target = staged_file_path(name, staging_path, file_format)
+        stat = os.stat(source)
+        entry = manifest.get(os.path.basename(target))
+
+        if entry and os.path.exists(target):
+            if entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+                staged[name] = target
+                continue
+            digest = file_sha256(source)
+            if digest == entry['sha256']:
+                # Same content, new timestamp: no need to convert again
+                entry['mtime_ns'] = stat.st_mtime_ns
+                staged[name] = target
+                continue
+        else:
+            digest = file_sha256(source)
+
+        print(f" -> Staging '{name}.csv' as {file_format}...")
+        rows = _convert_csv(source, target, name, file_format)
+        manifest[os.path.basename(target)] = {
+            'source': source,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': digest,
+            'rows': rows,
+        }
+        staged[name] = target
+
+    _write_manifest(staging_path, manifest)
+    return staged
+
+def read_staged(name, staging_path=DEFAULT_STAGING_PATH, file_format='parquet', columns=None, filters=None):
+    """
+    Reads a staged source into a DataFrame.
+
+    Files are memory-mapped and only the requested columns are decoded.
+
+    Args:
+        name (str): Source name, e.g. 'sales'.
+        staging_path (str): Directory holding the staged files.
+        file_format (str): 'parquet' or 'arrow'.
+        columns (list, optional): Column projection. Defaults to all columns.
+        filters (list, optional): Parquet predicate pushdown, e.g.
+            `[('sale_id', '>', 100)]`. Ignored for Arrow IPC.
+
+    Returns:
+        pd.DataFrame: The staged data with its declared dtypes.
+    """
+    path = staged_file_path(name, staging_path, file_format)
+    if file_format == 'parquet':
+        table = pq.read_table(path, columns=columns, filters=filters, memory_map=True)
+    else:
+        with pa.memory_map(path) as source:
+            table = pa.ipc.open_file(source).read_all()
+        if columns is not None:
+            table = table.select(columns)
+    return table.to_pandas()
+
+def iter_staged(name, batch_size, staging_path=DEFAULT_STAGING_PATH, file_format='parquet', columns=None):
+    """
+    Yields a staged source as DataFrames of at most `batch_size` rows.
+
+    Args:
+        name (str): Source name, e.g. 'sales'.
+        batch_size (int): Maximum rows per yielded DataFrame.
+        staging_path (str): Directory holding the staged files.
+        file_format (str): 'parquet' or 'arrow'.
+        columns (list, optional): Column projection. Defaults to all columns.
+
+    Yields:
+        pd.DataFrame: Consecutive slices of the staged data.
+    """
+    path = staged_file_path(name, staging_path, file_format)
+    if file_format == 'parquet':
+        parquet_file = pq.ParquetFile(path, memory_map=True)
+        for batch in parquet_file.iter_batches(batch_size=batch_size, columns=columns):
+            yield batch.to_pandas()
+    else:
+        with pa.memory_map(path) as source:
+            reader = pa.ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i)
+                if columns is not None:
+                    batch = batch.select(columns)
+                for offset in range(0, batch.num_rows, batch_size):
+                    yield batch.slice(offset, batch_size).to_pandas()
+
+def staged_file_path(name, staging_path=DEFAULT_STAGING_PATH, file_format='parquet'):
+    """Returns the path of a staged source file."""
+    return os.path.join(staging_path, name + STAGING_EXTENSIONS[file_format])
+
+def file_sha256(path):
+    """Hashes a file in 1 MiB blocks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _convert_csv(source, target, name, file_format):
+    """Parses one CSV with its declared schema and writes it atomically."""
+    read_options = csv_read_options(name)
+    # Categorical columns need a single dictionary per file, so dimension
+    # sources (small) are converted in one go; the others are streamed.
+    if 'category' in RAW_SCHEMAS[name].values():
+        chunks = [pd.read_csv(source, **read_options)]
+    else:
+        chunks = pd.read_csv(source, chunksize=CONVERSION_CHUNK_SIZE, **read_options)
+
+    tmp_path = target + '.tmp'
+    writer = None
+    rows = 0
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = _open_writer(tmp_path, table.schema, file_format)
+            writer.write_table(table)
+            rows += len(chunk)
+        if writer is None:
+            # Header-only source: keep the typed, empty schema
+            table = pa.Table.from_pandas(pd.read_csv(source, nrows=0, **read_options), preserve_index=False)
+            writer = _open_writer(tmp_path, table.schema, file_format)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    os.replace(tmp_path, target)
+    return rows
+
+def _open_writer(path, schema, file_format):
+    """Opens a compressed columnar writer for the staging format."""
+    if file_format == 'parquet':
+        return pq.ParquetWriter(path, schema, compression='zstd')
+    options = pa.ipc.IpcWriteOptions(compression='lz4')
+    return pa.ipc.new_file(path, schema, options=options)
+
+def _read_manifest(staging_path):
+    """Loads the staging manifest, or an empty one."""
+    path = os.path.join(staging_path, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def _write_manifest(staging_path, manifest):
+    """Persists the staging manifest."""
+    with open(os.path.join(staging_path, MANIFEST_FILE), 'w') as f:
+        json.dump(manifest, f, indent=2)
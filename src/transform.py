@@ -1,6 +1,32 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
+from src.money import scale_for_load
+from src.scd import SCD_DIMENSIONS, apply_scd2, resolve_versions
 
-def transform_data(df_channels, df_customers, df_products, df_sales):
+# What to do with sales referencing a product/customer/channel that does not exist:
+# - 'quarantine': drop them from the fact table and append them to QUARANTINE_PATH.
+# - 'unknown': point them to the "Unknown" member (key UNKNOWN_KEY) of the dimension.
+# - 'fail': raise before anything is loaded.
+ORPHAN_POLICIES = ('quarantine', 'unknown', 'fail')
+QUARANTINE_PATH = os.path.join('data', 'quarantine', 'sales_orphans.csv')
+UNKNOWN_KEY = -1
+
+# Source ID column of every descriptive dimension
+DIMENSION_KEYS = {'channel': 'channel_id', 'customer': 'customer_id', 'product': 'product_id'}
+
+# Sales key column -> Fact table Foreign Key column
+SALES_FOREIGN_KEYS = {
+    'customer_id': 'customer_idcustomer',
+    'product_id': 'product_idproduct',
+    'channel_id': 'channel_idchannel',
+}
+
+def transform_data(df_channels, df_customers, df_products, df_sales, full_calendar=False,
+                   orphan_policy='quarantine', quarantine_path=QUARANTINE_PATH, dimension_versions=None,
+                   effective_date=None):
     """
     Transforms raw data into dimensional and fact tables for the Data Warehouse.
     
@@ -13,72 +39,542 @@ def transform_data(df_channels, df_customers, df_products, df_sales):
         df_customers (pd.DataFrame): Raw customer data.
         df_products (pd.DataFrame): Raw product data.
         df_sales (pd.DataFrame): Raw sales data.
+        full_calendar (bool): When True, the Date dimension covers every day
+            between the first and last sale, not only the days with sales.
+        orphan_policy (str): Handling of sales whose product, customer or
+            channel does not exist, one of `ORPHAN_POLICIES`. Orphans are
+            detected before any database I/O.
+        quarantine_path (str): CSV file receiving quarantined sales.
+        dimension_versions (dict, optional): 'customer'/'product' -> stored
+            version table (`src.scd.read_dimension_versions`). When given,
+            both dimensions are tracked as SCD Type 2 (`scd2` schema): changed
+            members get a new version from `effective_date` on, and each sale
+            references the version current at its sale date.
+        effective_date (pd.Timestamp, optional): First day the source values
+            of changed members apply, usually the day after the last sale
+            already loaded, so late-arriving sales keep the old version.
+            Defaults to the first sale date of the batch.
 
     Returns:
         tuple: A tuple containing the transformed DataFrames:
             - dim_channel (pd.DataFrame): Transformed Channel dimension.
-            - dim_customer (pd.DataFrame): Transformed Customer dimension.
-            - dim_product (pd.DataFrame): Transformed Product dimension.
+            - dim_customer (pd.DataFrame): Transformed Customer dimension
+              (every version with SCD Type 2).
+            - dim_product (pd.DataFrame): Transformed Product dimension
+              (every version with SCD Type 2).
             - dim_date (pd.DataFrame): Transformed Date dimension.
             - fact_sale (pd.DataFrame): Transformed Fact table with calculated metrics.
     """
     print("Starting Transformation process (Transform)...")
     
-    # --- 1. STANDARDIZATION ---
-    # Convert text fields to Title Case or Uppercase for consistency
-    df_products['category'] = df_products['category'].str.strip().str.title()
-    df_products['brand'] = df_products['brand'].str.strip().str.upper()
-    df_customers['city'] = df_customers['city'].str.strip().str.title()
-    df_customers['country'] = df_customers['country'].str.strip().str.title()
+    # --- 1. STANDARDIZATION & 2. SURROGATE KEYS (SK) PREPARATION ---
+    df_channels, df_customers, df_products = deduplicate_dimensions(df_channels, df_customers, df_products)
+    dim_channel, dim_customer, dim_product = transform_dimensions(df_channels, df_customers, df_products)
+    if orphan_policy == 'unknown':
+        dim_channel, dim_customer, dim_product = add_unknown_members(dim_channel, dim_customer, dim_product)
+    
+    # --- 3. DATE DIMENSION GENERATION ---
+    # Convert sale_date to datetime objects (parsed once, reused by the fact table)
+    df_sales['sale_date'] = parse_sale_dates(df_sales['sale_date'])
+    dim_date = build_date_dimension(df_sales['sale_date'], full_calendar=full_calendar)
+    
+    if dimension_versions is not None:
+        # --- 3b. SLOWLY CHANGING DIMENSIONS (Type 2) ---
+        if effective_date is None:
+            # Changes found in this batch apply from its first sale on
+            effective_date = df_sales['sale_date'].min() if len(df_sales) else pd.Timestamp.today()
+        dimension_versions = dict(dimension_versions)
+        for dimension, incoming in (('customer', dim_customer), ('product', dim_product)):
+            dimension_versions[dimension], counts = apply_scd2(
+                dimension_versions[dimension], incoming, dimension, effective_date
+            )
+            print(f"    [scd2] {dimension}: {counts['new']} new member(s), {counts['changed']} changed.")
+        dim_customer, dim_product = dimension_versions['customer'], dimension_versions['product']
+    
+    # --- 4. FACT TABLE ENRICHMENT & CALCULATION ---
+    fact_sale = transform_sales(
+        df_sales, df_products, df_customers, df_channels,
+        orphan_policy=orphan_policy, quarantine_path=quarantine_path, dimension_versions=dimension_versions
+    )
+    _report_orphans(fact_sale, orphan_policy, quarantine_path)
+    
+    print("✅ Transformation completed successfully (Standardization & Derived Attributes applied).")
+    return dim_channel, dim_customer, dim_product, dim_date, fact_sale
+
+def transform_data_chunked(df_channels, df_customers, df_products, sales_chunks, full_calendar=False,
+                           orphan_policy='quarantine', quarantine_path=QUARANTINE_PATH):
+    """
+    Streaming variant of `transform_data`.
+
+    The dimensions are transformed once, up front. Sales chunks are enriched
+    lazily against the in-memory product dimension, so only one chunk of the
+    fact table is materialized at a time. Each chunk is paired with the date
+    dimension rows that first appear in it; concatenating all yielded pieces
+    reproduces exactly the output of the batch path.
+
+    Args:
+        df_channels (pd.DataFrame): Raw channel data.
+        df_customers (pd.DataFrame): Raw customer data.
+        df_products (pd.DataFrame): Raw product data.
+        sales_chunks (Iterable[pd.DataFrame]): Raw sales data, chunk by chunk.
+        full_calendar (bool): When True, each chunk's date rows cover every day
+            of the chunk's date range. See `build_date_dimension`.
+        orphan_policy (str): See `transform_data`. With 'fail', the error is
+            raised by the chunk holding the first orphan, after the previous
+            chunks were loaded.
+        quarantine_path (str): CSV file receiving quarantined sales.
+
+    Returns:
+        tuple: A tuple containing:
+            - dim_channel (pd.DataFrame): Transformed Channel dimension.
+            - dim_customer (pd.DataFrame): Transformed Customer dimension.
+            - dim_product (pd.DataFrame): Transformed Product dimension.
+            - fact_stream (Iterator[tuple]): Lazy `(dim_date_new, fact_sale)` pairs,
+              where `dim_date_new` only holds dates not seen in earlier chunks.
+    """
+    print("Starting Transformation process (Transform, streaming)...")
+    
+    df_channels, df_customers, df_products = deduplicate_dimensions(df_channels, df_customers, df_products)
+    dim_channel, dim_customer, dim_product = transform_dimensions(df_channels, df_customers, df_products)
+    if orphan_policy == 'unknown':
+        dim_channel, dim_customer, dim_product = add_unknown_members(dim_channel, dim_customer, dim_product)
+    fact_stream = _transform_sales_stream(
+        sales_chunks, df_products, df_customers, df_channels, full_calendar, orphan_policy, quarantine_path
+    )
+    
+    print("✅ Dimensions transformed. Fact chunks will be transformed on demand.")
+    return dim_channel, dim_customer, dim_product, fact_stream
+
+def transform_data_parallel(df_channels, df_customers, df_products, df_sales, workers=4, full_calendar=False,
+                            orphan_policy='quarantine', quarantine_path=QUARANTINE_PATH):
+    """
+    Multi-process variant of `transform_data` for very large sales inputs.
+
+    Every fact-side operation is row-local, so the sales are split into
+    `workers` contiguous row ranges transformed by a process pool. The small
+    dimension tables reach each worker once, through the pool initializer,
+    and each task carries its own slice of the sales. The distinct dates found
+    by every partition are merged in the parent into a single Date dimension.
+    The output is identical to `transform_data`, quarantine file included.
+
+    Workers are started with 'forkserver' (or 'spawn' where it is missing),
+    never forked: the pipeline already runs threads (the pooled engine, the
+    sales file readers), and forking a threaded process can deadlock the
+    child on a lock held by a thread that does not exist there. The price is
+    pickling the sales partitions to the workers and a fresh interpreter
+    import per worker, so this pays off only on large inputs.
+
+    Args:
+        df_channels (pd.DataFrame): Raw channel data.
+        df_customers (pd.DataFrame): Raw customer data.
+        df_products (pd.DataFrame): Raw product data.
+        df_sales (pd.DataFrame): Raw sales data.
+        workers (int): Number of worker processes (and partitions).
+        full_calendar (bool): See `transform_data`.
+        orphan_policy (str): See `transform_data`.
+        quarantine_path (str): CSV file receiving quarantined sales.
+
+    Returns:
+        tuple: The same five DataFrames as `transform_data`.
+    """
+    print(f"Starting Transformation process (Transform, {workers} processes)...")
+    
+    df_channels, df_customers, df_products = deduplicate_dimensions(df_channels, df_customers, df_products)
+    dim_channel, dim_customer, dim_product = transform_dimensions(df_channels, df_customers, df_products)
+    if orphan_policy == 'unknown':
+        dim_channel, dim_customer, dim_product = add_unknown_members(dim_channel, dim_customer, dim_product)
+    
+    bounds = np.linspace(0, len(df_sales), max(workers, 1) + 1).astype(int)
+    ranges = [(int(lo), int(hi)) for lo, hi in zip(bounds[:-1], bounds[1:]) if hi > lo] or [(0, 0)]
+    part_paths = [f"{quarantine_path}.part{number:03d}" for number in range(len(ranges))]
+    
+    # Fresh worker interpreters: nothing (threads, locks, pooled connections)
+    # is inherited from this process, the partitions are shipped explicitly
+    start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    context = multiprocessing.get_context(start_method)
+    initargs = (df_products, df_customers, df_channels)
+    with ProcessPoolExecutor(max_workers=len(ranges), mp_context=context,
+                             initializer=_init_partition_worker, initargs=initargs) as executor:
+        futures = [
+            executor.submit(_transform_partition, df_sales.iloc[lo:hi], orphan_policy, part_path)
+            for (lo, hi), part_path in zip(ranges, part_paths)
+        ]
+        results = [future.result() for future in futures]
+    
+    # First-appearance order across partitions equals the serial order
+    sale_dates = pd.Series(np.concatenate([dates for dates, _ in results]))
+    dim_date = build_date_dimension(sale_dates, full_calendar=full_calendar)
+    fact_sale = pd.concat([fact for _, fact in results], ignore_index=True)
+    
+    orphan_counts = {}
+    for _, fact in results:
+        for column, count in fact.attrs.get('orphans', {}).items():
+            orphan_counts[column] = orphan_counts.get(column, 0) + count
+    fact_sale.attrs['orphans'] = orphan_counts
+    _merge_quarantine_parts(part_paths, quarantine_path)
+    _report_orphans(fact_sale, orphan_policy, quarantine_path)
+    
+    print("✅ Transformation completed successfully (Standardization & Derived Attributes applied).")
+    return dim_channel, dim_customer, dim_product, dim_date, fact_sale
+
+def deduplicate_dimensions(df_channels, df_customers, df_products):
+    """
+    Keeps one source row per dimension ID (the last one, as in the source file).
+
+    Sales are resolved against the dimension keys with `Index.get_indexer`,
+    which needs unique keys, and a duplicated ID would also break the
+    dimension's primary key. Duplicates are reported with a warning.
+
+    Args:
+        df_channels (pd.DataFrame): Raw channel data.
+        df_customers (pd.DataFrame): Raw customer data.
+        df_products (pd.DataFrame): Raw product data.
+
+    Returns:
+        tuple: `(df_channels, df_customers, df_products)`, the same frames
+            when their IDs are already unique.
+    """
+    frames = []
+    for dimension, df in zip(('channel', 'customer', 'product'), (df_channels, df_customers, df_products)):
+        key = DIMENSION_KEYS[dimension]
+        duplicated = df[key].duplicated(keep='last')
+        if duplicated.any():
+            sample = df.loc[duplicated, key].unique()[:5].tolist()
+            print(f"⚠️ {int(duplicated.sum())} duplicated {key} row(s) in the {dimension} source "
+                  f"(e.g. {sample}); keeping the last row of each ID.")
+            df = df[~duplicated].reset_index(drop=True)
+        frames.append(df)
+    return tuple(frames)
+
+def transform_dimensions(df_channels, df_customers, df_products):
+    """
+    Standardizes the descriptive dimensions and maps them to the DW schema.
+
+    Args:
+        df_channels (pd.DataFrame): Raw channel data.
+        df_customers (pd.DataFrame): Raw customer data.
+        df_products (pd.DataFrame): Raw product data. Standardized in place, so
+            later fact enrichment sees the same values.
+
+    Returns:
+        tuple: `(dim_channel, dim_customer, dim_product)` DataFrames.
+    """
+    # Convert text fields to Title Case or Uppercase for consistency.
+    # Applied to the categories (a handful of distinct values), not to every row.
+    df_products['category'] = standardize_categorical(df_products['category'], lambda s: s.str.strip().str.title())
+    df_products['brand'] = standardize_categorical(df_products['brand'], lambda s: s.str.strip().str.upper())
+    df_customers['city'] = standardize_categorical(df_customers['city'], lambda s: s.str.strip().str.title())
+    df_customers['country'] = standardize_categorical(df_customers['country'], lambda s: s.str.strip().str.title())
     
-    # --- 2. SURROGATE KEYS (SK) PREPARATION ---
     # Rename columns to match the target Data Warehouse schema.
     # We use the original IDs as keys, ensuring they are clean and mapped correctly.
     dim_channel = df_channels.rename(columns={'channel_id': 'id_channel'})
     dim_customer = df_customers.rename(columns={'customer_id': 'id_customer'})
     dim_product = df_products.rename(columns={'product_id': 'id_product'})
+    return dim_channel, dim_customer, dim_product
+
+def standardize_categorical(series, func):
+    """
+    Applies a string standardization to the categories of a categorical Series.
+
+    The function runs once per distinct value instead of once per row. Values
+    that collapse to the same result (e.g. ' dairy' and 'Dairy') are merged
+    into one category.
+
+    Args:
+        series (pd.Series): Text column; converted to categorical if needed.
+        func (Callable[[pd.Series], pd.Series]): Vectorized string transform.
+
+    Returns:
+        pd.Series: Categorical Series with standardized categories.
+    """
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype('category')
+    old_categories = series.cat.categories
+    if len(old_categories) == 0:
+        return series
+    new_values = func(pd.Series(old_categories, dtype=object))
     
-    # --- 3. DATE DIMENSION GENERATION ---
-    # Convert sale_date to datetime objects
-    df_sales['sale_date'] = pd.to_datetime(df_sales['sale_date'])
+    # Re-map codes onto the de-duplicated standardized categories
+    new_categories = pd.Index(new_values.unique())
+    remap = new_categories.get_indexer(new_values)
+    codes = series.cat.codes.to_numpy()
+    new_codes = np.where(codes >= 0, remap[codes], -1)
+    return pd.Series(
+        pd.Categorical.from_codes(new_codes, categories=new_categories),
+        index=series.index, name=series.name
+    )
+
+def build_date_dimension(sale_dates, full_calendar=False):
+    """
+    Builds the Date dimension from a Series of sale dates.
+
+    Calendar attributes are derived from the distinct dates only, so the cost
+    depends on the number of days covered rather than on the number of sales.
+
+    Args:
+        sale_dates (pd.Series): Datetime Series of sale dates.
+        full_calendar (bool): When True, every day between the first and the
+            last sale date is included, even days without sales.
+
+    Returns:
+        pd.DataFrame: One row per distinct date (in order of first appearance,
+            or chronological for a full calendar) with the calendar attributes.
+    """
+    # Distinct days only; hashing datetime64 values is far cheaper than
+    # computing calendar fields for every sale
+    dates = pd.DatetimeIndex(pd.unique(sale_dates.dropna())).normalize()
+    if full_calendar and len(dates):
+        dates = pd.date_range(dates.min(), dates.max(), freq='D')
     
-    # Create the Date Dimension DataFrame
     dim_date = pd.DataFrame()
     # Create a unique ID for date (YYYYMMDD format)
-    dim_date['id_date'] = df_sales['sale_date'].dt.strftime('%Y%m%d').astype(int)
-    dim_date['day'] = df_sales['sale_date'].dt.day
-    dim_date['month'] = df_sales['sale_date'].dt.month
-    dim_date['year'] = df_sales['sale_date'].dt.year
-    dim_date['quarter'] = df_sales['sale_date'].dt.quarter
+    dim_date['id_date'] = date_key(dates)
+    dim_date['day'] = dates.day
+    dim_date['month'] = dates.month
+    dim_date['year'] = dates.year
+    dim_date['quarter'] = dates.quarter
+    dim_date['weekday'] = dates.dayofweek + 1  # ISO: 1 = Monday ... 7 = Sunday
+    dim_date['iso_week'] = dates.isocalendar().week.to_numpy()
+    dim_date['is_weekend'] = (dates.dayofweek >= 5).astype(int)
     
     # Remove duplicates to ensure unique dates in the dimension
-    dim_date = dim_date.drop_duplicates(subset=['id_date']).reset_index(drop=True)
+    return dim_date.drop_duplicates(subset=['id_date']).reset_index(drop=True)
+
+def date_key(dates):
+    """
+    Computes the YYYYMMDD surrogate key of the Date dimension arithmetically.
+
+    Equivalent to `strftime('%Y%m%d').astype(int)` without formatting a string
+    per value.
+
+    Args:
+        dates (pd.Series | pd.DatetimeIndex): Datetime values.
+
+    Returns:
+        np.ndarray: int64 keys, e.g. 20250131.
+    """
+    if isinstance(dates, pd.Series):
+        dates = pd.DatetimeIndex(dates)
+    return (dates.year * 10000 + dates.month * 100 + dates.day).to_numpy(dtype='int64')
+
+def parse_sale_dates(values):
+    """Parses raw ISO-8601 sale dates once; already-parsed values pass through."""
+    return pd.to_datetime(values, format='ISO8601')
+
+def transform_sales(df_sales, df_products, df_customers=None, df_channels=None,
+                    orphan_policy='quarantine', quarantine_path=QUARANTINE_PATH, dimension_versions=None):
+    """
+    Enriches raw sales with product costs and derives the fact table metrics.
+
+    Dimension keys are resolved with `Index.get_indexer` against each
+    dimension's key column: one hash lookup per sale and a NumPy `take` for
+    `unit_cost`, instead of a merge that copies the whole sales frame. Keys
+    without a dimension member (orphans) are handled by `orphan_policy`; the
+    per-column orphan counts are kept in `fact_sale.attrs['orphans']`.
+    Money columns keep the dtype they were extracted with: with int64 cents
+    (`src.money`) `total_amount` and `profit` are exact integer arithmetic.
+    With `dimension_versions` (SCD Type 2), customer and product keys are
+    the surrogate keys of the versions current at each sale date, found with
+    a sorted as-of join (`src.scd.resolve_versions`), and the cost is that
+    product version's `unit_cost`.
+
+    Args:
+        df_sales (pd.DataFrame): Raw sales data (the whole file or a single chunk).
+        df_products (pd.DataFrame): Standardized product data with `unit_cost`.
+        df_customers (pd.DataFrame, optional): Customer data; when given,
+            `customer_id` is validated too.
+        df_channels (pd.DataFrame, optional): Channel data; when given,
+            `channel_id` is validated too.
+        orphan_policy (str): One of `ORPHAN_POLICIES`.
+        quarantine_path (str): CSV file receiving quarantined sales.
+        dimension_versions (dict, optional): 'customer'/'product' -> complete
+            version table (`src.scd.apply_scd2`), already holding every
+            member referenced by the sales.
+
+    Returns:
+        pd.DataFrame: Fact table rows matching the `sale` DDL.
+
+    Raises:
+        ValueError: If the policy is unknown, a dimension key is duplicated,
+            a sale date is missing, or orphans are found with the 'fail' policy.
+    """
+    if orphan_policy not in ORPHAN_POLICIES:
+        raise ValueError(f"Unknown orphan policy '{orphan_policy}'. Expected one of {ORPHAN_POLICIES}.")
+    sale_dates = parse_sale_dates(df_sales['sale_date'])
     
-    # --- 4. FACT TABLE ENRICHMENT & CALCULATION ---
-    # Merge with products to get unit_cost for profit calculation
-    df_sales_enriched = pd.merge(df_sales, df_products[['product_id', 'unit_cost']], on='product_id', how='left')
+    # Position of every sale's member in its dimension (-1 = orphan)
+    dimensions = {'customer_id': df_customers, 'product_id': df_products, 'channel_id': df_channels}
+    positions = {}
+    for column, df_dim in dimensions.items():
+        if df_dim is None:
+            continue
+        index = pd.Index(df_dim[column])
+        if not index.is_unique:
+            raise ValueError(f"Duplicated {column} values in the dimension data; see `deduplicate_dimensions`.")
+        positions[column] = index.get_indexer(df_sales[column])
+    orphans = {column: position < 0 for column, position in positions.items()}
+    is_orphan = np.logical_or.reduce(list(orphans.values()))
+    orphan_counts = {column: int(mask.sum()) for column, mask in orphans.items() if mask.any()}
     
-    # Calculate Total Amount: Quantity * Unit Price
-    df_sales_enriched['total_amount'] = df_sales_enriched['quantity'] * df_sales_enriched['unit_price_sale']
+    if orphan_counts:
+        if orphan_policy == 'fail':
+            raise ValueError(f"{int(is_orphan.sum())} sales reference unknown dimension members: {orphan_counts}.")
+        if orphan_policy == 'quarantine':
+            quarantine_sales(df_sales[is_orphan], {c: m[is_orphan] for c, m in orphans.items()}, quarantine_path)
+            keep = ~is_orphan
+            df_sales = df_sales[keep]
+            sale_dates = sale_dates[keep]
+            positions = {column: position[keep] for column, position in positions.items()}
+            orphans = {column: mask[keep] for column, mask in orphans.items()}
+    
+    quantity = df_sales['quantity'].to_numpy()
+    unit_price_sale = df_sales['unit_price_sale'].to_numpy()
     
-    # Calculate Profit: Total Amount - (Quantity * Unit Cost)
-    df_sales_enriched['profit'] = df_sales_enriched['total_amount'] - (df_sales_enriched['quantity'] * df_sales_enriched['unit_cost'])
+    # Look up unit_cost by position for profit calculation. A sale of an unknown
+    # product is costed at its own price, so it adds revenue but no profit.
+    product_position = positions['product_id']
+    unit_cost = df_products['unit_cost'].to_numpy().take(np.maximum(product_position, 0))
     
-    # Create the Date Foreign Key
-    df_sales_enriched['date_iddate'] = df_sales_enriched['sale_date'].dt.strftime('%Y%m%d').astype(int)
+    # Dimension keys of every sale, orphans pointing to the "Unknown" member
+    keys = {}
+    for column in SALES_FOREIGN_KEYS:
+        keys[column] = df_sales[column].to_numpy()
+        if column in orphans and orphan_counts:
+            keys[column] = np.where(orphans[column], UNKNOWN_KEY, keys[column]).astype(keys[column].dtype)
+    if dimension_versions is not None:
+        # SCD Type 2: business keys -> surrogate key of the version valid at the sale date
+        for column, dimension in (('customer_id', 'customer'), ('product_id', 'product')):
+            versions = dimension_versions[dimension]
+            version_position = resolve_versions(keys[column], sale_dates, versions, dimension)
+            keys[column] = versions[SCD_DIMENSIONS[dimension][1]].to_numpy().take(version_position)
+            if dimension == 'product':
+                unit_cost = versions['unit_cost'].to_numpy().take(version_position)
+    unit_cost = np.where(product_position >= 0, unit_cost, unit_price_sale)
+    
+    # Calculate Total Amount: Quantity * Unit Price
+    total_amount = quantity * unit_price_sale
     
-    # Select and rename columns to match the DDL schema for the Fact Table
-    fact_sale = df_sales_enriched[[
-        'sale_id', 'quantity', 'unit_price_sale', 'total_amount', 'profit',
-        'customer_id', 'product_id', 'channel_id', 'date_iddate'
-    ]].copy()
+    # Create the Date Foreign Key: factorize so the key is computed per distinct day
+    codes, unique_dates = pd.factorize(sale_dates)
+    if (codes < 0).any():
+        raise ValueError("sale_date contains missing or unparseable values.")
     
-    fact_sale = fact_sale.rename(columns={
-        'sale_id': 'id_sale',
-        'customer_id': 'customer_idcustomer',
-        'product_id': 'product_idproduct',
-        'channel_id': 'channel_idchannel'
+    # Build the Fact Table with the columns of the DDL schema
+    fact_sale = pd.DataFrame({
+        'id_sale': df_sales['sale_id'].to_numpy(),
+        'quantity': quantity,
+        'unit_price_sale': unit_price_sale,
+        'total_amount': total_amount,
+        # Calculate Profit: Total Amount - (Quantity * Unit Cost)
+        'profit': total_amount - quantity * unit_cost,
     })
+    for column, fk_column in SALES_FOREIGN_KEYS.items():
+        fact_sale[fk_column] = keys[column]
+    fact_sale['date_iddate'] = date_key(pd.DatetimeIndex(unique_dates))[codes]
     
-    print("✅ Transformation completed successfully (Standardization & Derived Attributes applied).")
-    return dim_channel, dim_customer, dim_product, dim_date, fact_sale
+    fact_sale.attrs['orphans'] = orphan_counts
+    return fact_sale
+
+def add_unknown_members(dim_channel, dim_customer, dim_product):
+    """
+    Appends the "Unknown" member (key `UNKNOWN_KEY`) to the descriptive dimensions.
+
+    Used with the 'unknown' orphan policy, so fact rows with an unresolvable
+    key still satisfy the Foreign Keys.
+
+    Returns:
+        tuple: `(dim_channel, dim_customer, dim_product)` with the extra row.
+    """
+    unknown_channel = {'id_channel': UNKNOWN_KEY, 'channel': 'Unknown'}
+    unknown_customer = {'id_customer': UNKNOWN_KEY, 'name': 'Unknown', 'city': 'Unknown', 'country': 'Unknown', 'age': 0}
+    unknown_product = {
+        'id_product': UNKNOWN_KEY, 'name': 'Unknown', 'category': 'Unknown', 'brand': 'UNKNOWN',
+        # Integer zeros keep int64 cents columns integer and become 0.0 next to floats
+        'unit_price': 0, 'unit_cost': 0
+    }
+    return tuple(
+        pd.concat([dim, pd.DataFrame([member])], ignore_index=True)
+        for dim, member in ((dim_channel, unknown_channel), (dim_customer, unknown_customer), (dim_product, unknown_product))
+    )
+
+def quarantine_sales(df_orphans, orphans, quarantine_path=QUARANTINE_PATH):
+    """
+    Appends rejected raw sales to the quarantine CSV.
+
+    Args:
+        df_orphans (pd.DataFrame): Raw sales rows to reject.
+        orphans (dict): Key column -> boolean mask (aligned with `df_orphans`)
+            of the keys that could not be resolved.
+        quarantine_path (str): CSV file; created with a header if missing.
+    """
+    reason = pd.Series('', index=df_orphans.index)
+    for column, mask in orphans.items():
+        reason[mask] = reason[mask] + column + ' '
+    
+    # Prices extracted as cents are written back in currency units
+    rejected = scale_for_load(df_orphans, 'sales').assign(orphan_keys=reason.str.strip())
+    os.makedirs(os.path.dirname(quarantine_path) or '.', exist_ok=True)
+    rejected.to_csv(
+        quarantine_path, mode='a', header=not os.path.exists(quarantine_path),
+        index=False, date_format='%Y-%m-%d'
+    )
+
+def _transform_sales_stream(sales_chunks, df_products, df_customers=None, df_channels=None,
+                           full_calendar=False, orphan_policy='quarantine', quarantine_path=QUARANTINE_PATH):
+    """Yields `(dim_date_new, fact_sale)` for every raw sales chunk."""
+    seen_dates = set()
+    for chunk in sales_chunks:
+        chunk['sale_date'] = parse_sale_dates(chunk['sale_date'])
+        
+        # Only emit dates that earlier chunks have not produced yet
+        dim_date = build_date_dimension(chunk['sale_date'], full_calendar=full_calendar)
+        dim_date = dim_date[~dim_date['id_date'].isin(seen_dates)].reset_index(drop=True)
+        seen_dates.update(dim_date['id_date'].tolist())
+        
+        fact_sale = transform_sales(
+            chunk, df_products, df_customers, df_channels,
+            orphan_policy=orphan_policy, quarantine_path=quarantine_path
+        )
+        _report_orphans(fact_sale, orphan_policy, quarantine_path)
+        yield dim_date, fact_sale
+
+def _report_orphans(fact_sale, orphan_policy, quarantine_path):
+    """Prints the orphan counts of a transformed fact table, if any."""
+    orphan_counts = fact_sale.attrs.get('orphans')
+    if not orphan_counts:
+        return
+    if orphan_policy == 'quarantine':
+        print(f" -> Quarantined sales with unknown keys {orphan_counts} to {quarantine_path}.")
+    else:
+        print(f" -> Mapped sales with unknown keys {orphan_counts} to the Unknown members.")
+
+# Dimension frames of a transform worker process
+_partition_inputs = {}
+
+def _init_partition_worker(df_products, df_customers, df_channels):
+    """Keeps the inputs shared by every partition in the worker process."""
+    _partition_inputs.update(df_products=df_products, df_customers=df_customers, df_channels=df_channels)
+
+def _transform_partition(partition, orphan_policy, quarantine_path):
+    """Transforms one sales partition; returns its distinct dates and fact rows."""
+    sale_dates = parse_sale_dates(partition['sale_date'])
+    fact_sale = transform_sales(
+        partition, _partition_inputs['df_products'], _partition_inputs['df_customers'],
+        _partition_inputs['df_channels'], orphan_policy=orphan_policy, quarantine_path=quarantine_path
+    )
+    return pd.unique(sale_dates.dropna()), fact_sale
+
+def _merge_quarantine_parts(part_paths, quarantine_path):
+    """Appends the per-partition quarantine files, in partition order, to the quarantine CSV."""
+    for part_path in part_paths:
+        if not os.path.exists(part_path):
+            continue
+        with open(part_path, 'r') as source:
+            header = source.readline()
+            target_exists = os.path.exists(quarantine_path)
+            with open(quarantine_path, 'a') as target:
+                if not target_exists:
+                    target.write(header)
+                target.write(source.read())
+        os.remove(part_path)
@@ -1,6 +1,21 @@
+import gzip
+import json
 import os
+import shutil
 import subprocess
-from dotenv import load_dotenv
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from sqlalchemy import inspect, text
+from src.db import get_db_settings, get_engine
+from src.staging import file_sha256
+
+BACKUP_PATH = os.path.join('data', 'warehouse', 'backups')
+BACKUP_MANIFEST = 'manifest.json'
+BACKUP_WORKERS = 4
+# Compression -> file extension of the per-table dumps
+BACKUP_COMPRESSIONS = {'gzip': '.sql.gz', 'zstd': '.sql.zst', 'none': '.sql'}
 
 def dump_warehouse():
     """
@@ -14,12 +29,12 @@ def dump_warehouse():
     print("📦 Generating Data Warehouse backup (dump)...")
     
     # Load Environment Variables
-    load_dotenv(override=True)
-    DB_USER = os.getenv("DB_USER")
-    DB_PASSWORD = os.getenv("DB_PASSWORD")
-    DB_HOST = os.getenv("DB_HOST")
-    DB_PORT = os.getenv("DB_PORT")
-    DB_NAME = os.getenv("DB_NAME")
+    settings = get_db_settings()
+    DB_USER = settings['user']
+    DB_PASSWORD = settings['password']
+    DB_HOST = settings['host']
+    DB_PORT = settings['port']
+    DB_NAME = settings['database']
     
     # Define Output Path
     output_path = os.path.join('data', 'warehouse', 'warehouse_dump.sql')
@@ -40,6 +55,8 @@ def dump_warehouse():
         '--set-gtid-purged=OFF',
         '--column-statistics=0',
         '--add-drop-table',
+        # Consistent InnoDB snapshot without locking the tables
+        '--single-transaction',
         DB_NAME
     ]
     
@@ -61,6 +78,279 @@ def dump_warehouse():
     except Exception as e:
         print(f"❌ Unexpected error during dump: {e}")
 
+def backup_warehouse(output_path=BACKUP_PATH, compression='gzip', workers=BACKUP_WORKERS, lock_tables=False):
+    """
+    Backs up the warehouse as one compressed dump per table, in parallel.
+
+    Every table is exported by its own `mysqldump --single-transaction --quick`
+    process (a consistent InnoDB snapshot of the table, rows streamed without
+    buffering, no locks) and piped straight through gzip or zstd, so up to
+    `workers` tables are dumped and compressed at the same time.
+
+    Each dump has its own snapshot, so the tables agree with each other only
+    if nothing writes to the warehouse during the backup. The pipeline runs
+    it after its load has committed, which is enough there. A backup taken
+    while other loads may run should pass `lock_tables=True`: a global read
+    lock (`FLUSH TABLES WITH READ LOCK`, needs the RELOAD privilege) is then
+    held from the row counts until the last dump has finished. Reads go on,
+    but every write on the server waits for the whole backup.
+
+    A `manifest.json` next to the dumps records, per table, the row count, file
+    size and SHA-256, plus the Foreign Key levels used by `restore_warehouse`.
+
+    Args:
+        output_path (str): Directory under which a `backup_<timestamp>`
+            folder is created.
+        compression (str): 'gzip', 'zstd' (needs the `zstd` CLI) or 'none'.
+        workers (int): Tables dumped concurrently.
+        lock_tables (bool): Hold a global read lock for the whole backup, so
+            all tables come from the same state even under concurrent loads.
+
+    Returns:
+        str: The backup directory, or None if any table failed.
+
+    Raises:
+        ValueError: If the compression is unknown.
+    """
+    if compression not in BACKUP_COMPRESSIONS:
+        raise ValueError(f"Unknown compression '{compression}'. Expected one of {tuple(BACKUP_COMPRESSIONS)}.")
+    print(f"📦 Backing up the Data Warehouse per table ({compression}, {workers} workers)...")
+
+    settings = get_db_settings()
+    engine = get_engine()
+    tables, levels = _restore_levels(engine)
+    backup_dir = os.path.join(output_path, f"backup_{datetime.now().strftime('%Y%m%dT%H%M%S')}")
+    os.makedirs(backup_dir, exist_ok=True)
+
+    start = time.perf_counter()
+    with engine.connect() as conn:
+        if lock_tables:
+            # One state for every table: writers wait until all dumps are done
+            conn.execute(text("FLUSH TABLES WITH READ LOCK"))
+        try:
+            row_counts = {
+                table: conn.execute(text(f"SELECT COUNT(*) FROM `{table}`")).scalar() for table in tables
+            }
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    table: executor.submit(_dump_table, settings, table, backup_dir, compression)
+                    for table in tables
+                }
+                results = {}
+                for table, future in futures.items():
+                    try:
+                        results[table] = future.result()
+                    except Exception as e:
+                        print(f"❌ Error dumping table '{table}': {e}")
+        finally:
+            if lock_tables:
+                conn.execute(text("UNLOCK TABLES"))
+    seconds = time.perf_counter() - start
+
+    if len(results) < len(tables):
+        print(f"❌ Backup incomplete: {len(tables) - len(results)} table(s) failed. See {backup_dir}.")
+        return None
+
+    manifest = {
+        'database': settings['database'],
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'compression': compression,
+        'restore_levels': levels,
+        'tables': {
+            table: dict(results[table], rows=row_counts[table])
+            for table in tables
+        },
+    }
+    with open(os.path.join(backup_dir, BACKUP_MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    total_bytes = sum(entry['bytes'] for entry in results.values())
+    print(f"✅ Backup of {len(tables)} tables ({total_bytes / 1024 ** 2:.1f} MiB) in {seconds:.2f}s at: {backup_dir}")
+    return backup_dir
+
+def restore_warehouse(backup_dir, workers=BACKUP_WORKERS, database=None):
+    """
+    Restores a backup written by `backup_warehouse`.
+
+    Every file is checked against its manifest checksum before anything is
+    touched. Tables are then restored level by level in Foreign Key order
+    (referenced tables first), the tables of a level in parallel, each
+    streamed through its own `mysql` client process. Finally the row counts are
+    compared with the manifest.
+
+    Args:
+        backup_dir (str): Backup directory (contains `manifest.json`).
+        workers (int): Tables restored concurrently.
+        database (str, optional): Target database. Defaults to DB_NAME.
+
+    Raises:
+        RuntimeError: If a checksum, a table restore or a row count check fails.
+    """
+    with open(os.path.join(backup_dir, BACKUP_MANIFEST), 'r') as f:
+        manifest = json.load(f)
+    settings = get_db_settings()
+    database = database or settings['database']
+    print(f"♻ Restoring backup {backup_dir} into '{database}'...")
+
+    for table, entry in manifest['tables'].items():
+        if file_sha256(os.path.join(backup_dir, entry['file'])) != entry['sha256']:
+            raise RuntimeError(f"Checksum mismatch for table '{table}'. Backup is corrupted, nothing restored.")
+
+    engine_init = get_engine(with_database=False)
+    with engine_init.connect() as conn:
+        conn.execute(text(f"CREATE DATABASE IF NOT EXISTS {database}"))
+        conn.commit()
+
+    for level in manifest['restore_levels']:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                table: executor.submit(
+                    _restore_table, settings, database,
+                    os.path.join(backup_dir, manifest['tables'][table]['file']), manifest['compression']
+                )
+                for table in level
+            }
+            for table, future in futures.items():
+                future.result()
+                print(f" -> Table '{table}' restored.")
+
+    engine = get_engine(database=database)
+    with engine.connect() as conn:
+        for table, entry in manifest['tables'].items():
+            rows = conn.execute(text(f"SELECT COUNT(*) FROM `{table}`")).scalar()
+            if rows != entry['rows']:
+                raise RuntimeError(f"Table '{table}' has {rows} rows after restore, expected {entry['rows']}.")
+    print(f"✅ Restore completed: {len(manifest['tables'])} tables verified.")
+
+def _restore_levels(engine):
+    """
+    Groups the warehouse tables by Foreign Key depth.
+
+    Returns:
+        tuple: `(tables, levels)` where `levels[0]` holds the tables that
+            reference no other table, `levels[1]` those referencing only
+            level 0, and so on.
+    """
+    inspector = inspect(engine)
+    tables = inspector.get_table_names()
+    parents = {
+        table: {fk['referred_table'] for fk in inspector.get_foreign_keys(table)} - {table}
+        for table in tables
+    }
+    depth = {}
+    while len(depth) < len(tables):
+        ready = [t for t in tables if t not in depth and all(p in depth for p in parents[t] if p in parents)]
+        if not ready:
+            raise RuntimeError("Circular Foreign Keys between warehouse tables.")
+        for table in ready:
+            depth[table] = 1 + max((depth[p] for p in parents[table] if p in depth), default=-1)
+    levels = [sorted(t for t in tables if depth[t] == level) for level in range(max(depth.values(), default=-1) + 1)]
+    return tables, levels
+
+def _client_credentials(settings):
+    """Connection options shared by the `mysqldump` and `mysql` clients."""
+    return [
+        f"--user={settings['user']}",
+        f"--password={settings['password']}",
+        f"--host={settings['host']}",
+        f"--port={settings['port']}",
+    ]
+
+def _dump_table(settings, table, backup_dir, compression):
+    """Dumps one table through the compressor and returns its manifest entry."""
+    file_name = table + BACKUP_COMPRESSIONS[compression]
+    path = os.path.join(backup_dir, file_name)
+    tmp_path = path + '.tmp'
+    command = ['mysqldump'] + _client_credentials(settings) + [
+        '--set-gtid-purged=OFF',
+        '--column-statistics=0',
+        '--add-drop-table',
+        '--single-transaction',
+        # Stream rows instead of buffering the whole table in the client
+        '--quick',
+        settings['database'],
+        table,
+    ]
+
+    start = time.perf_counter()
+    with tempfile.TemporaryFile() as stderr:
+        if compression == 'gzip':
+            dump = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=stderr)
+            with gzip.open(tmp_path, 'wb', compresslevel=6) as target:
+                shutil.copyfileobj(dump.stdout, target, 1 << 20)
+            dump.stdout.close()
+            compressor = None
+        elif compression == 'zstd':
+            dump = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=stderr)
+            compressor = subprocess.Popen(['zstd', '-q', '-f', '-o', tmp_path], stdin=dump.stdout)
+            # Let mysqldump receive SIGPIPE if zstd exits early
+            dump.stdout.close()
+        else:
+            with open(tmp_path, 'wb') as target:
+                dump = subprocess.Popen(command, stdout=target, stderr=stderr)
+                dump.wait()
+            compressor = None
+
+        dump.wait()
+        if compressor is not None and compressor.wait() != 0:
+            raise RuntimeError(f"zstd exited with code {compressor.returncode}")
+        if dump.returncode != 0:
+            stderr.seek(0)
+            raise RuntimeError(stderr.read().decode(errors='replace').strip())
+
+    os.replace(tmp_path, path)
+    return {
+        'file': file_name,
+        'bytes': os.path.getsize(path),
+        'sha256': file_sha256(path),
+        'seconds': round(time.perf_counter() - start, 3),
+    }
+
+def _restore_table(settings, database, path, compression):
+    """Streams one table dump into a `mysql` client process."""
+    command = ['mysql'] + _client_credentials(settings) + [database]
+    with tempfile.TemporaryFile() as stderr:
+        if compression == 'gzip':
+            client = subprocess.Popen(command, stdin=subprocess.PIPE, stderr=stderr)
+            with gzip.open(path, 'rb') as source:
+                shutil.copyfileobj(source, client.stdin, 1 << 20)
+            client.stdin.close()
+        elif compression == 'zstd':
+            decompressor = subprocess.Popen(['zstd', '-q', '-d', '-c', path], stdout=subprocess.PIPE)
+            client = subprocess.Popen(command, stdin=decompressor.stdout, stderr=stderr)
+            decompressor.stdout.close()
+            decompressor.wait()
+        else:
+            with open(path, 'rb') as source:
+                client = subprocess.Popen(command, stdin=source, stderr=stderr)
+                client.wait()
+
+        if client.wait() != 0:
+            stderr.seek(0)
+            raise RuntimeError(f"Restore of {path} failed: {stderr.read().decode(errors='replace').strip()}")
+
 if __name__ == "__main__":
-    # If run directly, perform the dump
-    dump_warehouse()
+    import argparse
+    parser = argparse.ArgumentParser(description="Back up or restore the Data Warehouse.")
+    parser.add_argument('command', nargs='?', choices=('dump', 'backup', 'restore'), default='dump',
+                        help="'dump': single warehouse_dump.sql (default), 'backup': parallel per-table "
+                             "compressed backup, 'restore': load a backup directory.")
+    parser.add_argument('backup_dir', nargs='?', help="Backup directory to restore.")
+    parser.add_argument('--compression', choices=tuple(BACKUP_COMPRESSIONS), default='gzip',
+                        help="Per-table compression for 'backup' (default: gzip).")
+    parser.add_argument('--workers', type=int, default=BACKUP_WORKERS,
+                        help=f"Tables processed concurrently (default: {BACKUP_WORKERS}).")
+    parser.add_argument('--lock-tables', action='store_true',
+                        help="'backup' under a global read lock (RELOAD privilege): consistent across tables "
+                             "even while loads run, but every write on the server waits for the backup.")
+    args = parser.parse_args()
+
+    if args.command == 'backup':
+        backup_warehouse(compression=args.compression, workers=args.workers, lock_tables=args.lock_tables)
+    elif args.command == 'restore':
+        if not args.backup_dir:
+            parser.error("'restore' needs the backup directory.")
+        restore_warehouse(args.backup_dir, workers=args.workers)
+    else:
+        # If run directly, perform the dump
+        dump_warehouse()
@@ -0,0 +1,147 @@
+import os
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+REPO_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class FakeResult:
+    """Result of a `RecordingEngine` statement."""
+
+    def __init__(self, value=None):
+        self._value = value
+
+    def scalar(self):
+        return self._value
+
+    def fetchall(self):
+        return list(self._value or [])
+
+    def fetchone(self):
+        rows = self.fetchall()
+        return rows[0] if rows else None
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+class RecordingEngine:
+    """
+    Stands in for a MySQL engine (and its connections) where SQLite can not.
+
+    Every statement is appended to `log` as `('sql', text)`, so a test can
+    interleave its own entries (e.g. client processes) and check the order.
+    `answer(sql, params)` gives the value of each statement: a scalar, or
+    rows for `fetchall`; it may raise to simulate a server error.
+    """
+
+    dialect = SimpleNamespace(name='mysql')
+
+    def __init__(self, answer=None, log=None):
+        self.answer = answer
+        self.log = log if log is not None else []
+
+    @property
+    def statements(self):
+        return [sql for kind, sql, *_ in self.log if kind == 'sql']
+
+    def connect(self):
+        return self
+
+    def begin(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        self.log.append(('sql', sql))
+        return FakeResult(self.answer(sql, params) if self.answer else None)
+
+    def commit(self):
+        pass
+
+@pytest.fixture
+def recording_engine():
+    """Factory of `RecordingEngine`s."""
+    return RecordingEngine
+
+def _pipeline_sources():
+    """Raw frames returned by the fake extraction of the `pipeline` fixture."""
+    df_channels = pd.DataFrame({'channel_id': [1, 2], 'name': ['Store', 'Online']})
+    df_customers = pd.DataFrame({
+        'customer_id': [1, 2], 'name': ['Ana', 'Luis'], 'city': ['bogota', 'cali'],
+        'country': ['colombia'] * 2, 'age': [30, 41],
+    })
+    df_products = pd.DataFrame({
+        'product_id': [1, 2], 'name': ['Rice', 'Milk'], 'category': ['grocery', 'dairy'],
+        'brand': ['acme', 'cow'], 'unit_price': [2.0, 1.5], 'unit_cost': [1.0, 1.0],
+    })
+    df_sales = pd.DataFrame({
+        'sale_id': [4, 5, 6], 'sale_date': ['2025-01-03', '2025-01-03', '2025-01-04'],
+        'customer_id': [1, 2, 2], 'product_id': [1, 2, 1], 'channel_id': [1, 2, 2],
+        'quantity': [2, 1, 4], 'unit_price_sale': [2.5, 1.5, 2.5],
+    })
+    return df_channels, df_customers, df_products, df_sales
+
+@pytest.fixture
+def pipeline(monkeypatch, tmp_path, recording_engine):
+    """
+    Prepares `main.run_pipeline` to run in `tmp_path` with the warehouse
+    stages replaced by recorders, and returns their shared state. `fail`
+    holds the stages that raise on their next call; `dashboard` is what
+    `create_dashboard` returns.
+    """
+    import main
+    import src.checkpoint as checkpoint_module
+
+    monkeypatch.chdir(tmp_path)
+    os.makedirs(os.path.join('data', 'raw'))
+    for name in ('channels', 'customers', 'products', 'sales'):
+        with open(os.path.join('data', 'raw', f'{name}.csv'), 'w') as f:
+            f.write(f'{name}\n')
+    monkeypatch.setattr(checkpoint_module, 'CHECKPOINT_FILE', os.path.join(REPO_PATH, 'sql', 'load_checkpoint.sql'))
+
+    state = SimpleNamespace(
+        engine=recording_engine(), watermark=(3, 20250102), fail=set(),
+        ddl=[], extracts=[], loads=[], aggregates=0, dashboard=None
+    )
+
+    def fail_once(stage):
+        if stage in state.fail:
+            state.fail.discard(stage)
+            raise RuntimeError(f'{stage} interrupted')
+
+    def apply_schema(engine_init, db_name, **kwargs):
+        state.ddl.append(kwargs)
+        return 'unchanged'
+
+    def extract_data(raw_path, **kwargs):
+        state.extracts.append(kwargs)
+        return _pipeline_sources()
+
+    def load_data(*frames, **kwargs):
+        state.loads.append((frames[-1], kwargs))
+        fail_once('load')
+
+    def refresh_aggregates(engine, rebuild=False):
+        state.aggregates += 1
+        fail_once('aggregates')
+        return 0
+
+    monkeypatch.setattr(main, 'get_db_settings', lambda: {
+        'user': 'etl', 'password': '', 'host': 'localhost', 'port': 3306, 'database': 'abastoya'
+    })
+    monkeypatch.setattr(main, 'get_engine', lambda **kwargs: state.engine)
+    monkeypatch.setattr(main, 'apply_schema', apply_schema)
+    monkeypatch.setattr(main, 'get_watermark', lambda engine: state.watermark)
+    monkeypatch.setattr(main, 'extract_data', extract_data)
+    monkeypatch.setattr(main, 'load_data', load_data)
+    monkeypatch.setattr(main, 'refresh_aggregates', refresh_aggregates)
+    monkeypatch.setattr(main, 'backup_warehouse', lambda **kwargs: None)
+    monkeypatch.setattr(main, 'create_dashboard', lambda **kwargs: state.dashboard)
+    return state
@@ -0,0 +1,72 @@
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, text
+
+from src.aggregates import AGGREGATES, aggregates_are_current, invalidate_changed_aggregates, invalidate_late_sales
+from src.incremental import WATERMARK_TABLE
+
+@pytest.fixture
+def engine():
+    engine = create_engine('sqlite://')
+    pd.DataFrame({
+        'id_product': [1, 2], 'name': ['Rice', 'Milk'], 'category': ['Grocery', 'Dairy'], 'brand': ['ACME', 'COW'],
+    }).to_sql('product', engine, index=False)
+    pd.DataFrame({'id_date': [20250101], 'day': [1], 'month': [1], 'year': [2025]}).to_sql('date', engine, index=False)
+    with engine.begin() as conn:
+        conn.execute(text(f"CREATE TABLE {WATERMARK_TABLE} (table_name TEXT PRIMARY KEY, last_id INT, last_date INT)"))
+        for table_name in ['sale'] + list(AGGREGATES):
+            conn.execute(text(f"INSERT INTO {WATERMARK_TABLE} VALUES ('{table_name}', 10, 20250101)"))
+            if table_name != 'sale':
+                conn.execute(text(f"CREATE TABLE {table_name} (x INT)"))
+    return engine
+
+def _watermarked(engine):
+    with engine.connect() as conn:
+        return {row[0] for row in conn.execute(text(f"SELECT table_name FROM {WATERMARK_TABLE}"))}
+
+def test_changed_grouping_attribute_resets_its_aggregates(engine):
+    assert aggregates_are_current(engine)
+    incoming = pd.DataFrame({
+        'id_product': [1, 2, 3], 'name': ['Rice', 'Milk 1L', 'Eggs'],
+        'category': ['Grocery', 'Dairy', 'Dairy'], 'brand': ['ACME', 'MOO', 'HEN'],
+    })
+
+    assert invalidate_changed_aggregates(engine, 'product', incoming) == ['agg_sales_brand']
+    assert 'agg_sales_brand' not in _watermarked(engine)
+    assert 'agg_sales_category' in _watermarked(engine)
+    assert not aggregates_are_current(engine)
+
+def test_new_members_and_other_attributes_change_nothing(engine):
+    incoming = pd.DataFrame({
+        'id_product': [1, 3], 'name': ['Brown rice', 'Eggs'], 'category': ['Grocery', 'Dairy'], 'brand': ['ACME', 'HEN'],
+    })
+    assert invalidate_changed_aggregates(engine, 'product', incoming) == []
+    new_day = pd.DataFrame({'id_date': [20250101, 20250102], 'day': [1, 2], 'month': [1, 1], 'year': [2025, 2025]})
+    assert invalidate_changed_aggregates(engine, 'date', new_day) == []
+    # Customers are not aggregated
+    assert invalidate_changed_aggregates(engine, 'customer', pd.DataFrame({'id_customer': [1]})) == []
+    assert aggregates_are_current(engine)
+
+def test_current_from_control_rows_without_queries():
+    rows = [('agg_sales_brand', 10, None, None), ('agg_sales_category', 10, None, None),
+            ('agg_sales_channel', 12, None, None), ('agg_sales_month', 10, None, None), ('sale', 10, None, None)]
+    # No engine: the rows are the only input
+    assert aggregates_are_current(None, control_rows=rows)
+    assert not aggregates_are_current(None, control_rows=rows[1:])
+    assert not aggregates_are_current(None, control_rows=[])
+
+def test_late_sales_reset_the_aggregates_covering_them(engine):
+    with engine.begin() as conn:
+        conn.execute(text(f"UPDATE {WATERMARK_TABLE} SET last_id = 6 WHERE table_name = 'agg_sales_month'"))
+    late = pd.DataFrame({'id_sale': [8, 11]})
+
+    assert invalidate_late_sales(engine, late, after_sale_id=10) == sorted(set(AGGREGATES) - {'agg_sales_month'})
+    assert 'agg_sales_month' in _watermarked(engine)
+    assert not aggregates_are_current(engine)
+
+def test_sales_above_the_watermark_reset_nothing(engine):
+    new = pd.DataFrame({'id_sale': [11, 12]})
+
+    assert invalidate_late_sales(engine, new, after_sale_id=10) == []
+    assert invalidate_late_sales(engine, new.iloc[:0], after_sale_id=10) == []
+    assert aggregates_are_current(engine)
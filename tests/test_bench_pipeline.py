@@ -0,0 +1,63 @@
+import json
+import os
+import sys
+
+import pytest
+
+from benchmarks import bench_pipeline
+
+def _stage(p50_seconds, rows_per_sec, peak_mb=None):
+    return {'rows': 1000, 'p50_seconds': p50_seconds, 'p95_seconds': p50_seconds,
+            'rows_per_sec': rows_per_sec, 'peak_mb': peak_mb}
+
+def test_summarize_reports_percentiles_and_throughput():
+    records = [{'wall_seconds': seconds, 'rows_in': 1000, 'cpu_seconds': 0.5} for seconds in (2.0, 1.0, 4.0)]
+
+    summary = bench_pipeline.summarize(records, peak_mb=12.5)
+
+    assert (summary['runs'], summary['p50_seconds'], summary['min_seconds']) == (3, 2.0, 1.0)
+    assert summary['rows_per_sec'] == 500
+    assert (summary['peak_mb'], summary['cpu_p50_seconds']) == (12.5, 0.5)
+
+def test_only_changes_beyond_the_tolerance_are_regressions():
+    baseline = {'1k': {'load': _stage(1.0, 1000, 10.0), 'query': _stage(1.0, 1000)}}
+    results = {
+        # Slower and lower throughput than allowed; memory within the tolerance
+        '1k': {'load': _stage(1.5, 700, 11.0), 'query': _stage(1.1, 1200), 'extract': _stage(9.0, 1)},
+        '10k': {'load': _stage(9.0, 1)},
+    }
+
+    regressions = bench_pipeline.compare_with_baseline(results, baseline, tolerance=0.2)
+
+    # Stages and scales missing from the baseline are not compared
+    assert [(r['scale'], r['stage'], r['metric']) for r in regressions] == [
+        ('1k', 'load', 'p50_seconds'), ('1k', 'load', 'rows_per_sec')
+    ]
+    assert regressions[0]['change'] == 0.5
+
+def _run_main(monkeypatch, results, *argv):
+    monkeypatch.setattr(bench_pipeline, 'run_scale', lambda scale, *args: results[scale])
+    monkeypatch.setattr(sys, 'argv', ['bench_pipeline', '--backend', 'sqlite', '--scales', '1k', *argv])
+    bench_pipeline.main()
+
+def test_main_saves_a_baseline_and_fails_on_a_regression(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs('benchmarks')
+
+    _run_main(monkeypatch, {'1k': {'load': _stage(1.0, 1000)}}, '--save-baseline')
+    with open(bench_pipeline.DEFAULT_BASELINE) as f:
+        assert json.load(f)['results']['1k']['load']['p50_seconds'] == 1.0
+
+    _run_main(monkeypatch, {'1k': {'load': _stage(1.1, 950)}})
+    with pytest.raises(SystemExit) as exit_info:
+        _run_main(monkeypatch, {'1k': {'load': _stage(1.1, 950)}}, '--tolerance', '0.01')
+    assert exit_info.value.code == 1
+    assert len(os.listdir(bench_pipeline.RESULTS_PATH)) >= 1
+
+def test_baseline_of_another_backend_is_not_compared(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs('benchmarks')
+    with open(bench_pipeline.DEFAULT_BASELINE, 'w') as f:
+        json.dump({'backend': 'mysql', 'results': {'1k': {'load': _stage(0.1, 10_000)}}}, f)
+
+    _run_main(monkeypatch, {'1k': {'load': _stage(1.0, 1000)}})
@@ -0,0 +1,119 @@
+import io
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, text
+
+from src.bulk_load import LOAD_STRATEGIES, bulk_load, write_load_file
+
+SALE_COLUMNS = ['id_sale', 'quantity', 'unit_price_sale', 'total_amount', 'profit']
+
+@pytest.fixture
+def engine():
+    engine = create_engine('sqlite://')
+    with engine.begin() as conn:
+        for table_name in ('sale', 'sale__staging'):
+            conn.execute(text(
+                f"CREATE TABLE {table_name} (id_sale INTEGER PRIMARY KEY, quantity INTEGER, "
+                "unit_price_sale NUMERIC, total_amount NUMERIC, profit NUMERIC)"
+            ))
+    return engine
+
+def _fact_sale(rows=53, cents=False):
+    rng = np.random.default_rng(7)
+    quantity = rng.integers(1, 10, size=rows)
+    price = rng.integers(1, 100_000, size=rows)
+    if not cents:
+        price = price / 100
+    return pd.DataFrame({
+        'id_sale': np.arange(1, rows + 1),
+        'quantity': quantity,
+        'unit_price_sale': price,
+        'total_amount': quantity * price,
+        'profit': quantity * price // 3 if cents else quantity * price / 3,
+    })
+
+def _read(engine, table_name):
+    return pd.read_sql(f"SELECT * FROM {table_name} ORDER BY id_sale", con=engine)
+
+@pytest.mark.parametrize('cents', [False, True])
+def test_multi_insert_matches_to_sql(engine, cents):
+    fact_sale = _fact_sale(cents=cents)
+    bulk_load(fact_sale, 'sale', engine, strategy='to_sql')
+    # A batch size that does not divide the rows exercises the last partial batch;
+    # the shadow table name maps to the money columns of 'sale'
+    stats = bulk_load(fact_sale, 'sale__staging', engine, strategy='multi_insert', batch_size=7)
+
+    assert stats['rows'] == len(fact_sale)
+    pd.testing.assert_frame_equal(_read(engine, 'sale'), _read(engine, 'sale__staging'))
+
+def test_cents_are_loaded_as_units(engine):
+    bulk_load(_fact_sale(rows=3, cents=True), 'sale', engine, strategy='multi_insert')
+    loaded = _read(engine, 'sale')
+    expected = _fact_sale(rows=3, cents=True)['unit_price_sale'] / 100
+    assert loaded['unit_price_sale'].tolist() == expected.tolist()
+
+def test_unknown_strategy_is_rejected(engine):
+    assert 'bogus' not in LOAD_STRATEGIES
+    with pytest.raises(ValueError):
+        bulk_load(_fact_sale(rows=1), 'sale', engine, strategy='bogus')
+
+TEXT_FRAME = pd.DataFrame({
+    'id': [1, 2, 3],
+    'name': ['a,b', 'he said "hi"', 'C:\\dir\tx\ny'],
+    'note': [None, '\\N', 'plain'],
+    'price': [0.1, np.nan, 12345678.99],
+})
+
+def _write(df, file_format):
+    f = io.StringIO(newline='')
+    write_load_file(df, f, file_format, batch_size=2)
+    return f.getvalue()
+
+def test_load_file_csv_escaping():
+    assert _write(TEXT_FRAME, 'csv') == (
+        '1,"a,b",\\N,0.1\n'
+        '2,"he said ""hi""",\\\\N,\\N\n'
+        '3,C:\\\\dir\\tx\\ny,plain,12345678.99\n'
+    )
+
+def test_load_file_tsv_is_never_quoted():
+    assert _write(TEXT_FRAME, 'tsv') == (
+        '1\ta,b\t\\N\t0.1\n'
+        '2\the said "hi"\t\\\\N\t\\N\n'
+        '3\tC:\\\\dir\\tx\\ny\tplain\t12345678.99\n'
+    )
+
+def test_load_file_keeps_categoricals_and_decimals():
+    df = pd.DataFrame({
+        'city': pd.Categorical(['Bogotá', None, 'Cali']),
+        'unit_price': [19.99, 0.3, 1e6],
+    })
+    # Floats keep their shortest representation, which the server rounds to DECIMAL(10,2)
+    assert _write(df, 'csv') == 'Bogotá,19.99\n\\N,0.3\nCali,1000000.0\n'
+
+@pytest.mark.parametrize('file_format, separator', [('csv', ','), ('tsv', '\\t')])
+def test_load_data_infile_statement(recording_engine, file_format, separator):
+    files = []
+
+    def capture_file(sql, params):
+        # The temporary file only exists while LOAD DATA runs
+        path = sql.split("INFILE '")[1].split("'")[0]
+        with open(path, newline='') as f:
+            files.append((path, f.read()))
+
+    engine = recording_engine(capture_file)
+    fact_sale = _fact_sale(rows=2, cents=True)
+    bulk_load(fact_sale, 'sale', engine, strategy='load_data_infile', file_format=file_format)
+
+    statement = engine.statements[0]
+    path, content = files[0]
+    assert f"FIELDS TERMINATED BY '{separator}'" in statement
+    assert ("ENCLOSED BY" in statement) == (file_format == 'csv')
+    assert "(`id_sale`, `quantity`, @unit_price_sale, @total_amount, @profit)" in statement
+    assert "SET `unit_price_sale` = @unit_price_sale / 100" in statement
+    # Cents are written as integers and the temporary file is removed afterwards
+    first = fact_sale.iloc[0]
+    assert content.splitlines()[0].split(',' if file_format == 'csv' else '\t')[2] == str(first['unit_price_sale'])
+    assert not os.path.exists(path)
@@ -0,0 +1,69 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+import main
+
+STATE_FILE = os.path.join('data', 'checkpoints', 'run_state.json')
+ARTIFACT_PATH = os.path.join('data', 'checkpoints', 'artifacts')
+
+def _saved_values():
+    with open(STATE_FILE) as f:
+        return json.load(f)['values']
+
+def test_interrupted_load_resumes_from_the_same_watermark(pipeline):
+    pipeline.fail.add('load')
+    with pytest.raises(RuntimeError, match='load interrupted'):
+        main.run_pipeline()
+
+    assert _saved_values() == {'full_rebuild': False, 'after_sale_id': 3, 'last_date': 20250102}
+    # The transformed frames are not written unless asked for
+    assert not os.path.exists(ARTIFACT_PATH)
+
+    # Committed chunks may have moved the watermark; the resumed run keeps its window
+    pipeline.watermark = (5, 20250103)
+    main.run_pipeline()
+
+    assert len(pipeline.ddl) == 1
+    assert [kwargs['after_sale_id'] for kwargs in pipeline.extracts] == [3, 3]
+    first_key, resumed_key = (kwargs['checkpoint_key'] for _, kwargs in pipeline.loads)
+    assert resumed_key == first_key
+    assert pipeline.loads[1][1]['incremental'] is True
+    # Finished: the state and the chunk checkpoints of the run are cleared
+    assert not os.path.exists(STATE_FILE)
+    assert any(sql.startswith('DELETE FROM etl_load_checkpoint') for sql in pipeline.engine.statements)
+
+def test_stages_completed_before_the_failure_are_skipped(pipeline):
+    pipeline.fail.add('aggregates')
+    with pytest.raises(RuntimeError, match='aggregates interrupted'):
+        main.run_pipeline()
+
+    main.run_pipeline()
+
+    assert len(pipeline.ddl) == 1
+    assert len(pipeline.extracts) == len(pipeline.loads) == 1
+    assert pipeline.aggregates == 2
+
+def test_checkpoint_artifacts_skip_extract_and_transform_when_resuming(pipeline):
+    pipeline.fail.add('load')
+    with pytest.raises(RuntimeError):
+        main.run_pipeline(checkpoint_artifacts=True)
+    assert os.path.isdir(os.path.join(ARTIFACT_PATH, 'transform'))
+
+    main.run_pipeline(checkpoint_artifacts=True)
+
+    assert len(pipeline.extracts) == 1
+    first, resumed = (fact_sale for fact_sale, _ in pipeline.loads)
+    pd.testing.assert_frame_equal(resumed, first.reset_index(drop=True))
+    assert not os.path.exists(ARTIFACT_PATH)
+
+def test_changed_options_start_over(pipeline):
+    pipeline.fail.add('load')
+    with pytest.raises(RuntimeError):
+        main.run_pipeline()
+
+    main.run_pipeline(orphan_policy='unknown')
+
+    assert len(pipeline.ddl) == 2
@@ -0,0 +1,61 @@
+from types import SimpleNamespace
+
+import pytest
+
+import main
+import visualization.kpi_dashboard as dashboard
+
+class _FakeProcess:
+    """Records what a process would run; `exitcode` is what `join` leaves."""
+
+    def __init__(self, target=None, args=(), name=None, exitcode=0):
+        self.target, self.args, self.name = target, args, name
+        self.pid = 4242
+        self.exitcode = None
+        self._exitcode = exitcode
+        self.started = self.joined = False
+
+    def start(self):
+        self.started = True
+
+    def join(self):
+        self.joined = True
+        self.exitcode = self._exitcode
+
+def test_background_dashboard_queries_the_warehouse_in_its_own_process(monkeypatch):
+    processes = []
+
+    def Process(**kwargs):
+        processes.append(_FakeProcess(**kwargs))
+        return processes[-1]
+
+    context = SimpleNamespace(Process=Process)
+    monkeypatch.setattr(dashboard.multiprocessing, 'get_context', lambda method: context)
+
+    def fetch_kpis(**kwargs):
+        raise AssertionError('the KPIs were fetched by the parent process')
+    monkeypatch.setattr(dashboard, 'fetch_kpis', fetch_kpis)
+
+    process = dashboard.create_dashboard(use_cache=False, background=True)
+
+    assert process is processes[0] and process.started
+    assert (process.target, process.args) == (dashboard.build_dashboard, (False,))
+
+def test_background_dashboard_process_fails_with_the_dashboard(monkeypatch):
+    def fetch_kpis(**kwargs):
+        raise RuntimeError('warehouse unreachable')
+    monkeypatch.setattr(dashboard, 'fetch_kpis', fetch_kpis)
+
+    # What the child runs: the error is raised, so the process exits non-zero
+    with pytest.raises(RuntimeError, match='unreachable'):
+        dashboard.build_dashboard()
+    # Inline, the error is reported and the caller goes on
+    assert dashboard.create_dashboard() is None
+
+def test_pipeline_waits_for_the_background_dashboard(pipeline, capsys):
+    pipeline.dashboard = _FakeProcess(exitcode=1)
+
+    main.run_pipeline(background_dashboard=True)
+
+    assert pipeline.dashboard.joined
+    assert 'background dashboard failed (exit code 1)' in capsys.readouterr().out
@@ -0,0 +1,56 @@
+import filecmp
+
+import pandas as pd
+import pytest
+
+from data.raw.data_gen import generate_dataset
+
+def _read(paths, name):
+    path = paths[name]
+    return pd.read_parquet(path) if path.endswith('.parquet') else pd.read_csv(path)
+
+def test_same_seed_writes_the_same_files(tmp_path):
+    first = generate_dataset(str(tmp_path / 'a'), num_sales=500, seed=5, chunk_size=120)
+    second = generate_dataset(str(tmp_path / 'b'), num_sales=500, seed=5, chunk_size=120)
+    other = generate_dataset(str(tmp_path / 'c'), num_sales=500, seed=6, chunk_size=120)
+
+    assert all(filecmp.cmp(first[name], second[name], shallow=False) for name in first)
+    assert not filecmp.cmp(first['sales'], other['sales'], shallow=False)
+
+def test_sales_reference_existing_members_within_the_date_range(tmp_path):
+    paths = generate_dataset(str(tmp_path), num_sales=1000, num_customers=40, num_products=30,
+                             start_date='2025-01-01', num_days=10, seed=1, chunk_size=300)
+    sales = _read(paths, 'sales')
+
+    assert sales['sale_id'].tolist() == list(range(1, 1001))
+    for source, key in (('customers', 'customer_id'), ('products', 'product_id'), ('channels', 'channel_id')):
+        assert sales[key].isin(_read(paths, source)[key]).all()
+    assert len(_read(paths, 'products')) == 30
+    dates = pd.to_datetime(sales['sale_date'])
+    assert dates.min() >= pd.Timestamp('2025-01-01') and dates.max() <= pd.Timestamp('2025-01-11')
+    assert (sales['quantity'] > 0).all() and (sales['unit_price_sale'] > 0).all()
+
+def test_shards_do_not_depend_on_the_number_of_workers(tmp_path):
+    serial = generate_dataset(str(tmp_path / 'serial'), num_sales=301, seed=9, shards=3)
+    parallel = generate_dataset(str(tmp_path / 'parallel'), num_sales=301, seed=9, shards=3, workers=2)
+
+    assert filecmp.cmp(serial['sales'], parallel['sales'], shallow=False)
+    sales = _read(serial, 'sales')
+    assert sales['sale_id'].tolist() == list(range(1, 302))
+    assert sorted(path.name for path in (tmp_path / 'serial').iterdir()) == [
+        'channels.csv', 'customers.csv', 'products.csv', 'sales.csv'
+    ]
+
+def test_parquet_output_holds_the_csv_data(tmp_path):
+    pytest.importorskip('pyarrow')
+    csv = generate_dataset(str(tmp_path / 'csv'), num_sales=200, seed=2, shards=2)
+    parquet = generate_dataset(str(tmp_path / 'parquet'), num_sales=200, seed=2, shards=2, file_format='parquet')
+
+    for name in csv:
+        expected, result = _read(csv, name), _read(parquet, name)
+        pd.testing.assert_frame_equal(result.astype(expected.dtypes.to_dict()), expected)
+
+@pytest.mark.parametrize('kwargs', [{'file_format': 'json'}, {'num_sales': 0}, {'shards': 0}])
+def test_invalid_arguments_are_rejected(tmp_path, kwargs):
+    with pytest.raises(ValueError):
+        generate_dataset(str(tmp_path), **kwargs)
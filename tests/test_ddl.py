@@ -0,0 +1,71 @@
+import re
+
+import pytest
+
+from src.ddl import SCHEMA_FILES, SCHEMA_VERSION_TABLE, apply_schema, ddl_hash, read_sql_statements
+
+def _server(recording_engine, version=None, existing_tables=0):
+    """A server answering the two lookups of `apply_schema`."""
+    def answer(sql, params):
+        if sql.startswith(f"SELECT ddl_hash FROM {SCHEMA_VERSION_TABLE}"):
+            return version
+        if 'information_schema.TABLES' in sql:
+            return existing_tables
+    return recording_engine(answer)
+
+def _dropped(server):
+    return [sql for sql in server.statements if sql.startswith('DROP TABLE')]
+
+def _current_version(schema='standard'):
+    return ddl_hash(read_sql_statements(SCHEMA_FILES[schema]))
+
+def test_unversioned_warehouse_with_tables_is_recreated(recording_engine):
+    server = _server(recording_engine, version=None, existing_tables=5)
+
+    assert apply_schema(server, 'dw') == 'recreated'
+    assert 'DROP TABLE IF EXISTS date;' in _dropped(server)
+
+@pytest.mark.parametrize('version, status', [(None, 'created'), ('current', 'unchanged'), ('old', 'recreated')])
+def test_schema_status(recording_engine, version, status):
+    if version == 'current':
+        version = _current_version()
+    server = _server(recording_engine, version=version)
+
+    assert apply_schema(server, 'dw') == status
+    assert bool(_dropped(server)) == (status == 'recreated')
+
+def _columns(definition):
+    return re.findall(r'`(\w+)`', definition)
+
+def _sale_indexes(schema):
+    """Primary key and secondary index columns of the `sale` table of a schema variant."""
+    create_sale = next(cmd for cmd in read_sql_statements(SCHEMA_FILES[schema]) if 'TABLE IF NOT EXISTS `sale`' in cmd)
+    primary_key = re.search(r'PRIMARY KEY \(([^)]*)\)', create_sale).group(1)
+    indexes = re.findall(r'INDEX `\w+` \(([^)]*)\)', create_sale)
+    return _columns(primary_key), [_columns(index) for index in indexes]
+
+@pytest.mark.parametrize('schema', ['optimized', 'scd2'])
+def test_every_kpi_query_reads_a_covering_index(schema):
+    primary_key, indexes = _sale_indexes(schema)
+    queries = [q for q in read_sql_statements('sql/queries.sql') if 'FROM sale s' in q]
+
+    assert primary_key == ['id_sale']
+    assert len(queries) == 4
+    for query in queries:
+        used = set(re.findall(r'\bs\.(\w+)', query))
+        assert any(used <= set(index) for index in indexes), query
+    # InnoDB needs an index led by every Foreign Key column
+    for column in ('customer_idcustomer', 'product_idproduct', 'channel_idchannel', 'date_iddate'):
+        assert any(index[0] == column for index in indexes)
+
+def test_ddl_hash_ignores_comments_and_layout():
+    statements = read_sql_statements(SCHEMA_FILES['optimized'])
+    reformatted = [
+        '-- reviewed\n' + '\n'.join('  ' + line.split('--')[0].rstrip() for line in command.splitlines())
+        for command in statements
+    ]
+
+    assert ddl_hash(reformatted) == ddl_hash(statements)
+    changed = [command.replace('`idx_sale_date` (`date_iddate`,', '`idx_sale_date` (`date_iddate`, `quantity`,')
+               for command in statements]
+    assert ddl_hash(changed) != ddl_hash(statements)
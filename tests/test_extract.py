@@ -0,0 +1,51 @@
+import pandas as pd
+
+from src.extract import extract_data, extract_data_chunked
+
+def _write_sources(path):
+    pd.DataFrame({'channel_id': [1], 'channel': ['Store']}).to_csv(path / 'channels.csv', index=False)
+    pd.DataFrame({
+        'customer_id': [1], 'name': ['Ana'], 'city': ['Cali'], 'country': ['Colombia'], 'age': [30],
+    }).to_csv(path / 'customers.csv', index=False)
+    pd.DataFrame({
+        'product_id': [1], 'name': ['Rice'], 'category': ['Grocery'], 'brand': ['ACME'],
+        'unit_price': [2.0], 'unit_cost': [1.0],
+    }).to_csv(path / 'products.csv', index=False)
+    sales = pd.DataFrame({
+        'sale_id': [1, 2, 3, 4], 'sale_date': ['2025-01-01'] * 4, 'product_id': [1] * 4,
+        'customer_id': [1] * 4, 'channel_id': [1] * 4, 'quantity': [1] * 4, 'unit_price_sale': [2.0] * 4,
+    })
+    sales.to_csv(path / 'sales.csv', index=False)
+    # A late shard: its ids are below sales already loaded
+    sales.iloc[:2].to_csv(path / 'sales_late.csv', index=False)
+
+def test_watermark_filters_the_sales_file(tmp_path):
+    _write_sources(tmp_path)
+
+    df_sales = extract_data(str(tmp_path), after_sale_id=2)[3]
+
+    assert df_sales['sale_id'].tolist() == [3, 4]
+
+def test_watermark_does_not_drop_late_shard_rows(tmp_path, capsys):
+    _write_sources(tmp_path)
+    shards = [str(tmp_path / 'sales_late.csv')]
+
+    df_sales = extract_data(str(tmp_path), after_sale_id=4, sales_files=shards)[3]
+    chunks = extract_data_chunked(str(tmp_path), 1, after_sale_id=4, sales_files=shards)[3]
+
+    assert df_sales['sale_id'].tolist() == [1, 2]
+    assert [chunk['sale_id'].tolist() for chunk in chunks] == [[1], [2]]
+    assert '2 sales in the new file(s) have a sale_id at or below the watermark' in capsys.readouterr().out
+
+def test_extraction_logs_the_memory_of_every_frame(tmp_path, capsys):
+    _write_sources(tmp_path)
+
+    extract_data(str(tmp_path))
+    batch = capsys.readouterr().out
+    extract_data_chunked(str(tmp_path), 2)
+    chunked = capsys.readouterr().out
+
+    for name, rows in (('channels', 1), ('customers', 1), ('products', 1), ('sales', 4)):
+        assert f" -> '{name}': {rows} rows, " in batch
+    # Streamed sales are never held whole, so only the dimensions are measured
+    assert "'products': 1 rows" in chunked and "'sales'" not in chunked
@@ -0,0 +1,73 @@
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, text
+
+from src.incremental import (
+    LOAD_RUN_MARK, WATERMARK_TABLE, filter_new_sales, get_watermark, read_watermark, record_load_run,
+    update_watermark, upsert_clause, upsert_on_duplicate_key
+)
+
+@pytest.fixture
+def engine():
+    engine = create_engine('sqlite://')
+    with engine.begin() as conn:
+        conn.execute(text(f"CREATE TABLE {WATERMARK_TABLE} (table_name TEXT PRIMARY KEY, last_id INT, last_date INT)"))
+        conn.execute(text("CREATE TABLE customer (id_customer INTEGER PRIMARY KEY, name TEXT, city TEXT)"))
+    return engine
+
+def _facts(*rows):
+    return pd.DataFrame(rows, columns=['id_sale', 'date_iddate'])
+
+def test_watermark_starts_empty_and_only_moves_forward(engine):
+    assert get_watermark(engine) == (0, None)
+
+    update_watermark(engine, _facts((5, 20250103), (3, 20250105)))
+    assert get_watermark(engine) == (5, 20250105)
+
+    # Replaying an older batch, or an empty one, keeps the mark
+    update_watermark(engine, _facts((2, 20250101)))
+    update_watermark(engine, _facts())
+    assert get_watermark(engine) == (5, 20250105)
+
+    update_watermark(engine, _facts((9, 20250104)))
+    assert get_watermark(engine) == (9, 20250105)
+
+def test_watermarks_are_kept_per_table(engine):
+    update_watermark(engine, _facts((7, 20250102)), table_name='agg_sales_category')
+
+    with engine.connect() as conn:
+        assert read_watermark(conn, 'agg_sales_category') == (7, 20250102)
+        assert read_watermark(conn) == (0, None)
+
+def test_every_load_bumps_the_load_run_counter(engine):
+    record_load_run(engine)
+    record_load_run(engine)
+
+    with engine.connect() as conn:
+        assert read_watermark(conn, LOAD_RUN_MARK) == (2, None)
+
+def test_filter_new_sales_keeps_rows_above_the_watermark():
+    df_sales = pd.DataFrame({'sale_id': [1, 5, 6, 9]})
+
+    assert filter_new_sales(df_sales, 5)['sale_id'].tolist() == [6, 9]
+    assert filter_new_sales(df_sales, 0) is df_sales
+
+def test_upsert_inserts_new_members_and_updates_existing_ones(engine):
+    pd.DataFrame({'id_customer': [1, 2], 'name': ['Ana', 'Luis'], 'city': ['Cali', 'Pasto']}).to_sql(
+        'customer', engine, if_exists='append', index=False, method=upsert_on_duplicate_key
+    )
+    pd.DataFrame({'id_customer': [2, 3], 'name': ['Luis', 'Eva'], 'city': ['Tunja', 'Neiva']}).to_sql(
+        'customer', engine, if_exists='append', index=False, method=upsert_on_duplicate_key
+    )
+
+    stored = pd.read_sql("SELECT * FROM customer ORDER BY id_customer", engine)
+    assert stored.values.tolist() == [[1, 'Ana', 'Cali'], [2, 'Luis', 'Tunja'], [3, 'Eva', 'Neiva']]
+
+def test_upsert_clause_follows_the_dialect(recording_engine):
+    updates = {'last_id': 'GREATEST(last_id, {new})'}
+
+    assert upsert_clause(recording_engine(), updates) == (
+        "ON DUPLICATE KEY UPDATE last_id = GREATEST(last_id, VALUES(last_id))"
+    )
+    with create_engine('sqlite://').connect() as conn:
+        assert upsert_clause(conn, updates) == "ON CONFLICT DO UPDATE SET last_id = MAX(last_id, excluded.last_id)"
@@ -0,0 +1,66 @@
+import json
+import tracemalloc
+
+import pytest
+
+from src.instrumentation import RunReport, stage
+
+def _stages(report):
+    return {record['stage']: record for record in report.stages}
+
+def test_stages_record_rows_time_memory_and_nesting(tmp_path):
+    report = RunReport(report_path=str(tmp_path))
+
+    with report.stage('load', rows_in=3) as metrics:
+        with report.stage('load.sale', rows_in=3) as table:
+            table['rows_out'] = 3
+        report.record('load.customer', wall_seconds=0.5, rows_out=2)
+        metrics['rows_out'] = 3
+
+    stages = _stages(report)
+    assert [record['stage'] for record in report.stages] == ['load.sale', 'load.customer', 'load']
+    assert stages['load']['parent'] is None
+    assert stages['load.sale']['parent'] == stages['load.customer']['parent'] == 'load'
+    assert (stages['load']['rows_in'], stages['load']['rows_out'], stages['load']['status']) == (3, 3, 'ok')
+    assert stages['load']['wall_seconds'] >= stages['load.sale']['wall_seconds'] >= 0
+    assert stages['load']['rss_mb'] > 0 and stages['load']['process_peak_rss_mb'] > 0
+    assert 'tracemalloc_peak_mb' not in stages['load']
+
+def test_failed_stage_is_reported_and_the_error_propagates(tmp_path):
+    report = RunReport(report_path=str(tmp_path))
+
+    with pytest.raises(ValueError):
+        with report.stage('transform'):
+            raise ValueError('bad input')
+    path = report.write()
+
+    with open(path) as f:
+        written = json.load(f)
+    assert written['run_id'] == report.run_id
+    assert [(record['stage'], record['status']) for record in written['stages']] == [('transform', 'failed')]
+
+def test_traced_memory_includes_nested_stages(tmp_path, request):
+    report = RunReport(report_path=str(tmp_path), trace_memory=True)
+    # The report starts tracing and leaves it on for the rest of the run
+    request.addfinalizer(tracemalloc.stop)
+
+    with report.stage('transform'):
+        with report.stage('transform.sales'):
+            block = bytearray(8 * 1024 ** 2)
+            del block
+
+    stages = _stages(report)
+    assert stages['transform.sales']['tracemalloc_peak_mb'] >= 8
+    assert stages['transform']['tracemalloc_peak_mb'] >= stages['transform.sales']['tracemalloc_peak_mb']
+
+def test_profiled_stage_dumps_a_profile(tmp_path):
+    report = RunReport(report_path=str(tmp_path), profile=True)
+
+    with report.stage('extract'):
+        sum(range(1000))
+
+    assert (tmp_path / f"run_{report.run_id}_extract.prof").exists()
+
+def test_stage_without_a_report_is_a_no_op():
+    with stage(None, 'load', rows_in=1) as metrics:
+        metrics['rows_out'] = 1
@@ -0,0 +1,67 @@
+import time
+
+import pandas as pd
+import pytest
+
+import visualization.kpi_dashboard as dashboard
+from src.kpi_cache import KpiCache
+
+def _result(query):
+    """A result with the columns every KPI query returns."""
+    return pd.DataFrame({
+        'category': ['Dairy'], 'channel': ['Online'], 'month': [1], 'brand': ['ACME'],
+        'revenue': [10.0], 'profit': [2.0], 'total_profit': [2.0],
+    })
+
+@pytest.fixture
+def database(monkeypatch, tmp_path):
+    """Counts the control table reads and KPI queries `fetch_kpis` sends to the warehouse."""
+    calls = {'control': 0, 'queries': 0}
+
+    def read_control_rows(engine):
+        calls['control'] += 1
+        return [('load_run', calls['load_runs'], None, None)]
+
+    def read_sql(query, con):
+        calls['queries'] += 1
+        return _result(query)
+
+    calls['load_runs'] = 1
+    monkeypatch.setattr(dashboard, 'KpiCache', lambda: KpiCache(str(tmp_path)))
+    monkeypatch.setattr(dashboard, 'read_control_rows', read_control_rows)
+    monkeypatch.setattr(dashboard, 'aggregates_are_current', lambda engine, control_rows: False)
+    monkeypatch.setattr(pd, 'read_sql', read_sql)
+    return calls
+
+def test_cached_dashboard_does_not_touch_the_database(database):
+    dashboard.fetch_kpis(engine=object())
+    dashboard.fetch_kpis(engine=object())
+
+    assert (database['control'], database['queries']) == (1, 4)
+
+def test_forgotten_version_is_read_again(database, tmp_path):
+    dashboard.fetch_kpis(engine=object())
+    KpiCache(str(tmp_path)).forget_version()
+    dashboard.fetch_kpis(engine=object())
+    assert (database['control'], database['queries']) == (2, 4)
+
+    # A new load changes the version: every query runs again
+    database['load_runs'] += 1
+    KpiCache(str(tmp_path)).forget_version()
+    dashboard.fetch_kpis(engine=object())
+    assert (database['control'], database['queries']) == (3, 8)
+
+def test_remembered_version_expires(tmp_path, monkeypatch):
+    cache = KpiCache(str(tmp_path), version_max_age=60)
+    cache.remember_version('abc', aggregates=True)
+    assert cache.cached_version()['version'] == 'abc'
+
+    now = time.time()
+    monkeypatch.setattr(time, 'time', lambda: now + 61)
+    assert cache.cached_version() is None
+
+def test_uncached_dashboard_always_reads_the_database(database):
+    dashboard.fetch_kpis(use_cache=False, engine=object())
+    dashboard.fetch_kpis(use_cache=False, engine=object())
+
+    assert (database['control'], database['queries']) == (2, 8)
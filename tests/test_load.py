@@ -0,0 +1,192 @@
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, text
+
+import src.load as load
+from data.raw.data_gen import generate_dataset
+from src.extract import extract_data
+from src.incremental import WATERMARK_TABLE
+from src.transform import transform_data
+
+@pytest.fixture
+def engine():
+    engine = create_engine('sqlite://')
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE sale (id_sale INTEGER PRIMARY KEY, quantity INTEGER)"))
+        conn.execute(text(f"CREATE TABLE {WATERMARK_TABLE} (table_name TEXT PRIMARY KEY, last_id INT, last_date INT)"))
+        conn.execute(text(f"INSERT INTO {WATERMARK_TABLE} VALUES ('sale', 10, 20250101)"))
+        # Sales 1..10 were loaded by earlier runs
+        for id_sale in range(1, 11):
+            conn.execute(text(f"INSERT INTO sale VALUES ({id_sale}, 1)"))
+    return engine
+
+def _quantities(engine):
+    with engine.connect() as conn:
+        return dict(conn.execute(text("SELECT id_sale, quantity FROM sale ORDER BY id_sale")).fetchall())
+
+def test_checkpointed_load_of_late_sales_keeps_earlier_loads(engine, monkeypatch):
+    monkeypatch.setattr(load, 'completed_chunks', lambda engine, run_key: {})
+    monkeypatch.setattr(load, 'record_chunk', lambda *args: None)
+    # A late shard re-delivering sale 4, with sales 12 and 15; a failed attempt left 15 behind
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO sale VALUES (15, 1)"))
+    fact_sale = pd.DataFrame({'id_sale': [4, 12, 15], 'quantity': [7, 7, 7]})
+
+    load._load_fact_checkpointed(fact_sale, engine, 'run', lambda chunk: chunk.to_sql(
+        'sale', engine, if_exists='append', index=False
+    ))
+
+    quantities = _quantities(engine)
+    # Only the re-delivered id is replaced inside the already loaded range
+    assert [quantities[i] for i in range(1, 11)] == [1, 1, 1, 7, 1, 1, 1, 1, 1, 1]
+    assert quantities[12] == quantities[15] == 7
+
+class _FakeInspector:
+    """Live schema seen by `load_data_swap`: one secondary index on the shadow fact table, one Foreign Key."""
+
+    def get_indexes(self, table_name):
+        if table_name != 'sale' + load.STAGING_SUFFIX:
+            return []
+        return [{'name': 'idx_sale_date', 'unique': False, 'column_names': ['date_iddate']}]
+
+    def get_foreign_keys(self, table_name):
+        if table_name != 'sale':
+            return []
+        return [{'name': 'fk_sale_customer', 'constrained_columns': ['customer_idcustomer'],
+                 'referred_table': 'customer', 'referred_columns': ['id_customer']}]
+
+@pytest.fixture
+def swap(monkeypatch, recording_engine):
+    """
+    Runs `load_data_swap` against a recording engine and returns what it did,
+    in order: statements as strings, bulk loads as `('load', table)`. `log`
+    is filled as it goes, so it also holds the steps of a failed run.
+    """
+    def run(log, answer=None, fail_load=False):
+        engine = recording_engine(answer, log=log)
+
+        def to_sql(df, name, con, **kwargs):
+            log.append(('load', name))
+
+        def load_fact_partitions(fact_sale, engine_, workers, strategy, batch_size, table_name):
+            log.append(('load', table_name))
+            if fail_load:
+                raise RuntimeError('connection lost')
+            return {'rows_per_sec': 1.0}
+
+        monkeypatch.setattr(load, 'inspect', lambda engine_: _FakeInspector())
+        monkeypatch.setattr(pd.DataFrame, 'to_sql', to_sql)
+        monkeypatch.setattr(load, '_load_fact_partitions', load_fact_partitions)
+        dimension = pd.DataFrame({'id': [1]})
+        fact_sale = pd.DataFrame({'id_sale': [1, 2], 'date_iddate': [20250101, 20250102]})
+        try:
+            load.load_data_swap(dimension, dimension, dimension, dimension, fact_sale, engine=engine)
+        finally:
+            log[:] = [entry[1] if entry[0] == 'sql' else entry for entry in log]
+    return run
+
+SHADOW_CLEANUP = [
+    f"DROP TABLE IF EXISTS `{t}{suffix}`" for t in load.SWAP_TABLES for suffix in ('__staging', '__old')
+]
+
+def test_full_refresh_loads_shadow_tables_and_swaps_them_in_one_rename(swap):
+    log = []
+    swap(log)
+
+    rename = next(i for i, entry in enumerate(log) if str(entry).startswith('RENAME TABLE'))
+    # Shadow tables are created, loaded and indexed before anything touches the live ones
+    assert log[:15] == [
+        statement for t in load.SWAP_TABLES for statement in (
+            f"DROP TABLE IF EXISTS `{t}__staging`", f"DROP TABLE IF EXISTS `{t}__old`",
+            f"CREATE TABLE `{t}__staging` LIKE `{t}`",
+        )
+    ]
+    assert log[15:22] == [
+        ('load', 'channel__staging'), ('load', 'customer__staging'), ('load', 'product__staging'),
+        ('load', 'date__staging'),
+        "ALTER TABLE `sale__staging` DROP INDEX `idx_sale_date`",
+        ('load', 'sale__staging'),
+        "ALTER TABLE `sale__staging` ADD INDEX `idx_sale_date` (`date_iddate`)",
+    ]
+    # Foreign Keys move to the shadow tables, then one statement swaps every table
+    assert log[22:rename] == [
+        "SET FOREIGN_KEY_CHECKS = 0",
+        "ALTER TABLE `sale` DROP FOREIGN KEY `fk_sale_customer`",
+        "ALTER TABLE `sale__staging` ADD CONSTRAINT `fk_sale_customer` FOREIGN KEY (`customer_idcustomer`) "
+        "REFERENCES `customer__staging` (`id_customer`)",
+    ]
+    assert log[rename] == 'RENAME TABLE ' + ', '.join(
+        f"`{t}` TO `{t}__old`, `{t}__staging` TO `{t}`" for t in load.SWAP_TABLES
+    )
+    assert log[rename + 1:rename + 7] == (
+        [f"DROP TABLE `{t}__old`" for t in load.SWAP_TABLES] + ["SET FOREIGN_KEY_CHECKS = 1"]
+    )
+    assert log[rename + 7].startswith(f"DELETE FROM {WATERMARK_TABLE}")
+
+def test_failed_swap_restores_the_foreign_keys_and_drops_the_shadow_tables(swap):
+    def answer(sql, params):
+        if sql.startswith('RENAME TABLE'):
+            raise RuntimeError('lock wait timeout')
+
+    log = []
+    with pytest.raises(RuntimeError, match='lock wait timeout'):
+        swap(log, answer)
+
+    rename = next(i for i, entry in enumerate(log) if str(entry).startswith('RENAME TABLE'))
+    assert log[rename + 1:] == [
+        "ALTER TABLE `sale__staging` DROP FOREIGN KEY `fk_sale_customer`",
+        "ALTER TABLE `sale` ADD CONSTRAINT `fk_sale_customer` FOREIGN KEY (`customer_idcustomer`) "
+        "REFERENCES `customer` (`id_customer`)",
+        "SET FOREIGN_KEY_CHECKS = 1",
+    ] + SHADOW_CLEANUP
+
+def test_failed_shadow_load_drops_the_shadow_tables_without_touching_the_live_ones(swap):
+    log = []
+    with pytest.raises(RuntimeError, match='connection lost'):
+        swap(log, fail_load=True)
+
+    assert log[-len(SHADOW_CLEANUP):] == SHADOW_CLEANUP
+    assert not any(str(entry).startswith(('RENAME TABLE', 'ALTER TABLE `sale` ', 'SET FOREIGN_KEY_CHECKS')) for entry in log)
+
+@pytest.fixture
+def warehouse_frames(tmp_path):
+    """Transformed frames of a small generated dataset, keyed by warehouse table."""
+    generate_dataset(str(tmp_path / 'raw'), num_sales=200, seed=3)
+    frames = transform_data(*extract_data(str(tmp_path / 'raw')), quarantine_path=str(tmp_path / 'q.csv'))
+    return dict(zip(('channel', 'customer', 'product', 'date', 'sale'), frames))
+
+def _sqlite_warehouse(path, frames):
+    """A SQLite file database with the warehouse tables of `frames` and the control table."""
+    engine = create_engine(f'sqlite:///{path}')
+    keys = {'channel': 'id_channel', 'customer': 'id_customer', 'product': 'id_product', 'date': 'id_date', 'sale': 'id_sale'}
+    with engine.begin() as conn:
+        for table_name, df in frames.items():
+            conn.execute(text(pd.io.sql.get_schema(df, table_name, keys=keys[table_name], con=conn)))
+        conn.execute(text(f"CREATE TABLE {WATERMARK_TABLE} (table_name TEXT PRIMARY KEY, last_id INT, last_date INT)"))
+    return engine
+
+def test_parallel_load_matches_the_serial_one(tmp_path, warehouse_frames):
+    serial = _sqlite_warehouse(tmp_path / 'serial.db', warehouse_frames)
+    parallel = _sqlite_warehouse(tmp_path / 'parallel.db', warehouse_frames)
+
+    load.load_data(*warehouse_frames.values(), engine=serial)
+    load.load_data_parallel(*warehouse_frames.values(), workers=3, engine=parallel)
+
+    for table_name in (*warehouse_frames, WATERMARK_TABLE):
+        query = f"SELECT * FROM `{table_name}` ORDER BY 1"
+        pd.testing.assert_frame_equal(pd.read_sql(query, parallel), pd.read_sql(query, serial))
+
+def test_fact_partitions_are_contiguous_id_ranges(monkeypatch):
+    partitions = []
+
+    def bulk_load(df, table_name, engine, strategy, batch_size):
+        partitions.append(df['id_sale'].tolist())
+        return {'seconds': 0.0}
+
+    monkeypatch.setattr(load, 'bulk_load', bulk_load)
+    fact_sale = pd.DataFrame({'id_sale': [7, 3, 9, 1, 5, 2, 8, 4, 6, 10]})
+
+    stats = load._load_fact_partitions(fact_sale, None, 3, 'multi_insert', 100)
+
+    assert sorted(partitions) == [[1, 2, 3], [4, 5, 6], [7, 8, 9, 10]]
+    assert stats['rows'] == 10
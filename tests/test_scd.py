@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.scd import (
+    SCD_VALID_FROM_MIN, apply_scd2, empty_dimension_versions, resolve_versions, row_hash
+)
+
+def _customers(**changes):
+    """Standardized source customers keyed by `id_customer`, as `transform_dimensions` returns them."""
+    df = pd.DataFrame({
+        'id_customer': [1, 2, 3],
+        'name': ['Ana', 'Luis', 'Eva'],
+        'city': ['Bogota', 'Cali', 'Pasto'],
+        'country': ['Colombia'] * 3,
+        'age': [30, 41, 25],
+    })
+    for column, (position, value) in changes.items():
+        df.loc[position, column] = value
+    return df
+
+def _first_load():
+    versions, _ = apply_scd2(empty_dimension_versions('customer'), _customers(), 'customer', pd.Timestamp('2025-01-01'))
+    return versions
+
+def test_row_hash_ignores_how_the_frame_was_read():
+    plain = _customers()
+    typed = plain.astype({'city': 'category', 'country': 'string', 'age': 'int16'})
+
+    assert (row_hash(plain, ['name', 'city', 'age']) == row_hash(typed, ['name', 'city', 'age'])).all()
+    changed = row_hash(_customers(city=(1, 'Medellin')), ['name', 'city', 'age'])
+    assert (changed != row_hash(plain, ['name', 'city', 'age'])).tolist() == [False, True, False]
+
+def test_row_hash_compares_money_as_cents():
+    floats = pd.DataFrame({'unit_price': [0.1 + 0.2, 19.99]})
+    cents = pd.DataFrame({'unit_price': np.array([30, 1999], dtype='int64')})
+
+    assert (row_hash(floats, ['unit_price']) == row_hash(cents, ['unit_price'])).all()
+
+def test_first_load_adds_one_current_version_per_member():
+    versions, counts = apply_scd2(
+        empty_dimension_versions('customer'), _customers(), 'customer', pd.Timestamp('2025-03-01')
+    )
+
+    assert counts == {'new': 3, 'changed': 0}
+    assert versions['id_customer'].tolist() == [1, 2, 3]
+    assert versions['customer_id'].tolist() == [1, 2, 3]
+    assert (versions['valid_from'] == SCD_VALID_FROM_MIN).all()
+    assert versions['valid_to'].isna().all()
+    assert versions['is_current'].tolist() == [1, 1, 1]
+
+def test_changed_member_closes_its_version_and_opens_a_new_one():
+    incoming = _customers(city=(1, 'Medellin'))
+    incoming.loc[3] = [4, 'Sol', 'Cali', 'Colombia', 52]
+
+    versions, counts = apply_scd2(_first_load(), incoming, 'customer', pd.Timestamp('2025-02-10'))
+
+    assert counts == {'new': 1, 'changed': 1}
+    assert versions['id_customer'].tolist() == [1, 2, 3, 4, 5]
+    closed = versions.iloc[1]
+    assert closed['is_current'] == 0
+    assert closed['valid_to'] == pd.Timestamp('2025-02-09')
+    opened = versions[versions['customer_id'] == 2].iloc[-1]
+    assert (opened['id_customer'], opened['city'], opened['is_current']) == (4, 'Medellin', 1)
+    assert opened['valid_from'] == pd.Timestamp('2025-02-10')
+    # The new member starts with an open-ended first version
+    assert versions.iloc[4]['valid_from'] == SCD_VALID_FROM_MIN
+    # Unchanged members keep their only version
+    assert versions.loc[[0, 2], 'is_current'].tolist() == [1, 1]
+    assert versions.loc[[0, 2], 'valid_to'].isna().all()
+
+def test_unchanged_source_adds_nothing():
+    first = _first_load()
+
+    versions, counts = apply_scd2(first, _customers(), 'customer', pd.Timestamp('2025-02-10'))
+
+    assert counts == {'new': 0, 'changed': 0}
+    pd.testing.assert_frame_equal(versions, first)
+
+def test_new_version_never_starts_before_the_one_it_replaces():
+    second, _ = apply_scd2(_first_load(), _customers(city=(1, 'Medellin')), 'customer', pd.Timestamp('2025-02-10'))
+
+    # A change effective before the current version started (late batch)
+    versions, _ = apply_scd2(second, _customers(city=(1, 'Tunja')), 'customer', pd.Timestamp('2025-01-15'))
+
+    member = versions[versions['customer_id'] == 2]
+    assert member['city'].tolist() == ['Cali', 'Medellin', 'Tunja']
+    assert member['valid_from'].tolist()[1:] == [pd.Timestamp('2025-02-10'), pd.Timestamp('2025-02-11')]
+    assert member['valid_to'].tolist()[1] == pd.Timestamp('2025-02-10')
+
+def test_sales_resolve_to_the_version_current_at_their_date():
+    versions, _ = apply_scd2(_first_load(), _customers(city=(1, 'Medellin')), 'customer', pd.Timestamp('2025-02-10'))
+    keys = np.array([2, 2, 2, 1, 3])
+    dates = pd.Series(pd.to_datetime(['2025-02-09', '2025-02-10', '2025-06-01', '1999-01-01', '2025-02-10']))
+
+    positions = resolve_versions(keys, dates, versions, 'customer')
+
+    # The day before the change, exactly on the boundary, after it; members with one version
+    assert versions['id_customer'].to_numpy().take(positions).tolist() == [2, 4, 4, 1, 3]
+
+def test_sale_before_the_first_version_of_its_member_is_rejected():
+    versions = _first_load()
+    # Member 3 only exists from 2025-03-01, member 2 (sorted just before it) from the start
+    versions.loc[2, 'valid_from'] = pd.Timestamp('2025-03-01')
+
+    with pytest.raises(ValueError, match="1 sales have no 'customer' version"):
+        resolve_versions(np.array([3, 2]), pd.Series(pd.to_datetime(['2025-02-28', '2025-02-28'])), versions, 'customer')
+    positions = resolve_versions(np.array([3]), pd.Series(pd.to_datetime(['2025-03-01'])), versions, 'customer')
+    assert positions.tolist() == [2]
+
+def test_unknown_member_is_rejected():
+    with pytest.raises(ValueError, match="no 'customer' version"):
+        resolve_versions(np.array([9]), pd.Series(pd.to_datetime(['2025-01-01'])), _first_load(), 'customer')
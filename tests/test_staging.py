@@ -0,0 +1,99 @@
+import os
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+from data.raw.data_gen import generate_dataset
+from src.extract import extract_data
+from src.incremental import WATERMARK_TABLE, get_watermark
+from src.load import load_data
+from src.staging import stage_raw_data, staging_available
+from src.transform import transform_data
+
+pytestmark = pytest.mark.skipif(not staging_available(), reason='pyarrow is not installed')
+
+# Primary keys of the warehouse tables (sql/create_tables_optimized.sql)
+KEYS = {
+    'channel': ['id_channel'], 'customer': ['id_customer'], 'product': ['id_product'],
+    'date': ['id_date'], 'sale': ['id_sale'],
+}
+
+@pytest.fixture
+def raw(tmp_path, monkeypatch):
+    """A small generated raw layer; the staging layer goes to `tmp_path/data/staging`."""
+    monkeypatch.chdir(tmp_path)
+    generate_dataset('raw', num_sales=200, seed=11)
+    return 'raw'
+
+def _staged_mtimes():
+    staging = os.path.join('data', 'staging')
+    # The manifest is rewritten by every call, the staged files only when converted
+    return {
+        name: os.stat(os.path.join(staging, name)).st_mtime_ns
+        for name in os.listdir(staging) if name != '_manifest.json'
+    }
+
+def test_staging_converts_each_source_once(raw, capsys):
+    stage_raw_data(raw)
+    first = _staged_mtimes()
+    capsys.readouterr()
+
+    stage_raw_data(raw)
+    # A touched but identical file is not converted again either
+    os.utime(os.path.join(raw, 'sales.csv'), ns=(0, 0))
+    stage_raw_data(raw)
+
+    assert 'Staging' not in capsys.readouterr().out
+    assert _staged_mtimes() == first
+
+    with open(os.path.join(raw, 'customers.csv'), 'a') as f:
+        f.write('999,Nuevo Cliente,Bogota,Colombia,33\n')
+    stage_raw_data(raw)
+
+    assert "Staging 'customers.csv'" in capsys.readouterr().out
+    changed = {name for name, mtime in _staged_mtimes().items() if mtime != first[name]}
+    assert changed == {'customers.parquet'}
+
+def _create_warehouse(engine, frames):
+    """Creates the warehouse tables (with their keys) from the first transformed frames."""
+    with engine.begin() as conn:
+        for table_name, df in frames.items():
+            conn.execute(text(pd.io.sql.get_schema(df, table_name, keys=KEYS[table_name], con=conn)))
+
+def _run(raw, engine):
+    """Extracts (staged) the sales above the watermark, transforms and upserts them."""
+    after_sale_id, _ = get_watermark(engine)
+    frames = dict(zip(
+        ('channel', 'customer', 'product', 'date', 'sale'),
+        transform_data(*extract_data(raw, after_sale_id=after_sale_id, staging_format='parquet'))
+    ))
+    if not inspect(engine).has_table('sale'):
+        _create_warehouse(engine, frames)
+    load_data(*frames.values(), incremental=True, engine=engine)
+
+def _warehouse(engine):
+    return {
+        table_name: pd.read_sql(f"SELECT * FROM `{table_name}` ORDER BY {', '.join(keys)}", engine)
+        for table_name, keys in {**KEYS, WATERMARK_TABLE: ['table_name']}.items()
+    }
+
+def test_loading_the_same_input_twice_changes_nothing(raw, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'warehouse.db'}")
+    with engine.begin() as conn:
+        conn.execute(text(
+            f"CREATE TABLE {WATERMARK_TABLE} (table_name TEXT PRIMARY KEY, last_id INTEGER, last_date INTEGER)"
+        ))
+
+    _run(raw, engine)
+    first = _warehouse(engine)
+    _run(raw, engine)
+    second = _warehouse(engine)
+
+    assert len(first['sale']) == 200
+    for table_name in KEYS:
+        pd.testing.assert_frame_equal(second[table_name], first[table_name])
+    # Only the load counter moves
+    before, after = (run[WATERMARK_TABLE].set_index('table_name') for run in (first, second))
+    assert after.loc['sale'].equals(before.loc['sale'])
+    assert after.loc['load_run', 'last_id'] == before.loc['load_run', 'last_id'] + 1
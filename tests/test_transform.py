@@ -0,0 +1,165 @@
+from decimal import Decimal
+
+import pandas as pd
+import pytest
+
+from data.raw.data_gen import generate_dataset
+from src.extract import extract_data, extract_data_chunked
+from src.money import apply_money_mode, scale_for_load, to_cents
+from src.transform import (
+    build_date_dimension, date_key, deduplicate_dimensions, parse_sale_dates, transform_data,
+    transform_data_chunked, transform_data_parallel, transform_sales
+)
+
+def _sources():
+    df_channels = pd.DataFrame({'channel_id': [1, 2], 'name': ['Store', 'Online']})
+    df_customers = pd.DataFrame({
+        'customer_id': [1, 2, 2], 'name': ['Ana', 'Luis', 'Luis'], 'city': ['bogota', 'cali', 'medellin'],
+        'country': ['colombia'] * 3, 'age': [30, 41, 41],
+    })
+    df_products = pd.DataFrame({
+        'product_id': [1, 2, 1], 'name': ['Rice', 'Milk', 'Rice'], 'category': ['grocery', 'dairy', 'grocery'],
+        'brand': ['acme', 'cow', 'acme'], 'unit_price': [2.0, 1.5, 2.5], 'unit_cost': [1.0, 1.0, 2.0],
+    })
+    df_sales = pd.DataFrame({
+        'sale_id': [1, 2, 3], 'sale_date': ['2025-01-01', '2025-01-02', '2025-01-02'],
+        'customer_id': [1, 2, 2], 'product_id': [1, 2, 1], 'channel_id': [1, 2, 2],
+        'quantity': [2, 1, 4], 'unit_price_sale': [2.5, 1.5, 2.5],
+    })
+    return df_channels, df_customers, df_products, df_sales
+
+def test_duplicated_dimension_ids_keep_the_last_row(capsys):
+    df_channels, df_customers, df_products, df_sales = _sources()
+
+    _, dim_customer, dim_product, _, fact_sale = transform_data(
+        df_channels, df_customers, df_products, df_sales
+    )
+
+    assert dim_customer['id_customer'].tolist() == [1, 2]
+    assert dim_customer['city'].astype(str).tolist() == ['Bogota', 'Medellin']
+    assert dim_product['id_product'].tolist() == [2, 1]
+    # Product 1 is costed with its last source row
+    assert fact_sale['profit'].tolist() == [1.0, 0.5, 2.0]
+    assert 'duplicated customer_id' in capsys.readouterr().out
+
+def test_unique_dimensions_are_returned_unchanged():
+    df_channels, df_customers, df_products, _ = _sources()
+    df_customers = df_customers.drop_duplicates('customer_id')
+
+    frames = deduplicate_dimensions(df_channels, df_customers, df_products.iloc[:2])
+
+    assert frames[0] is df_channels
+    assert frames[1] is df_customers
+
+def test_transform_sales_rejects_duplicated_keys():
+    _, _, df_products, df_sales = _sources()
+
+    with pytest.raises(ValueError, match='Duplicated product_id'):
+        transform_sales(df_sales, df_products)
+
+def test_parallel_transform_matches_the_serial_one(tmp_path):
+    serial = transform_data(*_sources(), quarantine_path=str(tmp_path / 'serial.csv'))
+    parallel = transform_data_parallel(*_sources(), workers=2, quarantine_path=str(tmp_path / 'parallel.csv'))
+
+    for expected, result in zip(serial, parallel):
+        pd.testing.assert_frame_equal(result.reset_index(drop=True), expected.reset_index(drop=True))
+
+def _priced_sources(money):
+    """Sources whose prices are not exact in binary floating point, extracted in a money mode."""
+    df_channels, df_customers, _, _ = _sources()
+    df_products = pd.DataFrame({
+        'product_id': [1, 2, 3], 'name': ['Gum', 'Wine', 'Soap'], 'category': ['candy', 'drinks', 'home'],
+        'brand': ['acme', 'vid', 'acme'], 'unit_price': [0.1, 19.99, 1.15], 'unit_cost': [0.07, 12.34, 0.95],
+    })
+    df_sales = pd.DataFrame({
+        'sale_id': [1, 2, 3, 4], 'sale_date': ['2025-01-01'] * 4,
+        'customer_id': [1, 1, 2, 2], 'product_id': [1, 1, 3, 2], 'channel_id': [1, 1, 2, 2],
+        'quantity': [3, 7, 3, 1000], 'unit_price_sale': [0.29, 0.1, 1.15, 19.99],
+    })
+    return (
+        df_channels, df_customers, apply_money_mode(df_products, 'products', money),
+        apply_money_mode(df_sales, 'sales', money),
+    )
+
+def test_cents_money_mode_is_exact_integer_arithmetic(tmp_path):
+    *_, fact_sale = transform_data(*_priced_sources('cents'), quarantine_path=str(tmp_path / 'q.csv'))
+
+    for column in ('unit_price_sale', 'total_amount', 'profit'):
+        assert fact_sale[column].dtype == 'int64'
+    assert fact_sale['unit_price_sale'].tolist() == [29, 10, 115, 1999]
+    assert (fact_sale['total_amount'] == fact_sale['quantity'] * fact_sale['unit_price_sale']).all()
+    assert fact_sale['total_amount'].tolist() == [87, 70, 345, 1999000]
+    assert fact_sale['profit'].tolist() == [66, 21, 60, 765000]
+
+    # Written back as the exact DECIMAL(10,2) amounts
+    loaded = scale_for_load(fact_sale, 'sale')
+    assert [Decimal(str(value)) for value in loaded['total_amount']] == [
+        Decimal('0.87'), Decimal('0.70'), Decimal('3.45'), Decimal('19990.00')
+    ]
+    assert [Decimal(str(value)) for value in loaded['profit']] == [
+        Decimal('0.66'), Decimal('0.21'), Decimal('0.60'), Decimal('7650.00')
+    ]
+
+def test_float_money_mode_rounds_to_the_same_cents(tmp_path):
+    *_, dim_product, _, floats = transform_data(*_priced_sources('float'), quarantine_path=str(tmp_path / 'f.csv'))
+    *_, dim_product_cents, _, cents = transform_data(*_priced_sources('cents'), quarantine_path=str(tmp_path / 'c.csv'))
+
+    assert floats['total_amount'].dtype == 'float64'
+    # The float results carry binary representation error...
+    assert [total == exact for total, exact in zip(floats['total_amount'], [0.87, 0.7, 3.45, 19990.0])] == [
+        False, False, False, True
+    ]
+    # ...which rounding to the DECIMAL(10,2) scale removes
+    for column in ('unit_price_sale', 'total_amount', 'profit'):
+        assert to_cents(floats[column]).tolist() == cents[column].tolist()
+    assert dim_product_cents['unit_price'].dtype == 'int64'
+    pd.testing.assert_frame_equal(scale_for_load(dim_product_cents, 'product'), dim_product)
+
+@pytest.mark.parametrize('money', ['float', 'cents'])
+def test_chunked_transform_matches_the_batch_one(tmp_path, money):
+    generate_dataset(str(tmp_path / 'raw'), num_sales=300, seed=7)
+    chunk_size = 40
+    raw = str(tmp_path / 'raw')
+
+    *_, df_sales = sources = extract_data(raw, money=money)
+    # Some customer buys on both sides of a chunk boundary
+    chunk_of_sale = pd.Series(range(len(df_sales))) // chunk_size
+    assert (chunk_of_sale.groupby(df_sales['customer_id']).nunique() > 1).any()
+
+    batch = transform_data(*sources, quarantine_path=str(tmp_path / 'batch.csv'))
+    df_chan, df_cust, df_prod, sales_chunks = extract_data_chunked(raw, chunk_size, money=money)
+    *dimensions, fact_stream = transform_data_chunked(
+        df_chan, df_cust, df_prod, sales_chunks, quarantine_path=str(tmp_path / 'chunked.csv')
+    )
+    pieces = list(fact_stream)
+
+    assert len(pieces) == -(-len(df_sales) // chunk_size)
+    dim_date = pd.concat([dim_date for dim_date, _ in pieces], ignore_index=True)
+    fact_sale = pd.concat([fact_sale for _, fact_sale in pieces], ignore_index=True)
+    for expected, result in zip(batch, (*dimensions, dim_date, fact_sale)):
+        pd.testing.assert_frame_equal(result.reset_index(drop=True), expected.reset_index(drop=True))
+
+def test_date_key_matches_formatting_each_date():
+    dates = pd.Series(pd.to_datetime(['2025-01-31', '1999-12-01', '2024-02-29']))
+
+    assert date_key(dates).tolist() == dates.dt.strftime('%Y%m%d').astype(int).tolist()
+    assert date_key(pd.DatetimeIndex(dates)).dtype == 'int64'
+
+def test_date_dimension_has_one_row_per_distinct_day():
+    sale_dates = parse_sale_dates(pd.Series(['2025-03-02', '2025-02-28', '2025-03-02', '2025-02-28T15:30:00']))
+
+    dim_date = build_date_dimension(sale_dates)
+
+    # In order of first appearance; a time of day falls on its day
+    assert dim_date.to_dict('list') == {
+        'id_date': [20250302, 20250228], 'day': [2, 28], 'month': [3, 2], 'year': [2025, 2025],
+        'quarter': [1, 1], 'weekday': [7, 5], 'iso_week': [9, 9], 'is_weekend': [1, 0],
+    }
+
+def test_full_calendar_covers_days_without_sales():
+    sale_dates = parse_sale_dates(pd.Series(['2025-01-03', '2025-01-01']))
+
+    dim_date = build_date_dimension(sale_dates, full_calendar=True)
+
+    assert dim_date['id_date'].tolist() == [20250101, 20250102, 20250103]
+    assert build_date_dimension(sale_dates.iloc[:0], full_calendar=True).empty
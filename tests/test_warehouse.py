@@ -0,0 +1,175 @@
+import gzip
+import io
+import json
+import os
+import re
+import subprocess
+import pytest
+from sqlalchemy import create_engine, text
+
+import src.warehouse as warehouse
+from src.staging import file_sha256
+
+SETTINGS = {'user': 'etl', 'password': 'secret', 'host': 'localhost', 'port': 3306, 'database': 'dw'}
+TABLES = ['date', 'product', 'sale']
+LEVELS = [['date', 'product'], ['sale']]
+ROWS = {'date': 3, 'product': 2, 'sale': 5}
+
+class _FakePopen:
+    """Stands in for the `mysqldump` and `mysql` clients."""
+
+    log = None
+
+    def __init__(self, command, stdin=None, stdout=None, stderr=None):
+        self.command = command
+        self.returncode = 0
+        program, target = command[0], command[-1]
+        if program == 'mysqldump':
+            self.log.append(('mysqldump', target))
+            dump = f"-- dump of {target}\n".encode()
+            if stdout is subprocess.PIPE:
+                self.stdout = io.BytesIO(dump)
+            else:
+                stdout.write(dump)
+        else:
+            self.database = target
+            if stdin is subprocess.PIPE:
+                self.stdin = _RecordingPipe(self.log, target)
+            else:
+                self.log.append(('mysql', target, stdin.read()))
+
+    def wait(self):
+        return self.returncode
+
+class _RecordingPipe(io.BytesIO):
+    def __init__(self, log, database):
+        super().__init__()
+        self._log = log
+        self._database = database
+
+    def close(self):
+        self._log.append(('mysql', self._database, self.getvalue()))
+        super().close()
+
+@pytest.fixture
+def rows():
+    """Row counts the fake server reports per table."""
+    return dict(ROWS)
+
+@pytest.fixture
+def log(monkeypatch, recording_engine, rows):
+    def answer(sql, params):
+        count = re.search(r"COUNT\(\*\) FROM `(\w+)`", sql)
+        return rows[count.group(1)] if count else None
+
+    engine = recording_engine(answer)
+    monkeypatch.setattr(warehouse, 'get_db_settings', lambda: dict(SETTINGS))
+    monkeypatch.setattr(warehouse, 'get_engine', lambda **kwargs: engine)
+    monkeypatch.setattr(warehouse, '_restore_levels', lambda engine: (list(TABLES), [list(l) for l in LEVELS]))
+    monkeypatch.setattr(_FakePopen, 'log', engine.log)
+    monkeypatch.setattr(warehouse.subprocess, 'Popen', _FakePopen)
+    # The client processes are recorded in the same timeline as the statements
+    return engine.log
+
+def _write_backup(path, compression='gzip'):
+    """Writes a backup directory as `backup_warehouse` lays it out."""
+    tables = {}
+    for table in TABLES:
+        file_name = table + warehouse.BACKUP_COMPRESSIONS[compression]
+        content = f"-- dump of {table}\n".encode()
+        opener = gzip.open if compression == 'gzip' else open
+        with opener(os.path.join(path, file_name), 'wb') as f:
+            f.write(content)
+        tables[table] = {
+            'file': file_name, 'bytes': 0, 'seconds': 0.0, 'rows': ROWS[table],
+            'sha256': file_sha256(os.path.join(path, file_name)),
+        }
+    manifest = {'database': 'dw', 'compression': compression, 'restore_levels': LEVELS, 'tables': tables}
+    with open(os.path.join(path, warehouse.BACKUP_MANIFEST), 'w') as f:
+        json.dump(manifest, f)
+    return manifest
+
+def _restored(log):
+    return [entry for entry in log if entry[0] == 'mysql']
+
+@pytest.mark.parametrize('compression', ['gzip', 'none'])
+def test_backup_writes_a_verified_manifest_without_locking(log, tmp_path, compression):
+    backup_dir = warehouse.backup_warehouse(str(tmp_path), compression=compression, workers=2)
+
+    statements = [entry[1] for entry in log if entry[0] == 'sql']
+    assert not any('LOCK' in sql for sql in statements)
+    assert sorted(entry[1] for entry in log if entry[0] == 'mysqldump') == TABLES
+    with open(os.path.join(backup_dir, warehouse.BACKUP_MANIFEST)) as f:
+        manifest = json.load(f)
+    assert manifest['restore_levels'] == LEVELS
+    for table, entry in manifest['tables'].items():
+        assert entry['rows'] == ROWS[table]
+        assert entry['sha256'] == file_sha256(os.path.join(backup_dir, entry['file']))
+
+def test_locked_backup_dumps_every_table_under_one_read_lock(log, tmp_path):
+    warehouse.backup_warehouse(str(tmp_path), workers=2, lock_tables=True)
+
+    statements = [entry[1] for entry in log if entry[0] == 'sql']
+    assert statements[0] == 'FLUSH TABLES WITH READ LOCK'
+    assert statements[-1] == 'UNLOCK TABLES'
+    lock, unlock = log.index(('sql', statements[0])), log.index(('sql', statements[-1]))
+    dumps = [i for i, entry in enumerate(log) if entry[0] == 'mysqldump']
+    counts = [i for i, entry in enumerate(log) if entry[0] == 'sql' and 'COUNT' in entry[1]]
+    assert len(dumps) == len(TABLES)
+    # Row counts and every dump happen while the lock is held
+    assert all(lock < i < unlock for i in dumps + counts)
+
+def test_locked_backup_releases_the_lock_when_a_dump_fails(log, tmp_path, monkeypatch):
+    def failing_dump(settings, table, backup_dir, compression):
+        raise RuntimeError('mysqldump: access denied')
+    monkeypatch.setattr(warehouse, '_dump_table', failing_dump)
+
+    assert warehouse.backup_warehouse(str(tmp_path), lock_tables=True) is None
+    assert log[-1] == ('sql', 'UNLOCK TABLES')
+
+@pytest.mark.parametrize('compression', ['gzip', 'none'])
+def test_restore_follows_foreign_key_levels(log, tmp_path, compression):
+    _write_backup(tmp_path, compression)
+
+    warehouse.restore_warehouse(str(tmp_path), workers=2, database='dw_restore')
+
+    restored = _restored(log)
+    assert [database for _, database, _ in restored] == ['dw_restore'] * len(TABLES)
+    contents = [content.decode() for _, _, content in restored]
+    # Both dimensions are restored before the fact table that references them
+    assert sorted(contents[:2]) == ['-- dump of date\n', '-- dump of product\n']
+    assert contents[2] == '-- dump of sale\n'
+    assert ('sql', 'CREATE DATABASE IF NOT EXISTS dw_restore') in log
+
+def test_restore_checks_every_checksum_before_restoring(log, tmp_path):
+    _write_backup(tmp_path)
+    with gzip.open(os.path.join(tmp_path, 'sale.sql.gz'), 'wb') as f:
+        f.write(b'-- truncated')
+
+    with pytest.raises(RuntimeError, match="Checksum mismatch for table 'sale'"):
+        warehouse.restore_warehouse(str(tmp_path))
+    # Nothing was touched, not even the database
+    assert log == []
+
+def test_restore_fails_on_a_row_count_mismatch(log, rows, tmp_path):
+    _write_backup(tmp_path)
+    rows['sale'] = 4
+
+    with pytest.raises(RuntimeError, match="'sale' has 4 rows after restore, expected 5"):
+        warehouse.restore_warehouse(str(tmp_path))
+
+def test_restore_levels_order_tables_by_foreign_keys():
+    engine = create_engine('sqlite://')
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE date (id_date INTEGER PRIMARY KEY)"))
+        conn.execute(text("CREATE TABLE product (id_product INTEGER PRIMARY KEY)"))
+        conn.execute(text(
+            "CREATE TABLE sale (id_sale INTEGER PRIMARY KEY, "
+            "id_date INTEGER REFERENCES date (id_date), id_product INTEGER REFERENCES product (id_product))"
+        ))
+        conn.execute(text("CREATE TABLE sale_note (id_sale INTEGER REFERENCES sale (id_sale))"))
+
+    tables, levels = warehouse._restore_levels(engine)
+
+    assert sorted(tables) == ['date', 'product', 'sale', 'sale_note']
+    assert levels == [['date', 'product'], ['sale'], ['sale_note']]
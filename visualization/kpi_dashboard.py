@@ -1,110 +1,210 @@
-import pandas as pd
+import multiprocessing
+import time
+from concurrent.futures import ThreadPoolExecutor
 import matplotlib.pyplot as plt
 import seaborn as sns
-import os
-from sqlalchemy import create_engine
-from dotenv import load_dotenv
-from urllib.parse import quote_plus
+from src.db import get_engine
+from src.aggregates import aggregates_are_current
+from src.kpi_cache import KpiCache, read_control_rows, warehouse_version
 
 # Styling
 sns.set_theme(style="whitegrid")
 plt.rcParams['figure.figsize'] = (12, 8)
 
-def create_dashboard():
+def create_dashboard(use_cache=True, background=False):
     """
     Generates a visual dashboard with business KPIs.
 
     This function connects to the MySQL Data Warehouse, executes the queries defined
-    in `sql/queries.sql`, and creates a multi-chart dashboard using Seaborn and Matplotlib.
+    in `sql/queries.sql` (or `sql/queries_aggregates.sql` when the KPI aggregate
+    tables are up to date), and creates a multi-chart dashboard using Seaborn and Matplotlib.
     The final dashboard is saved as an image file.
     
+    The four queries are independent, so they run concurrently over pooled
+    connections: the query phase takes as long as the slowest query instead
+    of the sum of all four.
+    
     The dashboard includes:
     1. Total Revenue by Product Category.
     2. Monthly Trend of Revenue vs. Profit.
     3. Revenue Distribution by Sales Channel.
     4. Most Profitable Brands.
+
+    Args:
+        use_cache (bool): Serve the query results from the local KPI cache
+            (`src.kpi_cache`) while the warehouse has not been loaded again.
+            Within a few minutes of the last version check, a fully cached
+            dashboard does not query the database at all.
+        background (bool): Fetch the KPIs and render the charts in a separate
+            process and return at once, without waiting for the image.
+
+    Returns:
+        multiprocessing.Process: The dashboard process when `background` is
+            True (call `.join()` to wait for it; its `exitcode` is not 0 when
+            the dashboard failed), otherwise None.
     """
     print("Starting Visualization Dashboard generation...")
-    
-    # Load environment variables
-    load_dotenv()
-    DB_USER = os.getenv("DB_USER")
-    DB_PASSWORD = os.getenv("DB_PASSWORD")
-    DB_HOST = os.getenv("DB_HOST")
-    DB_PORT = os.getenv("DB_PORT")
-    DB_NAME = os.getenv("DB_NAME")
-    
-    encoded_password = quote_plus(DB_PASSWORD)
-    engine = create_engine(f"mysql+pymysql://{DB_USER}:{encoded_password}@{DB_HOST}:{DB_PORT}/{DB_NAME}")
-    
+
     try:
-        # --- LOAD QUERIES FROM THE SQL FILE ---
-        # The script parses the sql/queries.sql file to avoid hardcoded redundancy.
-        # It assumes queries are separated by semicolons.
-        with open('sql/queries.sql', 'r') as f:
-            sql_file_content = f.read()
-            # Split by semicolon and clean each query
-            raw_queries = [q.strip() for q in sql_file_content.split(';') if q.strip()]
-            
-        # 1. Income by Category (Query 1)
-        df_cat = pd.read_sql(raw_queries[0], con=engine)
-        
-        # 2. Distribution by Channel (Query 2)
-        df_channel = pd.read_sql(raw_queries[1], con=engine)
-        # Translate channel names from Spanish to English
-        channel_map = {
-            'Supermercado - Sede Principal': 'Main Supermarket',
-            'Supermercado - Express Norte': 'North Express Supermarket',
-            'App Domicilios / Online': 'Delivery App / Online'
-        }
-        df_channel['channel'] = df_channel['channel'].replace(channel_map)
-
-        # 3. Monthly Sales Trend (Query 3)
-        df_trend = pd.read_sql(raw_queries[2], con=engine)
-        # Convert month numbers to English month names
-        month_map = {
-            1: 'Jan', 2: 'Feb', 3: 'Mar', 4: 'Apr', 5: 'May', 6: 'Jun',
-            7: 'Jul', 8: 'Aug', 9: 'Sep', 10: 'Oct', 11: 'Nov', 12: 'Dec'
-        }
-        df_trend['month_name'] = df_trend['month'].map(month_map)
-        
-        # 4. Most Profitable Brands (Query 4) - Replaces previous Category Margin
-        df_brands = pd.read_sql(raw_queries[3], con=engine)
-
-        # --- DASHBOARD CREATION ---
-        fig, axes = plt.subplots(2, 2, figsize=(16, 12))
-        fig.suptitle('Business Intelligence Dashboard - AbastoYa Retail', fontsize=20, fontweight='bold')
-
-        # Chart 1: Revenue by Category
-        sns.barplot(data=df_cat, x='revenue', y='category', ax=axes[0, 0], palette='viridis', hue='category', legend=False)
-        axes[0, 0].set_title('Total Revenue by Category', fontsize=14)
-        axes[0, 0].set_xlabel('Revenue ($)')
-
-        # Chart 2: Monthly Evolution (Revenue vs Profit)
-        sns.lineplot(data=df_trend, x='month_name', y='revenue', marker='o', ax=axes[0, 1], label='Revenue', color='blue')
-        sns.lineplot(data=df_trend, x='month_name', y='profit', marker='s', ax=axes[0, 1], label='Profit', color='green')
-        axes[0, 1].set_title('Monthly Trend: Revenue vs Profit', fontsize=14)
-        axes[0, 1].set_xlabel('Month')
-        axes[0, 1].legend()
-
-        # Chart 3: Channel Distribution (Pie Chart)
-        axes[1, 0].pie(df_channel['revenue'], labels=df_channel['channel'], autopct='%1.1f%%', colors=sns.color_palette('pastel'))
-        axes[1, 0].set_title('Revenue Distribution by Channel', fontsize=14)
-
-        # Chart 4: Most Profitable Brands (Fulfilling Req. 4 from PDF)
-        sns.barplot(data=df_brands, x='total_profit', y='brand', ax=axes[1, 1], palette='flare', hue='brand', legend=False)
-        axes[1, 1].set_title('Most Profitable Brands (Total Profit)', fontsize=14)
-        axes[1, 1].set_xlabel('Profit ($)')
-
-        plt.tight_layout(rect=[0, 0.03, 1, 0.95])
-        
-        # Save the dashboard
-        output_path = 'visualization/dashboard_kpis.svg'
-        plt.savefig(output_path)
-        print(f"✅ Dashboard generated successfully at: {output_path}")
-        
+        if background:
+            # A fresh interpreter (spawn) opens its own connections instead of
+            # inheriting the pooled ones, and lets the caller go on meanwhile
+            context = multiprocessing.get_context('spawn')
+            process = context.Process(target=build_dashboard, args=(use_cache,), name='dashboard')
+            process.start()
+            print(f" -> Building the dashboard in the background (pid {process.pid}).")
+            return process
+
+        build_dashboard(use_cache=use_cache)
+
     except Exception as e:
         print(f"Error generating dashboard: {e}")
 
+def build_dashboard(use_cache=True):
+    """
+    Fetches the KPIs and renders the dashboard, raising on any error.
+
+    Runs either inline or as the target of the background dashboard
+    process, where an error ends the process with a non-zero exit code.
+
+    Args:
+        use_cache (bool): See `create_dashboard`.
+    """
+    df_cat, df_channel, df_trend, df_brands = fetch_kpis(use_cache=use_cache)
+    render_dashboard(df_cat, df_channel, df_trend, df_brands)
+
+def fetch_kpis(use_cache=True, engine=None):
+    """
+    Runs the four KPI queries concurrently and prepares their results for plotting.
+
+    Args:
+        use_cache (bool): Reuse cached results for the current warehouse version.
+        engine (sqlalchemy.engine.Engine, optional): Warehouse engine. Defaults
+            to the shared, pooled engine.
+
+    Returns:
+        tuple: `(df_cat, df_channel, df_trend, df_brands)` DataFrames.
+    """
+    # Shared, pooled warehouse engine (connections are only opened on use)
+    if engine is None:
+        engine = get_engine()
+    # Results are only reused while the warehouse version stays the same
+    cache = KpiCache()
+    stamp = cache.cached_version() if use_cache else None
+    if stamp is not None:
+        # Recently checked: no control query, and no query at all on cache hits
+        version, use_aggregates = stamp['version'], stamp['aggregates']
+    else:
+        # One read of the control table gives both the version stamp and the
+        # aggregate watermarks
+        control_rows = read_control_rows(engine)
+        version = warehouse_version(control_rows=control_rows) if use_cache else None
+        use_aggregates = control_rows is not None and aggregates_are_current(engine, control_rows=control_rows)
+        if version is not None:
+            cache.remember_version(version, use_aggregates)
+
+    # --- LOAD QUERIES FROM THE SQL FILE ---
+    # The script parses the sql/queries.sql file to avoid hardcoded redundancy.
+    # It assumes queries are separated by semicolons.
+    # When the ETL-maintained aggregate tables are current, the same KPIs are
+    # read from them instead of scanning the fact table.
+    queries_path = 'sql/queries.sql'
+    if use_aggregates:
+        queries_path = 'sql/queries_aggregates.sql'
+        print(" -> Reading KPIs from the aggregate tables.")
+    with open(queries_path, 'r') as f:
+        sql_file_content = f.read()
+        # Split by semicolon and clean each query
+        raw_queries = [q.strip() for q in sql_file_content.split(';') if q.strip()]
+
+    # One pooled connection per query; the driver releases the GIL while waiting
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(raw_queries)) as executor:
+        futures = [executor.submit(_timed_read, cache, query, engine, version) for query in raw_queries]
+        results = [future.result() for future in futures]
+    wall = time.perf_counter() - start
+    query_seconds = [seconds for _, seconds in results]
+    print(f" -> {len(results)} KPI queries in {wall:.2f}s wall-clock "
+          f"(slowest {max(query_seconds):.2f}s, sum {sum(query_seconds):.2f}s).")
+    if version is not None:
+        print(f" -> KPI cache: {cache.hits} hits, {cache.misses} misses.")
+
+    # 1. Income by Category (Query 1)
+    df_cat = results[0][0]
+    
+    # 2. Distribution by Channel (Query 2)
+    df_channel = results[1][0]
+    # Translate channel names from Spanish to English
+    channel_map = {
+        'Supermercado - Sede Principal': 'Main Supermarket',
+        'Supermercado - Express Norte': 'North Express Supermarket',
+        'App Domicilios / Online': 'Delivery App / Online'
+    }
+    df_channel['channel'] = df_channel['channel'].replace(channel_map)
+
+    # 3. Monthly Sales Trend (Query 3)
+    df_trend = results[2][0]
+    # Convert month numbers to English month names
+    month_map = {
+        1: 'Jan', 2: 'Feb', 3: 'Mar', 4: 'Apr', 5: 'May', 6: 'Jun',
+        7: 'Jul', 8: 'Aug', 9: 'Sep', 10: 'Oct', 11: 'Nov', 12: 'Dec'
+    }
+    df_trend['month_name'] = df_trend['month'].map(month_map)
+    
+    # 4. Most Profitable Brands (Query 4) - Replaces previous Category Margin
+    df_brands = results[3][0]
+    return df_cat, df_channel, df_trend, df_brands
+
+def render_dashboard(df_cat, df_channel, df_trend, df_brands, output_path='visualization/dashboard_kpis.svg'):
+    """
+    Draws the 2x2 KPI figure and saves it.
+
+    Called by `build_dashboard`.
+
+    Args:
+        df_cat (pd.DataFrame): Revenue by category.
+        df_channel (pd.DataFrame): Revenue by channel.
+        df_trend (pd.DataFrame): Monthly revenue and profit.
+        df_brands (pd.DataFrame): Profit by brand.
+        output_path (str): Image file to write.
+    """
+    # --- DASHBOARD CREATION ---
+    fig, axes = plt.subplots(2, 2, figsize=(16, 12))
+    fig.suptitle('Business Intelligence Dashboard - AbastoYa Retail', fontsize=20, fontweight='bold')
+
+    # Chart 1: Revenue by Category
+    sns.barplot(data=df_cat, x='revenue', y='category', ax=axes[0, 0], palette='viridis', hue='category', legend=False)
+    axes[0, 0].set_title('Total Revenue by Category', fontsize=14)
+    axes[0, 0].set_xlabel('Revenue ($)')
+
+    # Chart 2: Monthly Evolution (Revenue vs Profit)
+    sns.lineplot(data=df_trend, x='month_name', y='revenue', marker='o', ax=axes[0, 1], label='Revenue', color='blue')
+    sns.lineplot(data=df_trend, x='month_name', y='profit', marker='s', ax=axes[0, 1], label='Profit', color='green')
+    axes[0, 1].set_title('Monthly Trend: Revenue vs Profit', fontsize=14)
+    axes[0, 1].set_xlabel('Month')
+    axes[0, 1].legend()
+
+    # Chart 3: Channel Distribution (Pie Chart)
+    axes[1, 0].pie(df_channel['revenue'], labels=df_channel['channel'], autopct='%1.1f%%', colors=sns.color_palette('pastel'))
+    axes[1, 0].set_title('Revenue Distribution by Channel', fontsize=14)
+
+    # Chart 4: Most Profitable Brands (Fulfilling Req. 4 from PDF)
+    sns.barplot(data=df_brands, x='total_profit', y='brand', ax=axes[1, 1], palette='flare', hue='brand', legend=False)
+    axes[1, 1].set_title('Most Profitable Brands (Total Profit)', fontsize=14)
+    axes[1, 1].set_xlabel('Profit ($)')
+
+    plt.tight_layout(rect=[0, 0.03, 1, 0.95])
+    
+    # Save the dashboard
+    plt.savefig(output_path)
+    plt.close(fig)
+    print(f"✅ Dashboard generated successfully at: {output_path}")
+
+def _timed_read(cache, query, engine, version):
+    """Runs one KPI query (or reads it from the cache) and returns it with its duration."""
+    start = time.perf_counter()
+    df = cache.read_sql(query, engine, version)
+    return df, time.perf_counter() - start
+
 if __name__ == "__main__":
     create_dashboard()